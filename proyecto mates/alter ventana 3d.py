@@ -1,185 +1,88 @@
-import tkinter as tk
-#from tkinter import filedialog
-from tkinter import simpledialog
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
+from OpenGL.raw.GL.VERSION.GL_1_0 import glMultMatrixf as raw_glMultMatrixf
 import numpy as np
-import threading
 import math
+import atexit
+import os
+import time
+import argparse
+from viewer3d.arcball import Arcball, rotate_about_axis
+from viewer3d.figures import Cube, FleetFigure, Tetrahedron, load_model_figure
+from viewer3d.fbx import FBXError
+from viewer3d.frame_clock import FrameClock
+from viewer3d.info_window import DEFAULT_REFRESH_MS
+from viewer3d.input_overlay import InputOverlay
+from viewer3d.instancing import Fleet, load_quaternions
+from viewer3d.interpolation import Transition
+from viewer3d.orientation_feed import OrientationFeed
+from viewer3d.orientation_log import OrientationPlayer, OrientationRecorder
+from viewer3d.profiler import FrameProfiler
+from viewer3d.profiler_hud import ProfilerHUD
+from viewer3d.rotation import Rotation
+from viewer3d.scene import row_scene
+from viewer3d.transforms import gl_matrix_pointer, gl_rotation_matrix, new_gl_matrix
+from viewer3d.ui_process import UIProcesses
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cube.FBX")
+CAPTION = "Ventana 3D: Presiona Q para ver los controles"
+# Flecha -> (eje de la vista, sentido) de la rotación que produce
+ARROW_AXES = {
+    pygame.K_LEFT: ((0, 1, 0), -1),
+    pygame.K_RIGHT: ((0, 1, 0), 1),
+    pygame.K_UP: ((1, 0, 0), -1),
+    pygame.K_DOWN: ((1, 0, 0), 1),
+}
+# Etapas del bucle que mide el profiler (--profile, --profile-out o la tecla P)
+PROFILE_STAGES = ("events", "commands", "input", "publish", "draw", "flip", "wait")
+
+# Diálogos del panel: tecla -> (comando, título, preguntas). Los valores llegan en el orden de las preguntas.
+DIALOGS = {
+    "m": ("axis_angle", "Euler principal", ("Enter angle in degrees:", "Enter x component:",
+                                            "Enter y component:", "Enter z component:")),
+    "n": ("quaternion", "Quaternion", ("Enter quaternion w component:", "Enter quaternion x component:",
+                                       "Enter quaternion y component:", "Enter quaternion z component:")),
+    "b": ("euler", "Euler", ("Enter euler principal for x-axis:", "Enter euler principal for y-axis:",
+                             "Enter euler principal for z-axis:")),
+    "v": ("rotation_vector", "Rotation vector", ("Enter rotation vector for x-axis:", "Enter rotation vector for y-axis:",
+                                                 "Enter rotation vector for z-axis:")),
+    "c": ("rotation_matrix", "Rotation matrix", tuple(f"Enter rotation matrix for {row},{column}:"
+                                                      for row in range(1, 4) for column in range(1, 4))),
+}
+DIALOG_KEYS = {pygame.K_m: "m", pygame.K_n: "n", pygame.K_b: "b", pygame.K_v: "v", pygame.K_c: "c"}
+
+# Formatos de la línea de entrada de la ventana: tecla -> (comando, título, número de valores)
+INPUT_FORMATS = {
+    "m": ("axis_angle", "Euler principal: angulo (grados) x y z", 4),
+    "n": ("quaternion", "Quaternion w x y z", 4),
+    "b": ("euler", "Euler x y z", 3),
+    "v": ("rotation_vector", "Rotation vector x y z", 3),
+    "c": ("rotation_matrix", "Rotation matrix (3x3 por filas)", 9),
+}
 
-class Cube:
-    vertices = (
-        (1, -1, -1), (1, 1, -1), (-1, 1, -1), (-1, -1, -1),
-        (1, -1, 1), (1, 1, 1), (-1, -1, 1), (-1, 1, 1)
-    )
-
-    edges = (
-        (0, 1), (0, 3), (0, 4), (2, 1), (2, 3), (2, 7),
-        (6, 3), (6, 4), (6, 7), (5, 1), (5, 4), (5, 7)
-    )
-
-    faces = [
-        (0, 1, 2, 3), (3, 2, 7, 6), (6, 7, 5, 4),
-        (4, 5, 1, 0), (1, 5, 7, 2), (4, 0, 3, 6)
-    ]
-
-    colors = (
-        (1, 0, 0, 1), (0, 1, 0, 1), (0, 0, 1, 1),
-        (1, 1, 1, 1), (1, 1, 0, 1), (1, 0, 1, 1)
-    )
-
-    def draw(self):
-        glBegin(GL_QUADS)
-        for face_color, face in enumerate(self.faces):
-            glColor4fv(self.colors[face_color])
-            for vertex in face:
-                glVertex3fv(self.vertices[vertex])
-        glEnd()
-
-        glColor3fv((0, 0, 0))
-        glBegin(GL_LINES)
-        for edge in self.edges:
-            for vertex in edge:
-                glVertex3fv(self.vertices[vertex])
-        glEnd()
-
-class Tetrahedron:
-    vertices = (
-        (0, 1, 0), (-1, -1, 1), (1, -1, 1), (0, -1, -1)
-    )
-
-    edges = (
-        (0, 1), (0, 2), (0, 3), (1, 2), (2, 3), (3, 1)
-    )
-
-    faces = (
-        (0, 1, 2), (0, 2, 3), (0, 3, 1), (1, 3, 2)
-    )
-
-    colors = (
-        (1, 0, 0, 1), (0, 1, 0, 1), (0, 0, 1, 1), (1, 1, 1, 1)
-    )
-
-    def draw(self):
-        glBegin(GL_TRIANGLES)
-        for face_color, face in enumerate(self.faces):
-            glColor4fv(self.colors[face_color])
-            for vertex in face:
-                glVertex3fv(self.vertices[vertex])
-        glEnd()
-
-        glColor3fv((0, 0, 0))
-        glBegin(GL_LINES)
-        for edge in self.edges:
-            for vertex in edge:
-                glVertex3fv(self.vertices[vertex])
-        glEnd()
-
-class Rotation:
-    def __init__(self):
-        # Inicializa la rotación a una identidad (sin rotación)
-        self.quaternion = [1, 0, 0, 0]
-        self.update_all_from_quaternion()
-
-    def update_all_from_quaternion(self):
-        # Actualiza todas las representaciones a partir del cuaternión
-        self.euler_principal = self.quaternion_to_euler_principal()
-        self.euler_angles = self.quaternion_to_euler_angles()
-        self.rotation_vector = self.quaternion_to_rotation_vector()
-        self.rotation_matrix = self.quaternion_to_rotation_matrix()
-
-    def quaternion_to_euler_principal(self):
-        # Convierte el cuaternión a Euler Principal (Ángulo y Eje)
-        w, x, y, z = self.quaternion
-        angle = 2 * math.acos(w)
-        norm = x*x + y*y + z*z
-        if norm < 0.001:  # when all euler angles are zero angle =0 so we can set axis to anything to avoid divide by zero
-            x=1
-            y=z=0
-        else:
-            norm = math.sqrt(norm)
-            x /= norm
-            y /= norm
-            z /= norm
-        return (angle, x, y, z)
-
-    def quaternion_to_euler_angles(self):
-        # Convierte el cuaternión a Ángulos de Euler
-        w, x, y, z = self.quaternion
-        t0 = +2.0 * (w * x + y * z)
-        t1 = +1.0 - 2.0 * (x * x + y * y)
-        X = math.atan2(t0, t1)
-
-        t2 = +2.0 * (w * y - z * x)
-        t2 = +1.0 if t2 > +1.0 else t2
-        t2 = -1.0 if t2 < -1.0 else t2
-        Y = math.asin(t2)
-
-        t3 = +2.0 * (w * z + x * y)
-        t4 = +1.0 - 2.0 * (y * y + z * z)
-        Z = math.atan2(t3, t4)
-
-        return X, Y, Z  # in radians
-
-    def quaternion_to_rotation_vector(self):
-        # Convierte el cuaternión a Vector de Rotación
-        angle, x, y, z = self.quaternion_to_euler_principal()
-        return (x*angle, y*angle, z*angle)
-
-    def quaternion_to_rotation_matrix(self):
-        # Convierte el cuaternión a Matriz de Rotación
-        w, x, y, z = self.quaternion
-        return [[1 - 2*y*y - 2*z*z, 2*x*y - 2*z*w, 2*x*z + 2*y*w],
-                [2*x*y + 2*z*w, 1 - 2*x*x - 2*z*z, 2*y*z - 2*x*w],
-                [2*x*z - 2*y*w, 2*y*z + 2*x*w, 1 - 2*x*x - 2*y*y]]
-
-    def set_from_quaternion(self, quaternion):
-        # Establece la rotación a partir de un cuaternión
-        self.quaternion = quaternion
-        self.update_all_from_quaternion()
-
-    def set_from_euler_principal(self, angle, x, y, z):
-        # Establece la rotación a partir de un ángulo y eje
-        self.quaternion = [math.cos(angle/2), x*math.sin(angle/2), y*math.sin(angle/2), z*math.sin(angle/2)]
-        self.update_all_from_quaternion()
-
-    def set_from_euler_angles(self, x, y, z):
-        # Establece la rotación a partir de ángulos de Euler
-        X = math.cos(x/2)
-        Y = math.sin(x/2)
-        Z = math.cos(y/2)
-        W = math.sin(y/2)
-        A = math.cos(z/2)
-        B = math.sin(z/2)
-
-        self.quaternion = [X*Z*A + Y*W*B, X*Z*B - Y*W*A, Y*Z*A + X*W*B, Y*Z*B - X*W*A]
-        self.update_all_from_quaternion()
-    
-    def set_from_rotation_vector(self, x, y, z):
-        # Establece la rotación a partir de un vector de rotación
-        angle = math.sqrt(x*x + y*y + z*z)
-        self.quaternion = [math.cos(angle/2), x*math.sin(angle/2)/angle, y*math.sin(angle/2)/angle, z*math.sin(angle/2)/angle]
-        self.update_all_from_quaternion()
-    
-    def set_from_rotation_matrix(self, R):
-        # Establece la rotación a partir de una matriz de rotación
-        w = math.sqrt(1 + R[0][0] + R[1][1] + R[2][2]) / 2
-        w4 = 4*w
-        x = (R[2][1] - R[1][2]) / w4
-        y = (R[0][2] - R[2][0]) / w4
-        z = (R[1][0] - R[0][1]) / w4
-        self.quaternion = [w, x, y, z]
-        self.update_all_from_quaternion()
-    
-    
-
-
-def main():
+CONTROLS = (
+    "Si mantienes click izquierdo en la figura y mueves el mouse podras mover la figura",
+    "Tambien podras mover la figura con las flechas direccionales",
+    "Presiona 'R' para reiniciar la rotacion de la figura",
+    "Presiona '1' para cambiar a un cubo",
+    "Presiona '2' para cambiar a un tetraedro",
+    "Presiona '3' para cambiar al modelo Cube.FBX",
+    "Presiona '4' para ver todas las figuras juntas",
+    "Presiona 'Q' para ver los controles",
+    "Presiona 'P' para ver cuanto tarda cada etapa del frame",
+)
+
+def main(target_fps=60, vsync=False, info_refresh_ms=DEFAULT_REFRESH_MS, monitors=1,
+         record_path=None, play_path=None, play_speed=1.0, play_loop=False, instances=None,
+         profile=False, profile_path=None):
     pygame.init()
     display = (800, 600)
-    pygame.display.set_mode(display, DOUBLEBUF|OPENGL)
+    pygame.display.set_mode(display, DOUBLEBUF|OPENGL, vsync=1 if vsync else 0)
+    pygame.display.set_caption(CAPTION)
+    clock = FrameClock(target_fps, vsync)  # Ritmo de frames y delta time
+    last_caption_update = time.perf_counter()
 
     fov = 45  # Campo de visión inicial
     gluPerspective(fov, (display[0]/display[1]), 0.1, 100.0)
@@ -189,257 +92,184 @@ def main():
     1: Cube(),
     2: Tetrahedron(),
 }
+    try:
+        figures[3] = load_model_figure(MODEL_PATH)  # Modelo FBX incluido en el proyecto
+    except (OSError, FBXError) as error:
+        print(f"No se pudo cargar {MODEL_PATH}: {error}")
+    scene = row_scene(list(figures.values()))  # Todas las figuras juntas; solo se dibujan las que caen en la vista
+    if instances is not None:  # Modo flota: cada figura se dibuja una vez por orientación, todas en un solo draw
+        fleet = Fleet(instances)
+        figures = {key: FleetFigure(figure, fleet) for key, figure in figures.items()}
+    figures[4] = scene
 
     current_figure = figures[1]  # Figura actual
 
     cube_rotation = Rotation()  # Rotación inicial del cubo
+    model_matrix = new_gl_matrix()  # Matriz de la figura para glMultMatrixf, reservada una sola vez
+    model_matrix_pointer = gl_matrix_pointer(model_matrix)  # La misma memoria, para raw_glMultMatrixf
+    arcball = Arcball(*display)  # Rotación con el mouse
+    rotation_feed = OrientationFeed()  # Última rotación publicada, en memoria compartida para los paneles
+    atexit.register(rotation_feed.close)
+    print(f"Feed de orientación: {rotation_feed.name}")
+    published_quaternion = None  # Cuaternión de la última publicación
     mouse_down = False  # El mouse inicialmente no está presionado
-    last_mouse_pos = (0, 0)  # Posición inicial del mouse
-
-    MAX_ROTATION_SPEED = 5
 
-    # Inicializa la ventana de información en un thread para que no se sobreponga con la ventana principal
-    info_window_thread = threading.Thread(target=start_info_window, args=(cube_rotation,))
-    info_window_thread.start()
+    KEY_ROTATION_STEP = 5  # Grados por pulsación de una flecha
+
+    # El panel de información, los controles y los diálogos corren en otros procesos
+    ui = UIProcesses(rotation_feed.name, DIALOGS, CONTROLS, monitors, info_refresh_ms)
+    atexit.register(ui.close)
+    recorder = OrientationRecorder(record_path) if record_path else None  # Log de las orientaciones de la sesión
+    if recorder is not None:
+        atexit.register(recorder.close)
+    player = OrientationPlayer(play_path, play_speed, play_loop) if play_path else None  # Log que se está reproduciendo
+    overlay = InputOverlay(INPUT_FORMATS)  # Línea de entrada de rotaciones dentro de la ventana
+    transition = None  # Animación hacia la última rotación escrita por el usuario
+    profiler = FrameProfiler(PROFILE_STAGES, export_path=profile_path)  # Tiempos de cada etapa del frame
+    atexit.register(profiler.close)
+    profiler_hud = ProfilerHUD(profiler, visible=profile)
 
     while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
-            elif event.type == pygame.KEYDOWN:  # Si se presiona una tecla
-                if event.key == pygame.K_ESCAPE:  # Si la tecla es ESC
-                    pygame.quit()  # Cierra pygame
-                    quit()  # Cierra la ventana
-                elif event.key == pygame.K_1:  # Si la tecla es 1, 2, 3 o 4
-                    current_figure = figures[1]
-                elif event.key == pygame.K_2:  # Si la tecla es 1, 2, 3 o 4
-                    current_figure = figures[2]  # Cambia la figura actual
-                elif event.key == pygame.K_r:  # Si la tecla 'R' se presiona
-                    cube_rotation.set_from_quaternion([1, 0, 0, 0])
-                elif event.key == pygame.K_LEFT:
-                    roll, pitch, yaw = cube_rotation.euler_angles
-                    desired_pitch = pitch - 5  # Para rotar a la izquierda
-                    pitch_difference = desired_pitch - pitch
-                    pitch_difference = max(min(pitch_difference, MAX_ROTATION_SPEED), -MAX_ROTATION_SPEED)
-                    pitch += pitch_difference
-                    cube_rotation.set_from_euler_angles(roll, pitch, yaw)
-                elif event.key == pygame.K_RIGHT:
-                    roll, pitch, yaw = cube_rotation.euler_angles
-                    desired_pitch = pitch + 5  # Para rotar a la derecha
-                    pitch_difference = desired_pitch - pitch
-                    pitch_difference = max(min(pitch_difference, MAX_ROTATION_SPEED), -MAX_ROTATION_SPEED)
-                    pitch += pitch_difference
-                    cube_rotation.set_from_euler_angles(roll, pitch, yaw)
-                elif event.key == pygame.K_UP:
-                    roll, pitch, yaw = cube_rotation.euler_angles
-                    desired_roll = roll - 5  # Para rotar hacia arriba
-                    roll_difference = desired_roll - roll
-                    roll_difference = max(min(roll_difference, MAX_ROTATION_SPEED), -MAX_ROTATION_SPEED)
-                    roll += roll_difference
-                    cube_rotation.set_from_euler_angles(roll, pitch, yaw)
-                elif event.key == pygame.K_DOWN:
-                    roll, pitch, yaw = cube_rotation.euler_angles
-                    desired_roll = roll + 5  # Para rotar hacia abajo
-                    roll_difference = desired_roll - roll
-                    roll_difference = max(min(roll_difference, MAX_ROTATION_SPEED), -MAX_ROTATION_SPEED)
-                    roll += roll_difference
-                    cube_rotation.set_from_euler_angles(roll, pitch, yaw)
-                elif event.key == pygame.K_q:  # Si la tecla 'Q' se presiona
-                    controls_window = tk.Tk()
-                    controls_window.title("Controls")
-
-                    control1_label = tk.Label(controls_window, text="Si mantienes click izquierdo en la figura y mueves el mouse podras mover la figura")
-                    control1_label.pack()
-
-                    control2_label = tk.Label(controls_window, text="Tambien podras mover la figura con las flechas direccionales")
-                    control2_label.pack()
-
-                    control3_label = tk.Label(controls_window, text="Presiona 'R' para reiniciar la rotacion de la figura")
-                    control3_label.pack()
-
-                    control4_label = tk.Label(controls_window, text="Presiona '1' para cambiar a un cubo")
-                    control4_label.pack()
-
-                    control5_label = tk.Label(controls_window, text="Presiona '2' para cambiar a un tetraedro")
-                    control5_label.pack()
-
-                    control6_label = tk.Label(controls_window, text="Presiona 'Q' para ver los controles")
-                    control6_label.pack()
-
-
-                    # Agrega mas
-
-                    controls_window.mainloop()
-                elif event.key == pygame.K_m:  # Si la tecla 'M' se presiona
-                    root = tk.Tk()
-                    root.withdraw()  # Oculta la ventana de Tkinter
-                    angle_input = simpledialog.askstring("Input", "Enter angle in degrees:", parent=root)
-                    x_input = simpledialog.askstring("Input", "Enter x component:", parent=root)
-                    y_input = simpledialog.askstring("Input", "Enter y component:", parent=root)
-                    z_input = simpledialog.askstring("Input", "Enter z component:", parent=root)
-                    angle = float(angle_input)
-                    x = float(x_input)
-                    y = float(y_input)
-                    z = float(z_input)
-                    cube_rotation.set_from_euler_principal(angle, x, y, z)
-                elif event.key == pygame.K_n:  # Si la tecla 'N' se presiona
-                    root = tk.Tk()
-                    root.withdraw()  # Oculta la ventana de Tkinter
-                    quaternion_input_w = simpledialog.askstring("Input", "Enter quaternion w component:",
-                                                                parent=root)
-                    quaternion_input_x = simpledialog.askstring("Input", "Enter quaternion x component:",
-                                                                parent=root)
-                    quaternion_input_y = simpledialog.askstring("Input", "Enter quaternion y component:",
-                                                                parent=root)
-                    quaternion_input_z = simpledialog.askstring("Input", "Enter quaternion z component:",
-                                                                parent=root)
-                    w = float(quaternion_input_w)
-                    x = float(quaternion_input_x)
-                    y = float(quaternion_input_y)
-                    z = float(quaternion_input_z)
-                    cube_rotation.set_from_quaternion([w, x, y, z])
-                    root.destroy()  # Destruye la ventana de Tkinter
-                elif event.key == pygame.K_b:
-                    root = tk.Tk()
-                    root.withdraw()
-                    euler_principal_input_x = simpledialog.askstring("Input", "Enter euler principal for x-axis:",
-                                                                         parent=root)
-                    euler_principal_input_y = simpledialog.askstring("Input", "Enter euler principal for y-axis:",
-                                                                         parent=root)
-                    euler_principal_input_z = simpledialog.askstring("Input", "Enter euler principal for z-axis:",
-                                                                         parent=root)
-                    x = float(euler_principal_input_x)
-                    y = float(euler_principal_input_y)
-                    z = float(euler_principal_input_z)
-                    cube_rotation.set_from_euler_angles(x, y, z)
-                    root.destroy()
-                elif event.key == pygame.K_v:
-                    root = tk.Tk()
-                    root.withdraw()
-                    rotation_vector_input_x = simpledialog.askstring("Input", "Enter rotation vector for x-axis:",
-                                                                         parent=root)
-                    rotation_vector_input_y = simpledialog.askstring("Input", "Enter rotation vector for y-axis:",
-                                                                         parent=root)
-                    rotation_vector_input_z = simpledialog.askstring("Input", "Enter rotation vector for z-axis:",
-                                                                         parent=root)
-                    x = float(rotation_vector_input_x)
-                    y = float(rotation_vector_input_y)
-                    z = float(rotation_vector_input_z)
-                    cube_rotation.set_from_rotation_vector(x, y, z)
-                    root.destroy()
-                elif event.key == pygame.K_c:
-                    root = tk.Tk()
-                    root.withdraw()
-                    rotation_matrix_input_11 = simpledialog.askstring("Input", "Enter rotation matrix for 1,1:",
-                                                                         parent=root)
-                    rotation_matrix_input_12 = simpledialog.askstring("Input", "Enter rotation matrix for 1,2:",
-                                                                         parent=root)
-                    rotation_matrix_input_13 = simpledialog.askstring("Input", "Enter rotation matrix for 1,3:",
-                                                                         parent=root)
-                    rotation_matrix_input_21 = simpledialog.askstring("Input", "Enter rotation matrix for 2,1:",
-                                                                         parent=root)
-                    rotation_matrix_input_22 = simpledialog.askstring("Input", "Enter rotation matrix for 2,2:",
-                                                                         parent=root)
-                    rotation_matrix_input_23 = simpledialog.askstring("Input", "Enter rotation matrix for 2,3:",
-                                                                         parent=root)
-                    rotation_matrix_input_31 = simpledialog.askstring("Input", "Enter rotation matrix for 3,1:",
-                                                                         parent=root)
-                    rotation_matrix_input_32 = simpledialog.askstring("Input", "Enter rotation matrix for 3,2:",
-                                                                         parent=root)
-                    rotation_matrix_input_33 = simpledialog.askstring("Input", "Enter rotation matrix for 3,3:",
-                                                                         parent=root)
-                    x = np.array([[float(rotation_matrix_input_11), float(rotation_matrix_input_12), float(rotation_matrix_input_13)], 
-                                  [float(rotation_matrix_input_21), float(rotation_matrix_input_22), float(rotation_matrix_input_23)],
-                                  [float(rotation_matrix_input_31), float(rotation_matrix_input_32), float(rotation_matrix_input_33)]])
-                    cube_rotation.set_from_rotation_matrix(x)
-                    root.destroy()              
-            elif event.type == pygame.MOUSEBUTTONDOWN:  # Si el botón del mouse se presiona
-                if event.button == 1:  # Si el botón izquierdo del mouse se presiona
-                    mouse_down = True
-                    last_mouse_pos = pygame.mouse.get_pos()  # Guarda la posición actual del mouse
-                elif event.button == 4:  # Si se gira la rueda del mouse hacia arriba
-                    fov = max(1, fov - 1)  # Disminuye el campo de visión para hacer zoom in
-                elif event.button == 5:  # Si se gira la rueda del mouse hacia abajo
-                    fov = min(180, fov + 1)  # Aumenta el campo de visión para hacer zoom out
-            elif event.type == pygame.MOUSEBUTTONUP:  # Si el botón del mouse se suelta
-                if event.button == 1:  # Si el botón izquierdo del mouse se suelta
-                    mouse_down = False
-            elif event.type == pygame.MOUSEMOTION:  # Si el mouse se mueve
-                if mouse_down:  # Si el botón izquierdo del mouse está presionado
-                    mouse_pos = pygame.mouse.get_pos()  # Guarda la posición actual del mouse
-                    mouse_delta = (mouse_pos[0] - last_mouse_pos[0], mouse_pos[1] - last_mouse_pos[1])  # Calcula el cambio en la posición del mouse
-                    last_mouse_pos = mouse_pos  # Actualiza la última posición del mouse
-                    roll, pitch, yaw = cube_rotation.euler_angles
-                    roll -= mouse_delta[1]  # Rota el cubo en el eje x
-                    pitch -= mouse_delta[0]  # Rota el cubo en el eje y
-                    cube_rotation.set_from_euler_angles(roll, pitch, yaw)
-
-        glClear(GL_COLOR_BUFFER_BIT|GL_DEPTH_BUFFER_BIT)
-
-        glRotatef(cube_rotation.euler_angles[0], 1, 0, 0)  # Rota el cubo en el eje x
-        glRotatef(cube_rotation.euler_angles[1], 0, 1, 0)  # Rota el cubo en el eje y
-        glRotatef(cube_rotation.euler_angles[2], 0, 0, 1)  # Rota el cubo en el eje z
-
-        glLoadIdentity()
-        gluPerspective(fov, (display[0]/display[1]), 0.1, 100.0)  # Actualiza el campo de visión
-        glTranslatef(0.0, 0.0, -5)
-        glEnable(GL_CULL_FACE)
-        glCullFace(GL_BACK)
-        glClear(GL_COLOR_BUFFER_BIT|GL_DEPTH_BUFFER_BIT)
-
-        if current_figure is not None:  # Si hay una figura seleccionada
-            glPushMatrix()  # Guarda la matriz de transformación actual
-            roll, pitch, yaw = cube_rotation.euler_angles
-            glRotatef(roll, 1, 0, 0)  # Rota la figura en el eje x
-            glRotatef(pitch, 0, 1, 0)  # Rota la figura en el eje y
-            current_figure.draw()  # Dibuja la figura
-            glPopMatrix()  # Restaura la matriz de transformación      
-
-        pygame.display.set_caption("Ventana 3D: Presiona Q para ver los controles")
-
-        pygame.display.flip()
-        pygame.time.wait(10)
-
-def start_info_window(rotation):
-    def update_info_window():
-        rotation_label.config(text="Euler Angles: " + str(rotation.euler_angles))
-
-        quaternion_label.config(text="Quaternion: (" + ", ".join(f"{i:.4f}" for i in rotation.quaternion) + ")")
-
-        euler_principal_label.config(text="Euler Principal: (" + ", ".join(f"{i:.4f}" for i in rotation.euler_principal) + ")")
-
-        rotation_matrix_string = '\n'.join(['\t'.join([format(cell, ".4f") for cell in row]) for row in rotation.rotation_matrix])
-        rotation_matrix_label.config(text="Rotation Matrix:\n" + rotation_matrix_string)
-
-        rotation_vector_string = ', '.join([format(i[0], ".4f") for i in rotation.rotation_vector])
-        rotation_vector_label.config(text="Rotation Vector: " + rotation_vector_string)
-        
-        info_window.after(100, update_info_window)  # Actualiza la ventana de información cada 100 ms
-
-    info_window = tk.Tk()
-    info_window.title("Information")
-
-    rotation_label = tk.Label(info_window)
-    rotation_label.pack()
-
-    quaternion_label = tk.Label(info_window)
-    quaternion_label.pack()
-
-    euler_principal_label = tk.Label(info_window)
-    euler_principal_label.pack()
-
-    rotation_vector_label = tk.Label(info_window)
-    rotation_vector_label.pack()
-
-    rotation_matrix_label = tk.Label(info_window)
-    rotation_matrix_label.pack()
-
-    info_window.after(100, update_info_window)
-    info_window.mainloop()
+        with profiler.stage("events"):
+            for event in pygame.event.get():
+                if overlay.handle_event(event):  # Mientras se escribe, las teclas son para la línea de entrada
+                    continue
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    quit()
+                elif event.type == pygame.KEYDOWN:  # Si se presiona una tecla
+                    if event.key == pygame.K_ESCAPE:  # Si la tecla es ESC
+                        pygame.quit()  # Cierra pygame
+                        quit()  # Cierra la ventana
+                    elif event.key == pygame.K_1:  # Si la tecla es 1, 2, 3 o 4
+                        current_figure = figures[1]
+                    elif event.key == pygame.K_2:  # Si la tecla es 1, 2, 3 o 4
+                        current_figure = figures[2]  # Cambia la figura actual
+                    elif event.key == pygame.K_3 and 3 in figures:  # Si la tecla es 3 y el modelo se cargó
+                        current_figure = figures[3]
+                    elif event.key == pygame.K_4:  # Si la tecla es 4, todas las figuras en una escena
+                        current_figure = figures[4]
+                    elif event.key == pygame.K_r:  # Si la tecla 'R' se presiona
+                        cube_rotation.set_from_quaternion([0, 0, 0, 1])
+                    elif event.key in ARROW_AXES:  # Cada flecha gira la figura KEY_ROTATION_STEP grados en la vista
+                        axis, direction = ARROW_AXES[event.key]
+                        cube_rotation.set_from_quaternion(rotate_about_axis(cube_rotation.quaternion, axis,
+                                                                            direction * KEY_ROTATION_STEP))
+                    elif event.key == pygame.K_q:  # Si la tecla 'Q' se presiona
+                        ui.request("controls")  # La ventana de controles se abre en el proceso del panel
+                    elif event.key in DIALOG_KEYS:  # M, N, B, V o C: se escribe la rotación en la ventana sin pararla
+                        overlay.open(DIALOG_KEYS[event.key])
+                    elif event.key == pygame.K_p:  # Si la tecla 'P' se presiona, muestra u oculta los tiempos del frame
+                        profiler_hud.toggle()
+                elif event.type == pygame.MOUSEBUTTONDOWN:  # Si el botón del mouse se presiona
+                    if event.button == 1:  # Si el botón izquierdo del mouse se presiona
+                        mouse_down = True
+                        arcball.press(*event.pos)  # Punto de la esfera que se agarra
+                    elif event.button == 4:  # Si se gira la rueda del mouse hacia arriba
+                        fov = max(1, fov - 1)  # Disminuye el campo de visión para hacer zoom in
+                    elif event.button == 5:  # Si se gira la rueda del mouse hacia abajo
+                        fov = min(180, fov + 1)  # Aumenta el campo de visión para hacer zoom out
+                elif event.type == pygame.MOUSEBUTTONUP:  # Si el botón del mouse se suelta
+                    if event.button == 1:  # Si el botón izquierdo del mouse se suelta
+                        mouse_down = False
+                        arcball.release()
+                elif event.type == pygame.MOUSEMOTION:  # Si el mouse se mueve
+                    if mouse_down:  # Si el botón izquierdo del mouse está presionado
+                        # El cubo gira como una esfera arrastrada: el punto agarrado sigue al cursor
+                        cube_rotation.set_from_quaternion(arcball.drag(cube_rotation.quaternion, *event.pos))
+
+        # Valores que el usuario escribió en los diálogos del panel o en la línea de entrada
+        with profiler.stage("commands"):
+            rotation_before = cube_rotation.quaternion
+            for command, values in ui.commands() + overlay.take():
+                if command == "axis_angle":  # El ángulo se escribe en grados; Rotation lo usa en radianes
+                    angle, x, y, z = values
+                    cube_rotation.set_from_euler_principal(math.radians(angle), x, y, z)
+                elif command == "quaternion":
+                    w, x, y, z = values
+                    cube_rotation.set_from_quaternion([x, y, z, w])
+                elif command == "euler":
+                    cube_rotation.set_from_euler_angles(*values)
+                elif command == "rotation_vector":
+                    cube_rotation.set_from_rotation_vector(*values)
+                elif command == "rotation_matrix":
+                    cube_rotation.set_from_rotation_matrix(np.array(values).reshape(3, 3))
+            if cube_rotation.quaternion is not rotation_before:  # No se salta a la rotación nueva: se llega animando
+                transition = Transition(rotation_before, cube_rotation.quaternion)
+                cube_rotation.set_from_quaternion(rotation_before)
+            if transition is not None:
+                cube_rotation.set_from_quaternion(transition.current())
+                if transition.finished:
+                    transition = None
+
+        with profiler.stage("input"):
+            if player is not None:  # Mientras se reproduce un log, manda sobre el teclado y el mouse
+                played = player.current()
+                if played is None:  # Se terminó: el usuario recupera el control
+                    player = None
+                elif played != cube_rotation.quaternion:  # Entre dos muestras del log no cambia nada
+                    cube_rotation.set_from_quaternion(played)
+
+        with profiler.stage("publish"):
+            if cube_rotation.quaternion is not published_quaternion:  # Solo se publica cuando la rotación cambió
+                published_quaternion = cube_rotation.quaternion
+                if recorder is not None:
+                    recorder.record(published_quaternion)
+                rotation_feed.publish(cube_rotation.euler_angles, published_quaternion, cube_rotation.euler_principal,
+                                      cube_rotation.rotation_vector, cube_rotation.rotation_matrix)
+                gl_rotation_matrix(published_quaternion, model_matrix)  # La matriz solo se reescribe si cambió la rotación
+
+        with profiler.stage("draw"):
+            glLoadIdentity()
+            gluPerspective(fov, (display[0]/display[1]), 0.1, 100.0)  # Actualiza el campo de visión
+            glTranslatef(0.0, 0.0, -5)
+            glEnable(GL_CULL_FACE)
+            glCullFace(GL_BACK)
+            glClear(GL_COLOR_BUFFER_BIT|GL_DEPTH_BUFFER_BIT)
+
+            if current_figure is not None:  # Si hay una figura seleccionada
+                glPushMatrix()  # Guarda la matriz de transformación actual
+                raw_glMultMatrixf(model_matrix_pointer)  # Rota la figura con la matriz de su cuaternión
+                current_figure.draw()  # Dibuja la figura
+                glPopMatrix()  # Restaura la matriz de transformación      
+            overlay.draw()  # La línea de entrada va encima de la figura
+            profiler_hud.draw()
+
+        with profiler.stage("flip"):
+            pygame.display.flip()
+        with profiler.stage("wait"):
+            clock.tick()  # Espera lo necesario para mantener los FPS objetivo
+        profiler.end_frame()
+        profiler_hud.update()
+
+        if time.perf_counter() - last_caption_update >= 1:  # Muestra las estadísticas de frame una vez por segundo
+            stats = clock.stats()
+            caption = f"{CAPTION} | {stats.fps:.0f} FPS, {stats.work_ms:.1f} ms por frame"
+            culling = getattr(current_figure, "culling", None)  # Las escenas y las flotas cuentan lo que descartan
+            if culling is not None:
+                caption += f" | {culling}"
+            pygame.display.set_caption(caption)
+            last_caption_update = time.perf_counter()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Ventana 3D")
+    parser.add_argument("--fps", type=int, default=60, help="FPS objetivo (0 para no limitarlos)")
+    parser.add_argument("--vsync", action="store_true", help="sincroniza los frames con el refresco de la pantalla")
+    parser.add_argument("--info-refresh-ms", type=int, default=DEFAULT_REFRESH_MS, help="cada cuánto se actualiza la ventana de información")
+    parser.add_argument("--monitors", type=int, default=1, help="paneles de información que se abren al arrancar")
+    parser.add_argument("--record", metavar="ARCHIVO", help="graba las orientaciones en un log binario (se añaden al final)")
+    parser.add_argument("--play", metavar="ARCHIVO", help="reproduce un log de orientaciones grabado")
+    parser.add_argument("--speed", type=float, default=1.0, help="velocidad de reproducción (1 es tiempo real)")
+    parser.add_argument("--loop", action="store_true", help="reproduce el log en bucle")
+    parser.add_argument("--instances", metavar="N_O_ARCHIVO",
+                        help="dibuja una flota: N orientaciones aleatorias o un .npy (N,4) de cuaterniones (x, y, z, w)")
+    parser.add_argument("--profile", action="store_true", help="muestra los percentiles del tiempo de cada etapa del frame")
+    parser.add_argument("--profile-out", metavar="ARCHIVO", help="guarda el tiempo de cada etapa de cada frame en un .csv o .json")
+    args = parser.parse_args()
+    main(target_fps=args.fps, vsync=args.vsync, info_refresh_ms=args.info_refresh_ms, monitors=args.monitors,
+         record_path=args.record, play_path=args.play, play_speed=args.speed, play_loop=args.loop,
+         instances=load_quaternions(args.instances) if args.instances else None,
+         profile=args.profile, profile_path=args.profile_out)
 
 # def euler_to_quaternion(roll, pitch, yaw):
 #     cos_roll_2 = np.cos(roll/2)
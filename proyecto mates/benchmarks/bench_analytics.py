@@ -0,0 +1,124 @@
+import argparse
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# viewer3d.analytics sobre un log sintético de --rows registros:
+#   - filas/s con 1, 2, 4... procesos hasta el número de núcleos, y la aceleración frente a uno
+#   - las columnas escritas comparadas con viewer3d.batch sobre todo el log
+#   - reanudar: lanza `python -m viewer3d.analytics`, lo mata con SIGKILL cuando lleva algunos
+#     bloques, lo vuelve a lanzar y comprueba que solo convierte los que faltaban y que el
+#     resultado es el mismo
+#   python benchmarks/bench_analytics.py --rows 20000000 --chunk 1000000
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d import analytics, batch
+from viewer3d.orientation_log import LOG_DTYPE, OrientationRecorder
+
+TOLERANCE = 1e-12
+WRITE_ROWS = 1 << 20  # Registros que se generan y escriben de una vez
+
+def write_log(path, rows, seed=0):
+    # Log de orientaciones con rows registros aleatorios a 1 kHz
+    rng = np.random.default_rng(seed)
+    with OrientationRecorder(path):  # Solo la cabecera
+        pass
+    with open(path, "ab") as file:
+        for start in range(0, rows, WRITE_ROWS):
+            count = min(WRITE_ROWS, rows - start)
+            records = np.empty(count, dtype=LOG_DTYPE)
+            records["timestamp"] = np.arange(start, start + count) / 1000
+            records["quaternion"] = rng.normal(size=(count, 4))
+            file.write(records.tobytes())
+
+def check_output(input_path, output_dir, columns, chunk_rows):
+    # Compara cada columna con la conversión de batch, por bloques para no cargar todo el log
+    source, is_log = analytics.open_input(input_path)
+    for start in range(0, len(source), chunk_rows):
+        stop = min(start + chunk_rows, len(source))
+        quaternions = analytics.read_quaternions(source, is_log, start, stop)
+        for column in columns:
+            output = np.load(analytics._column_path(output_dir, column), mmap_mode="r")[start:stop]
+            if not np.allclose(output, analytics.COLUMNS[column][0](quaternions), rtol=TOLERANCE, atol=TOLERANCE):
+                raise AssertionError(f"{column}: las filas {start}-{stop} no coinciden con batch")
+        timestamps = np.load(analytics._column_path(output_dir, analytics.TIMESTAMP_COLUMN), mmap_mode="r")
+        if not np.array_equal(timestamps[start:stop], source["timestamp"][start:stop]):
+            raise AssertionError(f"timestamp: las filas {start}-{stop} no coinciden con el log")
+
+def scaling(input_path, output_dir, rows, chunk_rows, columns):
+    workers, counts = 1, []
+    while workers <= (os.cpu_count() or 1):
+        counts.append(workers)
+        workers *= 2
+    print(f"{'procesos':>8s} {'segundos':>9s} {'filas/s':>13s} {'aceleración':>11s}")
+    base = None
+    for workers in counts:
+        done, _, seconds = analytics.analyze(input_path, output_dir, columns, workers, chunk_rows,
+                                             restart=True, report=lambda message: None)
+        if done != rows:
+            raise AssertionError(f"{workers} procesos: {done} filas convertidas de {rows}")
+        base = base or seconds
+        print(f"{workers:8d} {seconds:9.2f} {rows / seconds:13,.0f} {base / seconds:10.2f}x")
+
+def resume(input_path, output_dir, rows, chunk_rows, columns):
+    command = [sys.executable, "-m", "viewer3d.analytics", input_path, output_dir, "--restart",
+               "--chunk", str(chunk_rows), "--columns", *columns]
+    environment = dict(os.environ, PYTHONPATH=PROJECT_DIR)
+    shutil.rmtree(output_dir, ignore_errors=True)  # El progreso que se vigila es solo el de este proceso
+    process = subprocess.Popen(command, cwd=PROJECT_DIR, env=environment, start_new_session=True,
+                               stdout=subprocess.DEVNULL)
+    progress_path = os.path.join(output_dir, analytics.PROGRESS)
+    chunks = -(-rows // chunk_rows)
+    while process.poll() is None:
+        if os.path.exists(os.path.join(output_dir, analytics.MANIFEST)):
+            written = int(np.load(progress_path, mmap_mode="r").sum())
+            if written >= chunks // 2:
+                os.killpg(process.pid, signal.SIGKILL)  # Al proceso principal y a sus trabajadores
+                break
+        time.sleep(0.01)
+    process.wait()
+    if process.returncode == 0:
+        raise AssertionError("la conversión terminó antes de poder matarla: usa más filas o bloques más pequeños")
+    written = int(np.load(progress_path, mmap_mode="r").sum())
+    print(f"matado con {written} de {chunks} bloques escritos")
+
+    done, already, seconds = analytics.analyze(input_path, output_dir, columns, chunk_rows=chunk_rows)
+    print(f"reanudado: {done:,d} filas en {seconds:.2f} s")
+    if already == 0 or done + already != rows:
+        raise AssertionError(f"al reanudar se convirtieron {done} filas y ya estaban {already} de {rows}")
+    check_output(input_path, output_dir, columns, chunk_rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversión de logs de orientación con varios procesos")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk", type=int, default=analytics.CHUNK_ROWS, help="filas por bloque")
+    parser.add_argument("--columns", nargs="+", choices=tuple(analytics.COLUMNS), default=analytics.DEFAULT_COLUMNS)
+    parser.add_argument("--directory", default=None, help="donde escribir el log y las columnas (por defecto uno temporal)")
+    args = parser.parse_args()
+
+    directory = args.directory or tempfile.mkdtemp(prefix="bench_analytics_")
+    try:
+        input_path = os.path.join(directory, "sintetico.qlog")
+        output_dir = os.path.join(directory, "columnas")
+        write_log(input_path, args.rows)
+        print(f"{args.rows:,d} registros, bloques de {args.chunk:,d}, tier {batch.KERNEL_TIER}, "
+              f"{os.cpu_count()} núcleos")
+        scaling(input_path, output_dir, args.rows, args.chunk, args.columns)
+        check_output(input_path, output_dir, args.columns, args.chunk)
+        print("columnas iguales a las de batch")
+        resume(input_path, output_dir, args.rows, args.chunk, args.columns)
+        print("reanudación correcta")
+    finally:
+        if args.directory is None:
+            shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
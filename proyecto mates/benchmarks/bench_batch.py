@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Compara las conversiones escalares de viewer3d.rotation (en un bucle de Python)
+# con las versiones vectorizadas de viewer3d.batch y comprueba que coinciden.
+#   python benchmarks/bench_batch.py -n 1000000
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d import batch
+from viewer3d import rotation as scalar
+
+def make_inputs(n, rng):
+    euler = rng.uniform(-np.pi, np.pi, size=(n, 3))
+    euler[:, 1] /= 2  # pitch en (-pi/2, pi/2)
+    quaternion = batch.euler_to_quaternion(euler)
+    rotation_vector = rng.normal(size=(n, 3))
+    R = batch.euler_to_rotation_matrix(euler)
+    return euler, quaternion, rotation_vector, R
+
+def conversions(scalar, euler, quaternion, rotation_vector, R):
+    # (nombre, bucle escalar, llamada vectorizada)
+    return [
+        ("euler_to_quaternion",
+         lambda i: scalar.euler_to_quaternion(*euler[i]),
+         lambda: batch.euler_to_quaternion(euler)),
+        ("quaternion_to_euler_principal",
+         lambda i: scalar.quaternion_to_euler_principal(*quaternion[i]),
+         lambda: batch.quaternion_to_euler_principal(quaternion)),
+        ("queaternion_to_cube_rotationxy",
+         lambda i: scalar.queaternion_to_cube_rotationxy(*quaternion[i]),
+         lambda: batch.quaternion_to_cube_rotationxy(quaternion)),
+        ("euler_principal_to_quaternion",
+         lambda i: scalar.euler_principal_to_quaternion(*euler[i]),
+         lambda: batch.euler_principal_to_quaternion(euler)),
+        ("euler_principal_to_cube_rotationxy",
+         lambda i: scalar.euler_principal_to_cube_rotationxy(*euler[i]),
+         lambda: batch.euler_principal_to_cube_rotationxy(euler)),
+        ("rotation_vector_to_quaternion",
+         lambda i: scalar.rotation_vector_to_quaternion(*rotation_vector[i]),
+         lambda: batch.rotation_vector_to_quaternion(rotation_vector)),
+        ("euler_to_rotation_matrix",
+         lambda i: scalar.euler_to_rotation_matrix(*euler[i]),
+         lambda: batch.euler_to_rotation_matrix(euler)),
+        ("rotation_matrix_to_rotation_vector",
+         lambda i: scalar.rotation_matrix_to_rotation_vector(R[i])[:, 0],
+         lambda: batch.rotation_matrix_to_rotation_vector(R)),
+        ("rotation_matrix_to_cube_rotationxy",
+         lambda i: scalar.rotation_matrix_to_cube_rotationxy(R[i]),
+         lambda: batch.rotation_matrix_to_cube_rotationxy(R)),
+        ("rotation_vector_to_cube_rotationxy",
+         lambda i: scalar.rotation_vector_to_cube_rotationxy(*rotation_vector[i]),
+         lambda: batch.rotation_vector_to_cube_rotationxy(rotation_vector)),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendimiento de las conversiones vectorizadas")
+    parser.add_argument("-n", type=int, default=1_000_000, help="muestras para la versión vectorizada")
+    parser.add_argument("--scalar-n", type=int, default=20_000, help="muestras para el bucle escalar")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    inputs = make_inputs(args.n, rng)
+
+    print(f"{'conversión':36s} {'escalar (muestras/s)':>22s} {'vectorizada (muestras/s)':>25s} {'aceleración':>12s}")
+    for name, scalar_call, batch_call in conversions(scalar, *inputs):
+        scalar_n = min(args.scalar_n, args.n)
+        start = time.perf_counter()
+        expected = np.array([np.ravel(scalar_call(i)) for i in range(scalar_n)])
+        scalar_rate = scalar_n / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        result = batch_call()
+        batch_rate = args.n / (time.perf_counter() - start)
+
+        result = result.reshape(args.n, -1)[:scalar_n]
+        if not np.allclose(result, expected, equal_nan=True):
+            raise AssertionError(f"{name}: la versión vectorizada no coincide con la escalar")
+
+        print(f"{name:36s} {scalar_rate:22,.0f} {batch_rate:25,.0f} {batch_rate/scalar_rate:11.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Descarte por frustum de N esferas repartidas en un cubo de lado 40 alrededor de la figura:
+# BoundingVolumeHierarchy.visible contra probar todas las esferas con sphere_visibility, con
+# varios fov (la rueda del mouse llega a 1°). Comprueba que los dos dan las mismas esferas.
+#   python benchmarks/bench_culling.py --counts 10000 100000 1000000
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d.culling import BoundingVolumeHierarchy, frustum_planes, sphere_visibility
+from viewer3d.software import model_view_projection
+
+FOVS = (1, 10, 45, 120)
+ORIENTATION = (30, 40)  # Ángulos de Euler de la cámara sobre la escena, en grados
+
+def best_time(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description="Frustum culling con un BVH contra la prueba de todas las esferas")
+    parser.add_argument("--counts", type=int, nargs="+", default=(10_000, 100_000, 1_000_000))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'esferas':>10s} {'fov':>4s} {'visibles':>9s} {'probadas':>9s} {'BVH (ms)':>9s} {'todas (ms)':>11s}")
+    for count in args.counts:
+        centers = rng.uniform(-20, 20, size=(count, 3))
+        radii = rng.uniform(0.01, 0.3, size=count)
+        start = time.perf_counter()
+        hierarchy = BoundingVolumeHierarchy(centers, radii)
+        print(f"{count:10,d} construcción del BVH: {time.perf_counter() - start:.2f} s, {len(hierarchy.starts):,d} nodos")
+        for fov in FOVS:
+            planes = frustum_planes(model_view_projection(ORIENTATION, fov, 4 / 3))
+            visible, bvh_seconds = best_time(lambda: hierarchy.visible(planes), args.repeat)
+            (outside, _), brute_seconds = best_time(lambda: sphere_visibility(planes, centers, radii), args.repeat)
+            if not np.array_equal(visible, np.flatnonzero(~outside)):
+                raise AssertionError(f"{count} esferas, fov {fov}: el BVH no da las mismas esferas visibles")
+            print(f"{count:10,d} {fov:4d} {len(visible):9,d} {hierarchy.stats.tested:9,d}"
+                  f" {bvh_seconds * 1000:9.2f} {brute_seconds * 1000:11.2f}")
+
+if __name__ == "__main__":
+    main()
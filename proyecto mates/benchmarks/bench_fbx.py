@@ -0,0 +1,93 @@
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+
+import numpy as np
+
+# Tiempo de carga y memoria máxima del lector de FBX, con el Cube.FBX del proyecto
+# y con una malla grande generada en formato FBX 7.4 con arrays comprimidos.
+#   python benchmarks/bench_fbx.py --grid 1000
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d.fbx import FBX_MAGIC, load_fbx
+
+def _array_property(type_code, values):
+    data = zlib.compress(values.tobytes(), 1)
+    return type_code + struct.pack("<III", len(values), 1, len(data)) + data
+
+def _string_property(text):
+    data = text.encode()
+    return b"S" + struct.pack("<I", len(data)) + data
+
+def _write_node(out, name, properties, children=()):
+    start = len(out)
+    out += struct.pack("<IIIB", 0, len(properties), 0, len(name)) + name.encode()
+    property_start = len(out)
+    for prop in properties:
+        out += prop
+    struct.pack_into("<I", out, start + 8, len(out) - property_start)
+    for child in children:
+        _write_node(out, *child)
+    if children:
+        out += b"\0" * 13
+    struct.pack_into("<I", out, start, len(out))
+
+def write_grid_fbx(path, n):
+    # Plano de n×n quads con relieve, guardado como Objects/Geometry de un FBX 7.4
+    u, v = np.meshgrid(np.linspace(-1, 1, n + 1), np.linspace(-1, 1, n + 1))
+    vertices = np.stack([u, v, 0.1*np.sin(4*u)*np.cos(4*v)], axis=-1).reshape(-1)
+
+    corner = (np.arange(n)[:, None]*(n + 1) + np.arange(n)[None, :]).reshape(-1)
+    quads = np.stack([corner, corner + 1, corner + n + 2, corner + n + 1], axis=1).astype(np.int32)
+    quads[:, 3] = ~quads[:, 3]
+
+    geometry = ("Geometry", [b"L" + struct.pack("<q", 1), _string_property("Grid\0\1Geometry"), _string_property("Mesh")], [
+        ("Vertices", [_array_property(b"d", vertices)]),
+        ("PolygonVertexIndex", [_array_property(b"i", quads.reshape(-1))]),
+    ])
+    out = bytearray(FBX_MAGIC + b"\x1a\x00" + struct.pack("<I", 7400))
+    _write_node(out, "Objects", [], [geometry])
+    out += b"\0" * 13
+    with open(path, "wb") as file:
+        file.write(out)
+
+def measure(path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        mesh = load_fbx(path)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    load_fbx(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return mesh, best, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga de archivos FBX binarios")
+    parser.add_argument("--grid", type=int, default=1000, help="lado de la malla generada (grid×grid quads)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        grid_path = os.path.join(directory, "grid.fbx")
+        write_grid_fbx(grid_path, args.grid)
+        paths = [os.path.join(PROJECT_DIR, "Cube.FBX"), grid_path]
+
+        print(f"{'archivo':12s} {'MB':>8s} {'triángulos':>12s} {'carga (ms)':>12s} {'pico (MB)':>10s}")
+        for path in paths:
+            mesh, seconds, peak = measure(path, args.repeat)
+            size = os.path.getsize(path) / 2**20
+            print(f"{os.path.basename(path):12s} {size:8.1f} {len(mesh.triangles):12,d} {seconds*1000:12.1f} {peak/2**20:10.1f}")
+        if len(mesh.triangles) != 2*args.grid**2:
+            raise AssertionError("la malla generada no se trianguló correctamente")
+
+if __name__ == "__main__":
+    main()
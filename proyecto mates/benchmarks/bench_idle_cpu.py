@@ -0,0 +1,63 @@
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+# Uso de CPU del visor inactivo: bucle continuo contra modo bajo demanda (--on-demand).
+# Cada modo se lanza como proceso aparte. En Linux se mide el tiempo de CPU de /proc/<pid>/stat
+# después del arranque; en otros sistemas, el de todo el proceso con getrusage.
+#   python benchmarks/bench_idle_cpu.py --seconds 10
+#   python benchmarks/bench_idle_cpu.py --offscreen   (sin pantalla, con el driver offscreen de SDL y EGL)
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIEWER = os.path.join(PROJECT_DIR, "ventana 3d.py")
+
+def process_cpu_seconds(pid):
+    # utime y stime (campos 14 y 15) en ticks de reloj; el nombre del proceso va entre paréntesis
+    with open(f"/proc/{pid}/stat") as file:
+        fields = file.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def children_cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+def measure(arguments, seconds, warmup, environment):
+    before = children_cpu_seconds()
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, VIEWER, *arguments], env=environment,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(warmup)
+        idle_start, idle_cpu = time.perf_counter(), process_cpu_seconds(process.pid)
+        time.sleep(seconds)
+        percent = (process_cpu_seconds(process.pid) - idle_cpu) / (time.perf_counter() - idle_start) * 100
+    except OSError:
+        time.sleep(seconds)
+        percent = None
+    process.terminate()
+    process.wait()
+    if percent is None:
+        percent = (children_cpu_seconds() - before) / (time.perf_counter() - start) * 100
+    return percent
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU del visor inactivo según el modo de render")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=3, help="segundos de arranque que no se miden")
+    parser.add_argument("--offscreen", action="store_true", help="usa SDL offscreen y EGL en vez de una ventana real")
+    args = parser.parse_args()
+
+    environment = dict(os.environ)
+    if args.offscreen:
+        environment.update(SDL_VIDEODRIVER="offscreen", EGL_PLATFORM="surfaceless", PYOPENGL_PLATFORM="egl")
+
+    modes = [("continuo (60 FPS)", []), ("continuo sin límite", ["--fps", "0"]), ("bajo demanda", ["--on-demand"])]
+    print(f"{'modo':22s} {'CPU (%)':>8s}")
+    for name, arguments in modes:
+        print(f"{name:22s} {measure(arguments, args.seconds, args.warmup, environment):8.1f}")
+
+if __name__ == "__main__":
+    main()
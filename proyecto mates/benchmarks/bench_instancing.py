@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Frames por segundo de una flota de cubos con orientaciones que cambian en cada frame (así se
+# sube el buffer de instancias en todos), dibujada sin ventana con EGL: el camino con instancing
+# (un shader, glDrawElementsInstanced) contra el lote calculado con NumPy (BatchedGLMesh).
+# También comprueba que los dos dan la misma imagen. Con Mesa sin GPU mide llvmpipe.
+#   python benchmarks/bench_instancing.py --counts 1000 10000 30000
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d.headless import HeadlessRenderer  # Antes que OpenGL: elige la plataforma EGL
+from viewer3d import gl_instancing
+from viewer3d.figures import Cube, FleetFigure
+from viewer3d.instancing import Fleet, random_quaternions
+from viewer3d.interpolation import quaternion_multiply
+
+SPIN = np.array([0, np.sin(0.01), 0, np.cos(0.01)])  # Cada instancia gira 1,15° por frame alrededor de y
+
+def frame_rate(renderer, figure, frames):
+    # Frames por segundo de render (incluye glReadPixels), girando todas las instancias en cada frame
+    fleet = figure.fleet
+    orientations = fleet.instances[:, :4].astype(np.float64)
+    renderer.render(figure, (20, 30))  # Crea los buffers y compila el shader fuera de la medida
+    start = time.perf_counter()
+    for _ in range(frames):
+        orientations = quaternion_multiply(orientations, SPIN)
+        fleet.set_orientations(orientations)
+        renderer.render(figure, (20, 30))
+    return frames / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Flota de cubos con instancing y con un lote en la CPU")
+    parser.add_argument("--counts", type=int, nargs="+", default=(1000, 10000, 30000))
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--size", type=int, nargs=2, default=(800, 600))
+    args = parser.parse_args()
+
+    with HeadlessRenderer(*args.size) as renderer:
+        print(f"{'instancias':>10s} {'instancing (FPS)':>17s} {'lote CPU (FPS)':>15s} {'buffer/frame':>13s}")
+        for count in args.counts:
+            rates = {}
+            images = {}
+            for renderer_class in (gl_instancing.InstancedGLMesh, gl_instancing.BatchedGLMesh):
+                cube = Cube()
+                fleet = Fleet(random_quaternions(count))
+                fleet._renderers[cube] = renderer_class(cube.mesh())  # Fuerza el camino que se mide
+                figure = FleetFigure(cube, fleet)
+                images[renderer_class] = renderer.render(figure, (20, 30)).copy()
+                rates[renderer_class] = frame_rate(renderer, figure, args.frames)
+                fleet.delete()
+            instanced, batched = images.values()
+            different = np.mean(np.abs(instanced.astype(int) - batched).max(axis=-1) > 40)
+            if different > 1e-3:
+                raise AssertionError(f"{count} instancias: los dos caminos difieren en el {different:.1%} de los píxeles")
+            print(f"{count:10,d} {rates[gl_instancing.InstancedGLMesh]:17.1f} {rates[gl_instancing.BatchedGLMesh]:15.1f}"
+                  f" {fleet.instances.nbytes / 1024:10.0f} KB")
+
+if __name__ == "__main__":
+    main()
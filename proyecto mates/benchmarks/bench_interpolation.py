@@ -0,0 +1,96 @@
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Suite de pytest-benchmark de viewer3d.interpolation: cuánto tarda resample en pasar N keyframes
+# a una línea de tiempo de frames a 60 FPS, con SLERP y con SQUAD, frente a un bucle de Python
+# que interpola frame a frame. Además comprueba que la versión vectorizada coincide con el bucle
+# y que las curvas pasan por los keyframes.
+#   python -m pytest benchmarks/bench_interpolation.py
+#   python -m pytest benchmarks/bench_interpolation.py --benchmark-disable   (solo las comprobaciones)
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d import interpolation
+
+FPS = 60
+KEYFRAME_INTERVAL = 0.5  # Segundos entre keyframes
+SIZES = (1_000, 10_000)
+LOOP_KEYFRAMES = 100  # El bucle de Python solo se mide con pocos keyframes
+TOLERANCE = 1e-12
+
+def make_keyframes(n, seed=0):
+    rng = np.random.default_rng(seed)
+    keyframes = rng.normal(size=(n, 4))
+    keyframes /= np.linalg.norm(keyframes, axis=1, keepdims=True)
+    times = np.arange(n) * KEYFRAME_INTERVAL
+    frame_times = np.arange(0, times[-1], 1 / FPS)
+    return times, keyframes, frame_times
+
+def python_slerp(q0, q1, t):
+    # SLERP de un solo par con math, como se escribiría sin vectorizar
+    dot = sum(a*b for a, b in zip(q0, q1))
+    if dot < 0:
+        q1, dot = [-b for b in q1], -dot
+    angle = math.acos(min(dot, 1.0))
+    if math.sin(angle) < interpolation.SLERP_EPSILON:
+        q = [a + t*(b - a) for a, b in zip(q0, q1)]
+    else:
+        w0 = math.sin((1 - t)*angle) / math.sin(angle)
+        w1 = math.sin(t*angle) / math.sin(angle)
+        q = [w0*a + w1*b for a, b in zip(q0, q1)]
+    norm = math.sqrt(sum(c*c for c in q))
+    return [c / norm for c in q]
+
+def python_resample(times, keyframes, frame_times):
+    # Un frame cada vez: busca el tramo y lo interpola
+    times, keyframes = times.tolist(), keyframes.tolist()
+    result = []
+    segment = 0
+    for time in frame_times.tolist():
+        while segment < len(times) - 2 and times[segment + 1] <= time:
+            segment += 1
+        t = (time - times[segment]) / (times[segment + 1] - times[segment])
+        result.append(python_slerp(keyframes[segment], keyframes[segment + 1], min(max(t, 0.0), 1.0)))
+    return result
+
+@pytest.mark.parametrize("method", ("slerp", "squad"))
+@pytest.mark.parametrize("keyframes", SIZES)
+def test_resample_speed(benchmark, keyframes, method):
+    times, values, frame_times = make_keyframes(keyframes)
+    benchmark.group = f"{keyframes} keyframes"
+    benchmark.extra_info["frames"] = len(frame_times)
+    result = benchmark(interpolation.resample, times, values, frame_times, method)
+    assert result.shape == (len(frame_times), 4)
+
+def test_python_loop_speed(benchmark):
+    times, values, frame_times = make_keyframes(LOOP_KEYFRAMES)
+    benchmark.group = "bucle de Python"
+    benchmark.extra_info["frames"] = len(frame_times)
+    benchmark(python_resample, times, values, frame_times)
+
+def test_resample_matches_python_loop():
+    times, values, frame_times = make_keyframes(LOOP_KEYFRAMES)
+    expected = np.array(python_resample(times, values, frame_times))
+    result = interpolation.resample(times, values, frame_times)
+    # El bucle usa el camino más corto en cada tramo y resample alinea los keyframes antes: mismo giro, signo quizá distinto
+    result *= np.sign(np.sum(result * expected, axis=1))[:, None]
+    np.testing.assert_allclose(result, expected, atol=1e-9)
+
+@pytest.mark.parametrize("method", ("slerp", "squad"))
+def test_curves_pass_through_keyframes(method):
+    times, values, frame_times = make_keyframes(LOOP_KEYFRAMES)
+    result = interpolation.resample(times, values, times, method)
+    np.testing.assert_allclose(result, interpolation.align_hemispheres(values), atol=TOLERANCE)
+    result = interpolation.resample(times, values, frame_times, method)
+    np.testing.assert_allclose(np.linalg.norm(result, axis=1), 1, atol=TOLERANCE)
+
+def test_slerp_has_constant_angular_speed():
+    times, values, frame_times = make_keyframes(2)
+    steps = interpolation.slerp(values[0], values[1], np.linspace(0, 1, 101))
+    angles = np.arccos(np.clip(np.abs(np.sum(steps[1:] * steps[:-1], axis=1)), -1, 1))
+    np.testing.assert_allclose(angles, angles[0], atol=1e-9)
@@ -0,0 +1,113 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# Las conversiones de viewer3d.batch con NumPy contra los núcleos compilados con numba
+# (viewer3d.batch_numba) para N = 1, 1e3, 1e6 y 1e8 filas: tiempo por llamada, nanosegundos por fila
+# y memoria de pico de una llamada (tracemalloc ve los arrays de NumPy, también los intermedios).
+# Comprueba que los dos tiers dan lo mismo. Los núcleos se llaman directamente, también los de
+# SIMD_BOUND (marcados con *), que batch solo usa con pocas filas o con varios hilos. Las N que no
+# caben en memoria se miden en llamadas de --chunk filas sobre el mismo bloque, que dan el mismo
+# tiempo por fila que una llamada entera.
+# Sin numba instalado solo se mide NumPy.
+#   python benchmarks/bench_kernels.py --sizes 1 1000 1000000 100000000
+#   python benchmarks/bench_kernels.py --conversions euler_to_quaternion --sizes 1000000
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d import batch
+
+MIN_SECONDS = 0.2  # Con pocas filas se repite la llamada hasta tardar al menos esto
+TOLERANCE = 1e-12
+
+def make_input(conversion, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    if conversion.startswith(("quaternion", "axis_angle")):
+        values = rng.normal(size=(rows, 4))
+        values /= np.linalg.norm(values, axis=1, keepdims=True)
+        if conversion.startswith("axis_angle"):
+            values[:, 0] = rng.uniform(0, 2*np.pi, rows)
+            values[:, 1:] /= np.linalg.norm(values[:, 1:], axis=1, keepdims=True)
+        return values
+    euler = rng.uniform(-np.pi, np.pi, size=(rows, 3))
+    if conversion.startswith("rotation_matrix"):
+        return batch.NUMPY_CONVERSIONS["euler_to_rotation_matrix"](euler)
+    return euler
+
+def seconds_per_call(function, values, calls=None):
+    # Con calls se hacen esas llamadas; sin él, las que quepan en MIN_SECONDS (al menos una)
+    function(values)  # Compila (o carga de la caché) fuera de la medida
+    done, start = 0, time.perf_counter()
+    while (calls is None and time.perf_counter() - start < MIN_SECONDS) or (calls is not None and done < calls):
+        function(values)
+        done += 1
+    return (time.perf_counter() - start) / done
+
+def peak_bytes(function, values):
+    tracemalloc.start()
+    function(values)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def compiled_call(conversion):
+    # El núcleo de la conversión para filas (N, ...) contiguas, en serie o en paralelo como en batch
+    from viewer3d import batch_numba
+
+    (serial, parallel), row_in, row_out = batch_numba.KERNELS[conversion]
+
+    def convert(values):
+        out = np.empty((len(values),) + row_out)
+        (parallel if len(values) >= batch_numba.PARALLEL_ROWS else serial)(values, out)
+        return out
+    return convert
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversiones de batch con NumPy y con numba")
+    parser.add_argument("--sizes", type=float, nargs="+", default=(1, 1e3, 1e6, 1e8))
+    parser.add_argument("--conversions", nargs="+", default=batch.CONVERSIONS, choices=batch.CONVERSIONS)
+    parser.add_argument("--chunk", type=int, default=1 << 22, help="filas por llamada para las N mayores")
+    args = parser.parse_args()
+
+    tiers = {"numpy": batch.NUMPY_CONVERSIONS}
+    simd_bound = set()
+    if batch.COMPILED_CONVERSIONS is not None:
+        from viewer3d import batch_numba
+        tiers["numba"] = {conversion: compiled_call(conversion) for conversion in batch.CONVERSIONS}
+        simd_bound = batch_numba.SIMD_BOUND
+        print(f"hilos de numba: {batch_numba.THREADS}")
+    print(f"tier por defecto: {batch.KERNEL_TIER}")
+    header = f"{'conversión':36s} {'N':>11s}"
+    for tier in tiers:
+        header += f" {tier + ' µs/llamada':>18s} {'ns/fila':>8s} {'pico MB':>8s}"
+    print(header + (f" {'aceleración':>11s}" if len(tiers) > 1 else ""))
+
+    for conversion in args.conversions:
+        for size in map(int, args.sizes):
+            rows = min(size, args.chunk)
+            values = make_input(conversion, rows)
+            calls = size // rows if size > rows else None
+            marked = conversion + ("*" if conversion in simd_bound else "")
+            line = f"{marked:36s} {size:11,d}"
+            results, seconds = [], []
+            for functions in tiers.values():
+                function = functions[conversion]
+                per_call = seconds_per_call(function, values, calls)
+                total = per_call * (calls or 1)
+                seconds.append(total)
+                results.append(function(values))
+                line += f" {total * 1e6:18.1f} {total / size * 1e9:8.2f} {peak_bytes(function, values) / 2**20:8.1f}"
+            if len(seconds) > 1:
+                line += f" {seconds[0] / seconds[1]:10.1f}x"
+                if not np.allclose(results[0], results[1], rtol=TOLERANCE, atol=TOLERANCE):
+                    raise AssertionError(f"{conversion}: numba no coincide con NumPy")
+            print(line)
+            del values, results
+
+if __name__ == "__main__":
+    main()
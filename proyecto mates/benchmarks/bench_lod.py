@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Niveles de detalle de un modelo denso (un plano con relieve de n×n quads guardado como FBX):
+# tiempo de simplificación y de carga desde la caché, y para cada zoom (fov) el nivel elegido,
+# los triángulos que se mandan a OpenGL y el tiempo por frame, contra dibujar siempre la malla
+# entera. Se dibuja sin ventana con EGL; con Mesa sin GPU mide llvmpipe.
+#   python benchmarks/bench_lod.py --grid 400 --fovs 10 45 90 135 170
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, os.path.join(PROJECT_DIR, "benchmarks"))
+
+from viewer3d.headless import HeadlessRenderer  # Antes que OpenGL: elige la plataforma EGL
+from viewer3d.figures import MeshFigure, load_model_figure
+from viewer3d.mesh import Mesh
+from bench_fbx import write_grid_fbx
+
+ORIENTATION = (-60, 20)  # Ángulos de Euler del modelo, en grados
+
+def frame_time(renderer, figure, frames):
+    # Segundos por frame de render (incluye glReadPixels)
+    renderer.render(figure, ORIENTATION)  # Sube el nivel a la GPU fuera de la medida
+    start = time.perf_counter()
+    for _ in range(frames):
+        renderer.render(figure, ORIENTATION)
+    return (time.perf_counter() - start) / frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Niveles de detalle por zoom contra la malla entera")
+    parser.add_argument("--grid", type=int, default=400, help="quads por lado del modelo")
+    parser.add_argument("--fovs", type=float, nargs="+", default=(10, 45, 90, 135, 170))
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--size", type=int, nargs=2, default=(800, 600))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "grid.fbx")
+        write_grid_fbx(path, args.grid)
+        start = time.perf_counter()
+        mesh = load_model_figure(path).mesh()
+        print(f"carga y simplificación: {time.perf_counter() - start:.2f} s")
+        start = time.perf_counter()
+        mesh = load_model_figure(path).mesh()
+        print(f"carga desde la caché: {(time.perf_counter() - start) * 1000:.1f} ms")
+        print(f"{'nivel':>5s} {'error':>7s} {'triángulos':>11s}")
+        print(f"{0:5d} {0:7.4f} {len(mesh.triangles):11,d}")
+        for level, (error, lod) in enumerate(mesh.lods, 1):
+            print(f"{level:5d} {error:7.4f} {len(lod.triangles):11,d}")
+
+        with HeadlessRenderer(*args.size) as renderer:
+            figure = MeshFigure(mesh)
+            full = MeshFigure(Mesh(mesh.positions, mesh.triangles, mesh.edges, mesh.colors))  # Sin niveles
+            print(f"{'fov':>5s} {'nivel':>5s} {'triángulos':>11s} {'LOD (ms)':>9s} {'entera (ms)':>12s}")
+            previous = 0
+            for fov in sorted(args.fovs):
+                renderer.fov = fov
+                lod_seconds = frame_time(renderer, figure, args.frames)
+                full_seconds = frame_time(renderer, full, args.frames)
+                if figure.lod_level < previous:
+                    raise AssertionError(f"fov {fov}: con más zoom hacia fuera se eligió un nivel más detallado")
+                previous = figure.lod_level
+                print(f"{fov:5.0f} {figure.lod_level:5d} {figure.triangles_submitted:11,d}"
+                      f" {lod_seconds * 1000:9.1f} {full_seconds * 1000:12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Carga en frío (lectura del FBX + escritura de la caché) contra carga en caliente (np.memmap)
+# de la caché de mallas, con el Cube.FBX del proyecto y con una malla grande generada.
+#   python benchmarks/bench_mesh_cache.py --grid 1000
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from bench_fbx import write_grid_fbx
+from viewer3d.fbx import load_fbx
+from viewer3d.mesh_cache import CACHE_DIRECTORY, load_cached
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga en frío y en caliente de la caché de mallas")
+    parser.add_argument("--grid", type=int, default=1000, help="lado de la malla generada (grid×grid quads)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copy2(os.path.join(os.path.dirname(BENCHMARK_DIR), "Cube.FBX"), directory)
+        write_grid_fbx(os.path.join(directory, "grid.fbx"), args.grid)
+
+        print(f"{'archivo':12s} {'triángulos':>12s} {'frío (ms)':>10s} {'caliente (ms)':>14s} {'aceleración':>12s}")
+        for name in ("Cube.FBX", "grid.fbx"):
+            path = os.path.join(directory, name)
+            shutil.rmtree(os.path.join(directory, CACHE_DIRECTORY), ignore_errors=True)
+            cold_mesh, cold = timed(lambda: load_cached(path, load_fbx))
+            warm = float("inf")
+            for _ in range(args.repeat):
+                warm_mesh, seconds = timed(lambda: load_cached(path, load_fbx))
+                warm = min(warm, seconds)
+            for attribute in ("positions", "triangles", "edges"):
+                if not np.array_equal(getattr(cold_mesh, attribute), getattr(warm_mesh, attribute)):
+                    raise AssertionError(f"{name}: la caché no reproduce {attribute}")
+            print(f"{name:12s} {len(warm_mesh.triangles):12,d} {cold*1000:10.1f} {warm*1000:14.2f} {cold/warm:11.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# Coste de arrastrar el ratón en alter ventana 3d.py: cada evento MOUSEMOTION lee euler_angles,
+# llama a set_from_euler_angles y el frame vuelve a leer euler_angles para los glRotatef.
+# Compara Rotation (representaciones perezosas, __slots__) con LegacyRotation, la clase de antes
+# (atributos en __dict__ y las cuatro representaciones recalculadas en cada set_from_*).
+# Los visores ya no hacen ese recorrido: la última fila mide el camino actual, el arcball que compone
+# el cuaternión directamente y la matriz para glMultMatrixf escrita en su buffer.
+#   python benchmarks/bench_mouse_drag.py --events 200000 --instances 1000000
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d.arcball import Arcball
+from viewer3d.rotation import Rotation
+from viewer3d.transforms import gl_rotation_matrix, new_gl_matrix
+
+class LegacyRotation:
+    # Las conversiones son las mismas funciones de Rotation; solo cambia cuándo se calculan y dónde se guardan
+    quaternion_to_euler_principal = Rotation.quaternion_to_euler_principal
+    quaternion_to_euler_angles = Rotation.quaternion_to_euler_angles
+    quaternion_to_rotation_vector = Rotation.quaternion_to_rotation_vector
+    quaternion_to_rotation_matrix = Rotation.quaternion_to_rotation_matrix
+
+    def __init__(self):
+        self.quaternion = [0, 0, 0, 1]
+        self.update_all_from_quaternion()
+
+    def update_all_from_quaternion(self):
+        self.euler_principal = self.quaternion_to_euler_principal()
+        self.euler_angles = self.quaternion_to_euler_angles()
+        self.rotation_vector = self.quaternion_to_rotation_vector()
+        self.rotation_matrix = self.quaternion_to_rotation_matrix()
+
+    def set_from_euler_angles(self, x, y, z):
+        Rotation.set_from_euler_angles(self, x, y, z)
+        self.update_all_from_quaternion()
+
+def drag(rotation, events):
+    # Lo mismo que hace el bucle principal con cada MOUSEMOTION (un frame por evento)
+    for i in range(events):
+        roll, pitch, yaw = rotation.euler_angles
+        roll -= 0.001 * (i % 7 - 3)
+        pitch -= 0.001 * (i % 5 - 2)
+        rotation.set_from_euler_angles(roll, pitch, yaw)
+        roll, pitch, yaw = rotation.euler_angles  # glRotatef del frame
+
+def arcball_drag(rotation, events):
+    # Lo que hacen ahora los visores con cada MOUSEMOTION y su frame
+    arcball = Arcball(800, 600)
+    matrix = new_gl_matrix()
+    arcball.press(400, 300)
+    for i in range(events):
+        rotation.set_from_quaternion(arcball.drag(rotation.quaternion, 400 + i % 7 - 3, 300 + i % 5 - 2))
+        gl_rotation_matrix(rotation.quaternion, matrix)  # glMultMatrixf del frame
+
+def arcball_cost(events, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        rotation = Rotation()
+        start = time.perf_counter()
+        arcball_drag(rotation, events)
+        best = min(best, time.perf_counter() - start)
+    return best / events
+
+def drag_cost(rotation_class, events, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        rotation = rotation_class()
+        start = time.perf_counter()
+        drag(rotation, events)
+        best = min(best, time.perf_counter() - start)
+    return best / events
+
+def bytes_per_instance(rotation_class, instances):
+    # Memoria de muchas rotaciones ya usadas (con un cambio y una lectura de euler_angles cada una)
+    tracemalloc.start()
+    rotations = []
+    for i in range(instances):
+        rotation = rotation_class()
+        rotation.set_from_euler_angles(i * 1e-6, 0.5, 0.25)
+        rotation.euler_angles
+        rotations.append(rotation)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / instances
+
+def main():
+    parser = argparse.ArgumentParser(description="Coste de arrastrar el ratón con Rotation")
+    parser.add_argument("--events", type=int, default=200_000, help="eventos MOUSEMOTION simulados")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--instances", type=int, default=200_000, help="rotaciones para medir la memoria")
+    args = parser.parse_args()
+
+    print(f"{'clase':16s} {'µs por evento':>14s} {'bytes por rotación':>19s}")
+    results = {}
+    for rotation_class in (LegacyRotation, Rotation):
+        seconds = drag_cost(rotation_class, args.events, args.repeat)
+        size = bytes_per_instance(rotation_class, args.instances)
+        results[rotation_class] = seconds, size
+        print(f"{rotation_class.__name__:16s} {seconds*1e6:14.2f} {size:19.0f}")
+
+    (old_seconds, old_size), (new_seconds, new_size) = results[LegacyRotation], results[Rotation]
+    print(f"Rotation es {old_seconds/new_seconds:.1f}x más rápida por evento y ocupa {old_size/new_size:.1f}x menos")
+
+    seconds = arcball_cost(args.events, args.repeat)
+    print(f"{'arcball':16s} {seconds*1e6:14.2f}   (cuaternión + matriz para glMultMatrixf, sin ángulos de Euler)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Coste de medir las etapas del frame con FrameProfiler: un frame de mentira con las 7 etapas del
+# visor (sin trabajo dentro) sin profiler, con el profiler desactivado (lo que cuesta siempre) y
+# activado, y con la exportación a CSV y a JSON. Comprueba que los archivos exportados tienen una
+# fila por frame con todas las columnas.
+#   python benchmarks/bench_profiler.py --frames 100000
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d.profiler import FrameProfiler, TOTAL_COLUMN
+
+STAGES = ("events", "commands", "input", "publish", "draw", "flip", "wait")
+
+def bare_frames(frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        for _ in STAGES:
+            pass
+    return time.perf_counter() - start
+
+def profiled_frames(profiler, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        for name in STAGES:
+            with profiler.stage(name):
+                pass
+        profiler.end_frame()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Coste del profiler de etapas del frame")
+    parser.add_argument("--frames", type=int, default=100_000)
+    args = parser.parse_args()
+
+    bare = bare_frames(args.frames)
+    print(f"{'modo':>12s} {'µs/frame':>9s} {'sobrecoste (µs/frame)':>22s}")
+    print(f"{'sin profiler':>12s} {bare / args.frames * 1e6:9.3f} {0:22.3f}")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode, path, enabled in (("desactivado", None, False), ("activado", None, True),
+                                    ("CSV", os.path.join(directory, "frames.csv"), True),
+                                    ("JSON", os.path.join(directory, "frames.json"), True)):
+            profiler = FrameProfiler(STAGES, export_path=path, enabled=enabled)
+            seconds = profiled_frames(profiler, args.frames)
+            profiler.close()
+            print(f"{mode:>12s} {seconds / args.frames * 1e6:9.3f} {(seconds - bare) / args.frames * 1e6:22.3f}")
+
+            if path is None:
+                continue
+            if path.endswith(".csv"):
+                with open(path, newline="") as file:
+                    rows = list(csv.reader(file))
+                header, rows = rows[0], rows[1:]
+            else:
+                with open(path) as file:
+                    document = json.load(file)
+                header, rows = document["columns"], document["frames"]
+                if set(document["percentiles"]) != set(STAGES + (TOTAL_COLUMN,)):
+                    raise AssertionError("el JSON no tiene los percentiles de todas las etapas")
+            if len(rows) != args.frames or any(len(row) != len(header) for row in rows):
+                raise AssertionError(f"{mode}: se esperaban {args.frames} filas de {len(header)} columnas")
+        print("\n".join(profiler.summary_lines()))
+
+if __name__ == "__main__":
+    main()
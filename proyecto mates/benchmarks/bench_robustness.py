@@ -0,0 +1,210 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Conversiones en los casos difíciles: ángulos nulos, diminutos (hasta subnormales), justo a los dos
+# lados de SERIES_THRESHOLD, cerca de 180 grados y de la vuelta entera, ejes alineados con los ejes
+# de coordenadas, bloqueo de cardán, cuaterniones con w < 0 y matrices con ruido de redondeo.
+# Las pruebas son propiedades que tienen que cumplirse en todas las muestras (resultados finitos,
+# ida y vuelta, error relativo pequeño, las tres implementaciones de acuerdo), y las de velocidad
+# miden las versiones vectorizadas con entradas aleatorias y con las difíciles: sin casos especiales
+# por fila, las dos tienen que ir igual de rápido.
+#   python -m pytest benchmarks/bench_robustness.py
+#   python -m pytest benchmarks/bench_robustness.py --benchmark-disable   (solo las propiedades)
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d import batch
+from viewer3d import rotation as scalar
+from viewer3d.rotation import SERIES_THRESHOLD, Rotation
+
+THROUGHPUT_SAMPLES = 100_000
+NOISE = 1e-15  # Ruido de redondeo que se añade a las matrices
+
+ANGLES = np.array([0, 5e-324, 1e-300, 1e-160, 1e-20, 1e-12, 1e-8, 1e-6,
+                   SERIES_THRESHOLD * (1 - 1e-12), SERIES_THRESHOLD, SERIES_THRESHOLD * (1 + 1e-12),
+                   1e-2, 0.5, np.pi/2, np.pi - 1e-6, np.pi - 1e-12, np.pi, np.pi + 1e-12,
+                   2*np.pi - 1e-9, 2*np.pi])
+
+def adversarial_rotation_vectors(seed=0, random_samples=200):
+    # Todos los ángulos de ANGLES con ejes de coordenadas, diagonales y aleatorios, más rotaciones aleatorias
+    rng = np.random.default_rng(seed)
+    axes = np.concatenate([np.eye(3), -np.eye(3), [[1, 1, 1], [1, -1, 0]], rng.normal(size=(4, 3))])
+    axes /= np.linalg.norm(axes, axis=1, keepdims=True)
+    vectors = (ANGLES[:, None, None] * axes[None]).reshape(-1, 3)
+    random = rng.normal(size=(random_samples, 3))
+    random *= rng.uniform(0, 2*np.pi, size=(random_samples, 1)) / np.linalg.norm(random, axis=1, keepdims=True)
+    return np.concatenate([vectors, random])
+
+def adversarial_quaternions(seed=0):
+    # Los de los vectores de rotación, los mismos con el signo cambiado (w < 0) y el bloqueo de cardán
+    q = batch.rotation_vector_to_quaternion(adversarial_rotation_vectors(seed))
+    pitch = np.array([np.pi/2, -np.pi/2, np.pi/2 - 1e-9, -np.pi/2 + 1e-12])
+    rng = np.random.default_rng(seed)
+    gimbal = np.stack([rng.uniform(-np.pi, np.pi, len(pitch)), pitch, rng.uniform(-np.pi, np.pi, len(pitch))], axis=1)
+    return np.concatenate([q, -q, batch.euler_to_quaternion(gimbal)])
+
+def adversarial_matrices(seed=0):
+    # Las matrices de los cuaterniones, y las mismas con ruido de redondeo (la traza puede pasar de 3 o de -1)
+    R = batch.quaternion_to_rotation_matrix(adversarial_quaternions(seed))
+    rng = np.random.default_rng(seed)
+    return np.concatenate([R, R + rng.uniform(-NOISE, NOISE, size=R.shape)])
+
+def align_quaternions(q):
+    # q y -q son la misma rotación: se comparan con la primera componente no nula positiva
+    largest = np.argmax(np.abs(q) > 1e-9, axis=-1)
+    return q * np.sign(np.take_along_axis(q, largest[:, None], axis=1))
+
+def assert_same_rotation(q, expected, atol=1e-9, message=""):
+    np.testing.assert_allclose(align_quaternions(q), align_quaternions(expected), atol=atol, err_msg=message)
+
+VECTORS = adversarial_rotation_vectors()
+QUATERNIONS = adversarial_quaternions()
+MATRICES = adversarial_matrices()
+
+def math_rows(method, values, unpack=True, setter=True):
+    # Rotation fila por fila: set_from_* devuelve el cuaternión, quaternion_to_* su resultado
+    rotation = Rotation()
+    rows = []
+    for value in values.tolist():
+        if setter:
+            getattr(rotation, method)(*value) if unpack else getattr(rotation, method)(value)
+            rows.append(rotation.quaternion)
+        else:
+            rotation.quaternion = value
+            rows.append(getattr(rotation, method)())
+    return np.array(rows, dtype=np.float64)
+
+def numpy_rows(function, values, unpack=True):
+    return np.array([np.ravel(function(*value) if unpack else function(value)) for value in values], dtype=np.float64)
+
+# nombre: (entrada, con math, escalar con NumPy, vectorizada)
+CONVERSIONS = {
+    "rotation_vector_to_quaternion": (VECTORS, lambda v: math_rows("set_from_rotation_vector", v),
+                                      lambda v: numpy_rows(scalar.rotation_vector_to_quaternion, v),
+                                      batch.rotation_vector_to_quaternion),
+    "quaternion_to_rotation_vector": (QUATERNIONS, lambda q: math_rows("quaternion_to_rotation_vector", q, setter=False),
+                                      lambda q: numpy_rows(scalar.quaternion_to_rotation_vector, q),
+                                      batch.quaternion_to_rotation_vector),
+    "quaternion_to_axis_angle": (QUATERNIONS, lambda q: math_rows("quaternion_to_euler_principal", q, setter=False),
+                                 lambda q: numpy_rows(scalar.quaternion_to_axis_angle, q),
+                                 batch.quaternion_to_axis_angle),
+    "quaternion_to_euler": (QUATERNIONS, lambda q: math_rows("quaternion_to_euler_angles", q, setter=False),
+                            lambda q: numpy_rows(scalar.quaternion_to_euler_principal, q),
+                            batch.quaternion_to_euler_principal),
+    "rotation_matrix_to_quaternion": (MATRICES, lambda R: math_rows("set_from_rotation_matrix", R, unpack=False),
+                                      lambda R: numpy_rows(scalar.rotation_matrix_to_quaternion, R, unpack=False),
+                                      batch.rotation_matrix_to_quaternion),
+    "rotation_matrix_to_rotation_vector": (MATRICES, None,
+                                           lambda R: numpy_rows(scalar.rotation_matrix_to_rotation_vector, R, unpack=False),
+                                           batch.rotation_matrix_to_rotation_vector),
+}
+
+@pytest.mark.parametrize("conversion", CONVERSIONS)
+def test_finite_and_tiers_agree(conversion):
+    values, math_convert, numpy_convert, batch_convert = CONVERSIONS[conversion]
+    expected = batch_convert(values).reshape(len(values), -1)
+    assert np.isfinite(expected).all(), f"{conversion}: NaN o infinito en {values[~np.isfinite(expected).all(axis=1)][:3]}"
+    for tier, convert in (("math", math_convert), ("numpy", numpy_convert)):
+        if convert is not None:
+            np.testing.assert_allclose(convert(values), expected, rtol=1e-12, atol=1e-12,
+                                       err_msg=f"{conversion}: {tier} no coincide con batch")
+
+def test_rotation_vector_round_trip_is_relatively_exact():
+    # Con ángulos en [0, π) la vuelta recupera el vector con error relativo de redondeo, también los diminutos
+    # (2·arccos(w) da 0 para todo ángulo por debajo de ~1e-8). Se excluyen las componentes subnormales, cuya
+    # mitad no cabe en el cuaternión; los ángulos desde π vuelven como el vector equivalente de [0, π].
+    representable = (VECTORS == 0) | (np.abs(VECTORS) >= 2*np.finfo(float).tiny)
+    rows = (np.linalg.norm(VECTORS, axis=1) < np.pi) & representable.all(axis=1)
+    result = batch.quaternion_to_rotation_vector(batch.rotation_vector_to_quaternion(VECTORS))
+    np.testing.assert_allclose(result[rows], VECTORS[rows], rtol=1e-12, atol=0)
+    assert_same_rotation(batch.rotation_vector_to_quaternion(result), batch.rotation_vector_to_quaternion(VECTORS),
+                         atol=1e-15)
+
+def test_rotation_vector_to_quaternion_is_unit():
+    q = batch.rotation_vector_to_quaternion(VECTORS)
+    np.testing.assert_allclose(np.linalg.norm(q, axis=1), 1, atol=1e-15)
+
+def test_matrix_to_quaternion_recovers_quaternion():
+    # Shepperd recupera el cuaternión (salvo el signo) también a 180 grados, con y sin ruido
+    clean = len(MATRICES) // 2
+    q = batch.rotation_matrix_to_quaternion(MATRICES)
+    assert (q[:, 3] >= 0).all()
+    assert_same_rotation(q[:clean], QUATERNIONS, atol=1e-14, message="sin ruido")
+    assert_same_rotation(q[clean:], QUATERNIONS, atol=100 * NOISE, message="con ruido de redondeo")
+
+def test_matrix_to_rotation_vector_gives_same_matrix():
+    R = batch.quaternion_to_rotation_matrix(batch.rotation_vector_to_quaternion(
+        batch.rotation_matrix_to_rotation_vector(MATRICES)))
+    np.testing.assert_allclose(R, MATRICES, atol=1e-13)
+
+def test_axis_angle_round_trip():
+    axis_angle = batch.quaternion_to_axis_angle(QUATERNIONS)
+    np.testing.assert_allclose(np.linalg.norm(axis_angle[:, 1:], axis=1), 1, atol=1e-15)
+    assert ((axis_angle[:, 0] >= 0) & (axis_angle[:, 0] <= 2*np.pi)).all()
+    assert_same_rotation(batch.axis_angle_to_quaternion(axis_angle), QUATERNIONS, atol=1e-15)
+
+def test_euler_round_trip_at_gimbal_lock():
+    # En el bloqueo de cardán los ángulos no son únicos, pero tienen que dar la misma rotación
+    euler = batch.quaternion_to_euler_principal(QUATERNIONS)
+    assert ((euler[:, 1] >= -np.pi/2) & (euler[:, 1] <= np.pi/2)).all()
+    np.testing.assert_allclose(batch.euler_to_rotation_matrix(euler), batch.quaternion_to_rotation_matrix(QUATERNIONS),
+                               atol=1e-14)
+
+def test_unnormalized_quaternions_stay_finite():
+    # |w| un poco mayor que 1 (2·arccos(w) daba NaN)
+    q = np.array([[0, 0, 0, 1 + 1e-12], [0, 0, 0, -1 - 1e-12], [1e-9, 0, 0, 1 + 1e-12]])
+    for convert in (batch.quaternion_to_axis_angle, batch.quaternion_to_rotation_vector, batch.quaternion_to_euler_principal):
+        assert np.isfinite(convert(q)).all()
+
+def test_typed_axis_angle_gives_unit_quaternion():
+    # El eje que se escribe en la línea de entrada del visor no tiene por qué ser unitario
+    pytest.importorskip("pygame")
+    pytest.importorskip("OpenGL")
+    from viewer3d.input_overlay import parse_rotation
+
+    angle, x, y, z = parse_rotation("axis_angle", "1 0 0 2", 4)
+    assert angle == 1 and np.isclose(np.linalg.norm((x, y, z)), 1)
+    rotation = Rotation()
+    rotation.set_from_euler_principal(angle, x, y, z)
+    assert np.isclose(np.linalg.norm(rotation.quaternion), 1)
+    with pytest.raises(ValueError):
+        parse_rotation("axis_angle", "1 0 0 0", 4)
+
+def test_typed_quaternion_gives_the_same_rotation():
+    # Lo que ventana 3d.py aplica con la línea de entrada: (w, x, y, z) directamente al cuaternión
+    pytest.importorskip("pygame")
+    pytest.importorskip("OpenGL")
+    from viewer3d.input_overlay import parse_rotation
+
+    w, x, y, z = parse_rotation("quaternion", "0.70710678 0.70710678 0 0", 4)
+    rotation = Rotation()
+    rotation.set_from_quaternion((x, y, z, w))
+    np.testing.assert_allclose(rotation.rotation_matrix, [[1, 0, 0], [0, 0, -1], [0, 1, 0]], atol=1e-8)
+    values = parse_rotation("rotation_matrix", "0 -1 0 1 0 0 0 0 1", 9)
+    rotation.set_from_rotation_matrix(np.reshape(values, (3, 3)))
+    np.testing.assert_allclose(rotation.rotation_vector, (0, 0, np.pi/2), atol=1e-12)
+
+def throughput_inputs(kind, conversion):
+    # THROUGHPUT_SAMPLES entradas de la conversión: aleatorias, o las difíciles repetidas
+    values = CONVERSIONS[conversion][0]
+    if kind == "adversarial":
+        return np.resize(values, (THROUGHPUT_SAMPLES,) + values.shape[1:])
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(THROUGHPUT_SAMPLES, 3))
+    if values is VECTORS:
+        return vectors
+    q = batch.rotation_vector_to_quaternion(vectors)
+    return q if values is QUATERNIONS else batch.quaternion_to_rotation_matrix(q)
+
+@pytest.mark.parametrize("kind", ("random", "adversarial"))
+@pytest.mark.parametrize("conversion", CONVERSIONS)
+def test_throughput(benchmark, conversion, kind):
+    values = throughput_inputs(kind, conversion)
+    benchmark.group = conversion
+    benchmark.extra_info["samples"] = THROUGHPUT_SAMPLES
+    result = benchmark(CONVERSIONS[conversion][3], values)
+    assert np.isfinite(result).all()
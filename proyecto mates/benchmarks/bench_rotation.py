@@ -0,0 +1,186 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Suite de pytest-benchmark del motor de rotaciones. Cada conversión se mide con sus tres
+# implementaciones sobre las mismas SAMPLES rotaciones, así que los tiempos de un grupo se
+# comparan directamente:
+#   math   Rotation (con math), una rotación cada vez
+#   numpy  las funciones escalares de viewer3d.rotation, una rotación cada vez
+#   batch  viewer3d.batch, todas las rotaciones en una sola llamada
+# Además comprueba que las tres coinciden y que las conversiones de ida y vuelta recuperan la entrada.
+#   python -m pytest benchmarks/bench_rotation.py
+#   python -m pytest benchmarks/bench_rotation.py --benchmark-disable   (solo las comprobaciones)
+# Rotation calcula las demás representaciones al leerlas, así que los set_from_* solo miden el cuaternión.
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d import batch
+from viewer3d import rotation as scalar
+from viewer3d.rotation import Rotation
+
+SAMPLES = 1000
+TOLERANCE = 1e-9
+
+def make_inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    euler = rng.uniform(-np.pi, np.pi, size=(n, 3))
+    euler[:, 1] /= 2  # pitch en (-pi/2, pi/2) para que la vuelta desde el cuaternión sea única
+    # Ángulos lejos de 0 y de pi, donde el eje del ángulo y eje no está bien definido
+    direction = rng.normal(size=(n, 3))
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    rotation_vector = direction * rng.uniform(0.2, 3.0, size=(n, 1))
+    quaternion = batch.rotation_vector_to_quaternion(rotation_vector)
+    return {
+        "euler": euler,
+        "quaternion": quaternion,
+        "axis_angle": batch.quaternion_to_axis_angle(quaternion),
+        "rotation_vector": rotation_vector,
+        "matrix": batch.quaternion_to_rotation_matrix(quaternion),
+    }
+
+INPUTS = make_inputs(SAMPLES)
+# Rotation trabaja con floats de Python: convertir las entradas no forma parte de la medida
+LIST_INPUTS = {name: values.tolist() for name, values in INPUTS.items()}
+
+def math_setter(method, unpack=True):
+    # Conversión hacia el cuaternión con Rotation.set_from_* (las matrices se pasan sin desempaquetar)
+    rotation = Rotation()
+    setter = getattr(rotation, method)
+
+    def convert(values):
+        results = []
+        for value in values:
+            if unpack:
+                setter(*value)
+            else:
+                setter(value)
+            results.append(rotation.quaternion)
+        return results
+    return convert
+
+def math_from_quaternion(method):
+    # Conversión desde el cuaternión con Rotation.quaternion_to_*
+    rotation = Rotation()
+    getter = getattr(rotation, method)
+
+    def convert(values):
+        results = []
+        for value in values:
+            rotation.quaternion = value
+            results.append(getter())
+        return results
+    return convert
+
+def numpy_unpacked(function):
+    def convert(values):
+        return [function(*value) for value in values]
+    return convert
+
+def numpy_matrix(function):
+    def convert(values):
+        return [function(value) for value in values]
+    return convert
+
+# nombre: (entrada, implementación con math o None, escalar con NumPy, vectorizada)
+CONVERSIONS = {
+    "euler_to_quaternion": ("euler", math_setter("set_from_euler_angles"),
+                            numpy_unpacked(scalar.euler_to_quaternion), batch.euler_to_quaternion),
+    "quaternion_to_euler": ("quaternion", math_from_quaternion("quaternion_to_euler_angles"),
+                            numpy_unpacked(scalar.quaternion_to_euler_principal), batch.quaternion_to_euler_principal),
+    "axis_angle_to_quaternion": ("axis_angle", math_setter("set_from_euler_principal"),
+                                 numpy_unpacked(scalar.axis_angle_to_quaternion), batch.axis_angle_to_quaternion),
+    "quaternion_to_axis_angle": ("quaternion", math_from_quaternion("quaternion_to_euler_principal"),
+                                 numpy_unpacked(scalar.quaternion_to_axis_angle), batch.quaternion_to_axis_angle),
+    "rotation_vector_to_quaternion": ("rotation_vector", math_setter("set_from_rotation_vector"),
+                                      numpy_unpacked(scalar.rotation_vector_to_quaternion),
+                                      batch.rotation_vector_to_quaternion),
+    "quaternion_to_rotation_vector": ("quaternion", math_from_quaternion("quaternion_to_rotation_vector"),
+                                      numpy_unpacked(scalar.quaternion_to_rotation_vector),
+                                      batch.quaternion_to_rotation_vector),
+    "quaternion_to_rotation_matrix": ("quaternion", math_from_quaternion("quaternion_to_rotation_matrix"),
+                                      numpy_unpacked(scalar.quaternion_to_rotation_matrix),
+                                      batch.quaternion_to_rotation_matrix),
+    "rotation_matrix_to_quaternion": ("matrix", math_setter("set_from_rotation_matrix", unpack=False),
+                                      numpy_matrix(scalar.rotation_matrix_to_quaternion),
+                                      batch.rotation_matrix_to_quaternion),
+    "euler_to_rotation_matrix": ("euler", None,
+                                 numpy_unpacked(scalar.euler_to_rotation_matrix), batch.euler_to_rotation_matrix),
+    "rotation_matrix_to_rotation_vector": ("matrix", None,
+                                           numpy_matrix(scalar.rotation_matrix_to_rotation_vector),
+                                           batch.rotation_matrix_to_rotation_vector),
+}
+
+TIERS = ("math", "numpy", "batch")
+
+def tier_call(conversion, tier):
+    # Devuelve (función, entrada) o None si la conversión no existe en esa implementación
+    input_name, math_convert, numpy_convert, batch_convert = CONVERSIONS[conversion]
+    if tier == "math":
+        return None if math_convert is None else (math_convert, LIST_INPUTS[input_name])
+    if tier == "numpy":
+        # Las filas de un array 2D como arrays de NumPy, igual que las usan los visores
+        return numpy_convert, list(INPUTS[input_name])
+    return batch_convert, INPUTS[input_name]
+
+def as_rows(result):
+    # Resultados de cualquier implementación como un array (SAMPLES, k)
+    return np.array([np.ravel(np.asarray(row, dtype=np.float64)) for row in result]).reshape(SAMPLES, -1)
+
+def align_quaternions(q):
+    # q y -q son la misma rotación: se comparan con w >= 0
+    return q * np.where(q[:, 3:] < 0, -1, 1)
+
+@pytest.mark.parametrize("tier", TIERS)
+@pytest.mark.parametrize("conversion", CONVERSIONS)
+def test_conversion_speed(benchmark, conversion, tier):
+    call = tier_call(conversion, tier)
+    if call is None:
+        pytest.skip(f"{conversion} no existe en Rotation")
+    function, values = call
+    benchmark.group = conversion
+    benchmark.extra_info["samples"] = SAMPLES
+    benchmark(function, values)
+
+@pytest.mark.parametrize("conversion", CONVERSIONS)
+def test_tiers_agree(conversion):
+    batch_convert, values = tier_call(conversion, "batch")
+    expected = as_rows(batch_convert(values))
+    for tier in ("math", "numpy"):
+        call = tier_call(conversion, tier)
+        if call is None:
+            continue
+        function, values = call
+        np.testing.assert_allclose(as_rows(function(values)), expected, atol=TOLERANCE,
+                                   err_msg=f"{conversion}: {tier} no coincide con batch")
+
+@pytest.mark.parametrize("tier", TIERS)
+@pytest.mark.parametrize("forward, backward, input_name, output_is_quaternion", [
+    ("euler_to_quaternion", "quaternion_to_euler", "euler", False),
+    ("axis_angle_to_quaternion", "quaternion_to_axis_angle", "axis_angle", False),
+    ("rotation_vector_to_quaternion", "quaternion_to_rotation_vector", "rotation_vector", False),
+    ("quaternion_to_rotation_matrix", "rotation_matrix_to_quaternion", "quaternion", True),
+])
+def test_round_trip(tier, forward, backward, input_name, output_is_quaternion):
+    forward_function = tier_call(forward, tier)[0]
+    backward_function = tier_call(backward, tier)[0]
+    intermediate = forward_function(tier_call(forward, tier)[1])
+    if tier == "math":
+        intermediate = [np.asarray(value, dtype=np.float64).tolist() for value in intermediate]
+    elif tier == "numpy":
+        intermediate = [np.asarray(value, dtype=np.float64) for value in intermediate]
+    result = as_rows(backward_function(intermediate))
+
+    expected = INPUTS[input_name]
+    if output_is_quaternion:
+        result, expected = align_quaternions(result), align_quaternions(expected)
+    np.testing.assert_allclose(result, expected, atol=TOLERANCE, err_msg=f"{forward} -> {backward} con {tier}")
+
+def test_euler_matrix_matches_quaternion_matrix():
+    # Los dos caminos de Euler a matriz (directo y pasando por el cuaternión) dan la misma matriz
+    direct = batch.euler_to_rotation_matrix(INPUTS["euler"])
+    through_quaternion = batch.quaternion_to_rotation_matrix(batch.euler_to_quaternion(INPUTS["euler"]))
+    np.testing.assert_allclose(direct, through_quaternion, atol=TOLERANCE)
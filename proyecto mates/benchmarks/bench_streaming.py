@@ -0,0 +1,121 @@
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Memoria del proceso (RSS) mientras viewer3d.streaming convierte una secuencia de --rows
+# cuaterniones (100 millones por defecto) por la cadena de --stages etapas, en bloques de --chunk
+# filas. Los cuaterniones se generan bloque a bloque en un buffer reutilizado, o con --log se
+# escriben en un log temporal y se leen con log_chunks. Imprime el RSS cada --every filas y
+# comprueba que en el último bloque completo no ha crecido más de --tolerance MB desde el primero,
+# además de que el primer bloque coincide con las conversiones de batch sobre el array entero.
+# Con NumPy, un último bloque más corto crea temporales de otro tamaño y el malloc de glibc puede
+# dejar unos MB más reservados una vez: no depende de la longitud, pero no entra en la comprobación.
+#   python benchmarks/bench_streaming.py --rows 100000000 --chunk 65536
+#   python benchmarks/bench_streaming.py --rows 10000000 --log
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d import batch, streaming
+from viewer3d.orientation_log import LOG_DTYPE, OrientationRecorder
+
+STAGES = ("quaternion_to_rotation_matrix", "rotation_matrix_to_rotation_vector")
+TOLERANCE = 1e-12
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+def rss_bytes():
+    # El RSS actual en Linux; en otros sistemas, el máximo que da getrusage (en kB en Linux, en bytes en macOS)
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+def synthetic_chunks(rows, chunk_rows, seed=0):
+    # Bloques de cuaterniones aleatorios normalizados, escritos siempre en el mismo buffer
+    rng = np.random.default_rng(seed)
+    quaternions = np.empty((chunk_rows, 4))
+    norms = np.empty(chunk_rows)
+    for start in range(0, rows, chunk_rows):
+        out = quaternions[:min(chunk_rows, rows - start)]
+        rng.standard_normal(out=out)
+        norm = norms[:len(out)]
+        np.sqrt(np.einsum("ij,ij->i", out, out, out=norm), out=norm)
+        out /= norm[:, None]
+        yield out
+
+def write_log(path, rows, chunk_rows):
+    with OrientationRecorder(path):  # Solo la cabecera
+        pass
+    records = np.zeros(chunk_rows, dtype=LOG_DTYPE)
+    with open(path, "ab") as file:
+        for start, quaternions in zip(range(0, rows, chunk_rows), synthetic_chunks(rows, chunk_rows)):
+            block = records[:len(quaternions)]
+            block["quaternion"] = quaternions[:, [3, 0, 1, 2]]  # (w, x, y, z)
+            file.write(block.tobytes())
+
+def check_first_chunk(chunks, stages):
+    # El primer bloque del flujo contra las conversiones de batch aplicadas a ese bloque entero
+    first = next(iter(chunks)).copy()
+    streamed = next(streaming.stream(iter([first]), *stages, chunk_rows=len(first)))
+    expected = first
+    for stage in stages:
+        expected = getattr(batch, stage)(expected)
+    if not np.allclose(streamed, expected, rtol=TOLERANCE, atol=TOLERANCE):
+        raise AssertionError("el flujo no da lo mismo que batch")
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria de la conversión en flujo de viewer3d.streaming")
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--chunk", type=int, default=streaming.CHUNK_ROWS, help="filas por bloque")
+    parser.add_argument("--stages", nargs="+", default=STAGES, help="conversiones de batch encadenadas")
+    parser.add_argument("--every", type=int, default=10_000_000, help="filas entre medidas del RSS")
+    parser.add_argument("--tolerance", type=float, default=8.0, help="MB que puede crecer el RSS")
+    parser.add_argument("--log", action="store_true", help="leer los cuaterniones de un log temporal")
+    args = parser.parse_args()
+
+    path = None
+    if args.log:
+        file, path = tempfile.mkstemp(suffix=".qlog")
+        os.close(file)
+        write_log(path, args.rows, args.chunk)
+        source = lambda: streaming.log_chunks(path, args.chunk)
+    else:
+        source = lambda: synthetic_chunks(args.rows, args.chunk)
+    try:
+        check_first_chunk(source(), args.stages)
+        row_bytes = sum(stage.buffer[0].nbytes for stage in streaming.pipeline(*args.stages, chunk_rows=1))
+        print(f"{' → '.join(args.stages)}, tier {batch.KERNEL_TIER}, bloques de {args.chunk:,d} filas")
+        print(f"convertir todo de una vez necesitaría al menos {args.rows * (32 + row_bytes) / 2**30:.1f} GB")
+        print(f"{'filas':>13s} {'RSS MB':>8s} {'filas/s':>13s}")
+
+        done, baseline, last_full, next_report = 0, None, None, 0
+        start = time.perf_counter()
+        for values in streaming.stream(source(), *args.stages, chunk_rows=args.chunk):
+            done += len(values)
+            if baseline is None:
+                baseline = last_full = rss_bytes()  # Después del primer bloque: buffers reservados y núcleos compilados
+            elif len(values) == args.chunk:
+                last_full = rss_bytes()
+            if done >= next_report or done == args.rows:
+                rss = rss_bytes()
+                print(f"{done:13,d} {rss / 2**20:8.1f} {done / (time.perf_counter() - start):13,.0f}")
+                next_report += args.every
+        growth = (last_full - baseline) / 2**20
+        print(f"el RSS ha crecido {growth:.1f} MB del primer bloque al último completo")
+        if done != args.rows:
+            raise AssertionError(f"se convirtieron {done} filas de {args.rows}")
+        if growth > args.tolerance:
+            raise AssertionError(f"el RSS crece con la longitud de la secuencia ({growth:.1f} MB)")
+    finally:
+        if path is not None:
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# Memoria y tiempo por frame de preparar la orientación de la figura para OpenGL:
+#   - la matriz de Rotation (listas anidadas) convertida al array 4x4 float32 por columnas
+#   - la matriz de ángulos de Euler de antes (R_x, R_y y R_z como arrays y dos np.dot)
+#   - viewer3d.transforms escribiendo en el mismo buffer de siempre, desde el cuaternión y desde
+#     los ángulos en grados de los glRotatef
+# La memoria se mide con tracemalloc: el pico por encima de lo que ya estaba reservado durante un
+# frame (lo que se crea y se tira) y lo que queda reservado después de todos los frames.
+# Con --gl se dibuja también sin ventana con EGL: los glRotatef de antes contra un glMultMatrixf
+# (el de OpenGL.GL con el array de NumPy y el de OpenGL.raw con gl_matrix_pointer), comprobando
+# que las imágenes son iguales.
+#   python benchmarks/bench_transforms.py --frames 200000 --gl
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from viewer3d.rotation import Rotation
+from viewer3d.transforms import (gl_cube_rotation_matrix, gl_matrix_pointer, gl_model_matrix, gl_rotation_matrix,
+                                 new_gl_matrix)
+
+QUATERNION = (0.18257418583505536, 0.3651483716701107, 0.5477225575051661, 0.7302967433402214)
+DEGREES = (-60.0, 20.0, 10.0)
+
+def legacy_euler_matrix(roll, pitch, yaw):
+    # rotation.euler_to_rotation_matrix antes de desarrollar el producto
+    R_x = np.array([[1, 0, 0], [0, np.cos(roll), -np.sin(roll)], [0, np.sin(roll), np.cos(roll)]])
+    R_y = np.array([[np.cos(pitch), 0, np.sin(pitch)], [0, 1, 0], [-np.sin(pitch), 0, np.cos(pitch)]])
+    R_z = np.array([[np.cos(yaw), -np.sin(yaw), 0], [np.sin(yaw), np.cos(yaw), 0], [0, 0, 1]])
+    return np.dot(R_z, np.dot(R_y, R_x))
+
+def to_gl(matrix):
+    # Un 3x3 por filas como array 4x4 float32 por columnas, listo para glMultMatrixf
+    gl = np.eye(4, dtype=np.float32)
+    gl[:3, :3] = matrix
+    return gl.T.ravel()
+
+def frame_functions():
+    # nombre: función que prepara la matriz de un frame
+    rotation = Rotation()
+    rotation.set_from_quaternion(QUATERNION)
+    euler = rotation.euler_angles
+    buffer = new_gl_matrix()
+    return {
+        "Rotation (listas)": lambda: to_gl(rotation.quaternion_to_rotation_matrix()),
+        "Euler (3 arrays)": lambda: to_gl(legacy_euler_matrix(*euler)),
+        "cuaternión": lambda: gl_rotation_matrix(QUATERNION, buffer),
+        "modelo (T·R·S)": lambda: gl_model_matrix(QUATERNION, buffer, (1.0, 2.0, 3.0), 0.5),
+        "grados (glRotatef)": lambda: gl_cube_rotation_matrix(DEGREES, buffer),
+    }
+
+def seconds_per_frame(function, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        function()
+    return (time.perf_counter() - start) / frames
+
+def frame_memory(function, frames):
+    # (bytes de pico en un frame, bytes que siguen reservados después de frames frames)
+    function()  # Lo que se reserva una vez (cachés de NumPy, etc.) queda fuera de la medida
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    function()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    for _ in itertools.repeat(None, frames):  # Con range el último entero seguiría reservado
+        function()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return peak, retained
+
+def legacy_render(renderer, figure):
+    # HeadlessRenderer.render con los glRotatef de antes en lugar de la matriz
+    from OpenGL.GL import (GL_BACK, GL_COLOR_BUFFER_BIT, GL_CULL_FACE, GL_DEPTH_BUFFER_BIT, GL_RGBA,
+                           GL_UNSIGNED_BYTE, glClear, glCullFace, glEnable, glLoadIdentity, glReadPixels,
+                           glRotatef, glTranslatef)
+    from OpenGL.GLU import gluPerspective
+
+    glLoadIdentity()
+    gluPerspective(renderer.fov, renderer.width/renderer.height, 0.1, 100.0)
+    glTranslatef(0.0, 0.0, -5)
+    glEnable(GL_CULL_FACE)
+    glCullFace(GL_BACK)
+    glClear(GL_COLOR_BUFFER_BIT|GL_DEPTH_BUFFER_BIT)
+    glRotatef(DEGREES[0], 1, 0, 0)
+    glRotatef(DEGREES[1], 0, 1, 0)
+    glRotatef(DEGREES[2], 0, 0, 1)
+    figure.draw()
+    glReadPixels(0, 0, renderer.width, renderer.height, GL_RGBA, GL_UNSIGNED_BYTE, array=renderer.pixels)
+    return renderer.pixels[::-1].copy()
+
+def gl_comparison(frames, size):
+    from viewer3d.headless import HeadlessRenderer  # Antes que OpenGL: elige la plataforma EGL
+    from OpenGL.GL import glLoadIdentity, glMultMatrixf, glRotatef
+    from OpenGL.raw.GL.VERSION.GL_1_0 import glMultMatrixf as raw_glMultMatrixf
+    from viewer3d.figures import Cube
+
+    buffer = new_gl_matrix()
+    pointer = gl_matrix_pointer(buffer)
+
+    def rotations():
+        glLoadIdentity()
+        glRotatef(DEGREES[0], 1, 0, 0)
+        glRotatef(DEGREES[1], 0, 1, 0)
+        glRotatef(DEGREES[2], 0, 0, 1)
+
+    def matrix():
+        glLoadIdentity()
+        glMultMatrixf(gl_cube_rotation_matrix(DEGREES, buffer))
+
+    def raw_matrix():
+        glLoadIdentity()
+        gl_cube_rotation_matrix(DEGREES, buffer)
+        raw_glMultMatrixf(pointer)
+
+    with HeadlessRenderer(*size) as renderer:
+        print(f"{'OpenGL':>20s} {'µs/frame':>9s} {'pico (bytes)':>13s} {'retenido (bytes)':>17s}")
+        for name, calls in (("3 glRotatef", rotations), ("glMultMatrixf", matrix), ("raw glMultMatrixf", raw_matrix)):
+            peak, retained = frame_memory(calls, min(frames, 10_000))
+            print(f"{name:>20s} {seconds_per_frame(calls, frames) * 1e6:9.2f} {peak:13d} {retained:17d}")
+
+        cube = Cube()
+        difference = np.abs(renderer.render(cube, DEGREES).astype(int) - legacy_render(renderer, cube)).max()
+        print(f"diferencia máxima entre las imágenes: {difference}")
+        if difference > 1:  # Redondeo de float32 en algún borde
+            raise AssertionError("glMultMatrixf no dibuja lo mismo que los glRotatef")
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria y tiempo por frame de la matriz de modelo para OpenGL")
+    parser.add_argument("--frames", type=int, default=200_000)
+    parser.add_argument("--gl", action="store_true", help="medir también las llamadas a OpenGL (EGL sin ventana)")
+    parser.add_argument("--size", type=int, nargs=2, default=(400, 300))
+    args = parser.parse_args()
+
+    print(f"{'matriz':>20s} {'µs/frame':>9s} {'pico (bytes)':>13s} {'retenido (bytes)':>17s}")
+    for name, function in frame_functions().items():
+        seconds = seconds_per_frame(function, args.frames)
+        peak, retained = frame_memory(function, min(args.frames, 10_000))
+        print(f"{name:>20s} {seconds * 1e6:9.2f} {peak:13d} {retained:17d}")
+        if name in ("cuaternión", "modelo (T·R·S)", "grados (glRotatef)") and (peak > 0 or retained > 0):
+            raise AssertionError(f"{name}: reserva memoria en cada frame")
+
+    if args.gl:
+        gl_comparison(args.frames // 10, args.size)
+
+if __name__ == "__main__":
+    main()
@@ -1,85 +1,85 @@
-import tkinter as tk
-#from tkinter import filedialog
-from tkinter import simpledialog
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
+from OpenGL.raw.GL.VERSION.GL_1_0 import glMultMatrixf as raw_glMultMatrixf
 import numpy as np
-import threading
-
-class Cube:
-    vertices = (
-        (1, -1, -1), (1, 1, -1), (-1, 1, -1), (-1, -1, -1),
-        (1, -1, 1), (1, 1, 1), (-1, -1, 1), (-1, 1, 1)
-    )
-
-    edges = (
-        (0, 1), (0, 3), (0, 4), (2, 1), (2, 3), (2, 7),
-        (6, 3), (6, 4), (6, 7), (5, 1), (5, 4), (5, 7)
-    )
-
-    faces = [
-        (0, 1, 2, 3), (3, 2, 7, 6), (6, 7, 5, 4),
-        (4, 5, 1, 0), (1, 5, 7, 2), (4, 0, 3, 6)
-    ]
-
-    colors = (
-        (1, 0, 0, 1), (0, 1, 0, 1), (0, 0, 1, 1),
-        (1, 1, 1, 1), (1, 1, 0, 1), (1, 0, 1, 1)
-    )
-
-    def draw(self):
-        glBegin(GL_QUADS)
-        for face_color, face in enumerate(self.faces):
-            glColor4fv(self.colors[face_color])
-            for vertex in face:
-                glVertex3fv(self.vertices[vertex])
-        glEnd()
-
-        glColor3fv((0, 0, 0))
-        glBegin(GL_LINES)
-        for edge in self.edges:
-            for vertex in edge:
-                glVertex3fv(self.vertices[vertex])
-        glEnd()
-
-class Tetrahedron:
-    vertices = (
-        (0, 1, 0), (-1, -1, 1), (1, -1, 1), (0, -1, -1)
-    )
-
-    edges = (
-        (0, 1), (0, 2), (0, 3), (1, 2), (2, 3), (3, 1)
-    )
-
-    faces = (
-        (0, 1, 2), (0, 2, 3), (0, 3, 1), (1, 3, 2)
-    )
-
-    colors = (
-        (1, 0, 0, 1), (0, 1, 0, 1), (0, 0, 1, 1), (1, 1, 1, 1)
-    )
-
-    def draw(self):
-        glBegin(GL_TRIANGLES)
-        for face_color, face in enumerate(self.faces):
-            glColor4fv(self.colors[face_color])
-            for vertex in face:
-                glVertex3fv(self.vertices[vertex])
-        glEnd()
-
-        glColor3fv((0, 0, 0))
-        glBegin(GL_LINES)
-        for edge in self.edges:
-            for vertex in edge:
-                glVertex3fv(self.vertices[vertex])
-        glEnd()
-
-def main():
+import atexit
+import os
+import time
+import argparse
+from viewer3d.arcball import Arcball, rotate_about_axis
+from viewer3d.figures import Cube, FleetFigure, Tetrahedron, load_model_figure
+from viewer3d.fbx import FBXError
+from viewer3d.frame_clock import FrameClock
+from viewer3d.info_window import DEFAULT_REFRESH_MS
+from viewer3d.input_overlay import InputOverlay
+from viewer3d.instancing import Fleet, load_quaternions
+from viewer3d.interpolation import Transition
+from viewer3d.orientation_feed import OrientationFeed
+from viewer3d.orientation_log import OrientationPlayer, OrientationRecorder
+from viewer3d.profiler import FrameProfiler
+from viewer3d.profiler_hud import ProfilerHUD
+from viewer3d.rotation import Rotation
+from viewer3d.scene import row_scene
+from viewer3d.transforms import gl_matrix_pointer, gl_rotation_matrix, new_gl_matrix
+from viewer3d.ui_process import UIProcesses
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cube.FBX")
+CAPTION = "Ventana 3D: Presiona Q para ver los controles"
+KEY_ROTATION_SPEED = 90  # Grados por segundo mientras se mantiene pulsada una flecha
+ARROW_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)
+NO_KEYS = {pygame.K_LEFT: False, pygame.K_RIGHT: False, pygame.K_UP: False, pygame.K_DOWN: False}
+UI_POLL_MS = 50  # En modo bajo demanda, cada cuánto se despierta el visor para mirar los comandos del panel
+# Etapas del bucle que mide el profiler (--profile, --profile-out o la tecla P)
+PROFILE_STAGES = ("events", "commands", "input", "publish", "draw", "flip", "wait")
+
+# Diálogos del panel: tecla -> (comando, título, preguntas). Los valores llegan en el orden de las preguntas.
+DIALOGS = {
+    "m": ("euler", "Euler", ("Enter rotation for x-axis:", "Enter rotation for y-axis:")),
+    "n": ("quaternion", "Quaternion", ("Enter quaternion w component:", "Enter quaternion x component:",
+                                       "Enter quaternion y component:", "Enter quaternion z component:")),
+    "b": ("euler_principal", "Euler principal", ("Enter euler principal for x-axis:", "Enter euler principal for y-axis:",
+                                                 "Enter euler principal for z-axis:")),
+    "v": ("rotation_vector", "Rotation vector", ("Enter rotation vector for x-axis:", "Enter rotation vector for y-axis:",
+                                                 "Enter rotation vector for z-axis:")),
+    "c": ("rotation_matrix", "Rotation matrix", tuple(f"Enter rotation matrix for {row},{column}:"
+                                                      for row in range(1, 4) for column in range(1, 4))),
+}
+DIALOG_KEYS = {pygame.K_m: "m", pygame.K_n: "n", pygame.K_b: "b", pygame.K_v: "v", pygame.K_c: "c"}
+
+# Formatos de la línea de entrada de la ventana: tecla -> (comando, título, número de valores)
+INPUT_FORMATS = {
+    "m": ("euler", "Euler x y", 2),
+    "n": ("quaternion", "Quaternion w x y z", 4),
+    "b": ("euler_principal", "Euler principal x y z", 3),
+    "v": ("rotation_vector", "Rotation vector x y z", 3),
+    "c": ("rotation_matrix", "Rotation matrix (3x3 por filas)", 9),
+}
+
+CONTROLS = (
+    "Si mantienes click izquierdo en la figura y mueves el mouse podras mover la figura",
+    "Tambien podras mover la figura con las flechas direccionales",
+    "Presiona 'R' para reiniciar la rotacion de la figura",
+    "Presiona '1', '2' o '3' para cambiar entre el cubo, el tetraedro y el modelo Cube.FBX",
+    "Presiona '4' para ver todas las figuras juntas",
+    "Presiona 'M' para ingresar una rotacion en euler",
+    "Presiona 'N' para ingresar un quaternion",
+    "Presiona 'B' para ingresar un euler principal",
+    "Presiona 'V' para ingresar un vector de rotacion",
+    "Presiona 'C' para ingresar una matriz de rotacion",
+    "Presiona 'P' para ver cuanto tarda cada etapa del frame",
+)
+
+def main(target_fps=60, vsync=False, on_demand=False, info_refresh_ms=DEFAULT_REFRESH_MS, monitors=1,
+         record_path=None, play_path=None, play_speed=1.0, play_loop=False, instances=None,
+         profile=False, profile_path=None):
     pygame.init()
     display = (800, 600)
-    pygame.display.set_mode(display, DOUBLEBUF|OPENGL)
+    pygame.display.set_mode(display, DOUBLEBUF|OPENGL, vsync=1 if vsync else 0)
+    pygame.display.set_caption(CAPTION)
+    clock = FrameClock(target_fps, vsync)  # Ritmo de frames y delta time
+    last_caption_update = time.perf_counter()
 
     fov = 45  # Campo de visión inicial
     gluPerspective(fov, (display[0]/display[1]), 0.1, 100.0)
@@ -89,339 +89,217 @@ def main():
     1: Cube(),
     2: Tetrahedron(),
 }
+    try:
+        figures[3] = load_model_figure(MODEL_PATH)  # Modelo FBX incluido en el proyecto
+    except (OSError, FBXError) as error:
+        print(f"No se pudo cargar {MODEL_PATH}: {error}")
+    scene = row_scene(list(figures.values()))  # Todas las figuras juntas; solo se dibujan las que caen en la vista
+    if instances is not None:  # Modo flota: cada figura se dibuja una vez por orientación, todas en un solo draw
+        fleet = Fleet(instances)
+        figures = {key: FleetFigure(figure, fleet) for key, figure in figures.items()}
+    figures[4] = scene
 
     current_figure = figures[1]  # Figura actual
 
-    cube_euler_angles = [0, 0, 0]  # Ángulos de rotación del cubo en los ejes x e y
-    cube_quaternion = euler_to_quaternion(cube_euler_angles[0], cube_euler_angles[1], 0) # Quaternion inicial del cubo
-    cube_euler_principal = quaternion_to_euler_principal(cube_quaternion[0], cube_quaternion[1], cube_quaternion[2], cube_quaternion[3]) # Euler principal inicial del cubo
-    cube_rotation_matrix = euler_to_rotation_matrix(cube_euler_angles[0], cube_euler_angles[1], 0) # Matriz de rotación inicial del cubo
-    cube_rotation_vector = rotation_matrix_to_rotation_vector(cube_rotation_matrix) # Vector de rotación inicial del cubo
+    cube_rotation = Rotation()  # Orientación del cubo: se compone y se dibuja como cuaternión, sin ángulos de Euler
+    model_matrix = new_gl_matrix()  # Matriz de la figura para glMultMatrixf, reservada una sola vez
+    model_matrix_pointer = gl_matrix_pointer(model_matrix)  # La misma memoria, para raw_glMultMatrixf
+    arcball = Arcball(*display)  # Rotación con el mouse
+    rotation_feed = OrientationFeed()  # Última rotación calculada, en memoria compartida para los paneles
+    atexit.register(rotation_feed.close)
+    print(f"Feed de orientación: {rotation_feed.name}")
+    published_quaternion = None  # Cuaternión de la última publicación
     mouse_down = False  # El mouse inicialmente no está presionado
-    last_mouse_pos = (0, 0)  # Posición inicial del mouse
-
-    # Inicializa la ventana de información en un thread para que no se sobreponga con la ventana principal
-    info_window_thread = threading.Thread(target=start_info_window, args=(cube_euler_angles, cube_quaternion, cube_euler_principal, cube_rotation_vector, cube_rotation_matrix))
-    info_window_thread.start()
+    last_view_state = None  # Rotación, fov y figura del último frame dibujado (modo bajo demanda)
+    window_exposed = True  # La ventana necesita redibujarse aunque no haya cambiado nada
+
+    # El panel de información, los controles y los diálogos corren en otros procesos
+    ui = UIProcesses(rotation_feed.name, DIALOGS, CONTROLS, monitors, info_refresh_ms)
+    atexit.register(ui.close)
+    recorder = OrientationRecorder(record_path) if record_path else None  # Log de las orientaciones de la sesión
+    if recorder is not None:
+        atexit.register(recorder.close)
+    player = OrientationPlayer(play_path, play_speed, play_loop) if play_path else None  # Log que se está reproduciendo
+    overlay = InputOverlay(INPUT_FORMATS)  # Línea de entrada de rotaciones dentro de la ventana
+    transition = None  # Animación hacia la última rotación escrita por el usuario
+    profiler = FrameProfiler(PROFILE_STAGES, export_path=profile_path)  # Tiempos de cada etapa del frame
+    atexit.register(profiler.close)
+    profiler_hud = ProfilerHUD(profiler, visible=profile)
 
     while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
-            elif event.type == pygame.KEYDOWN:  # Si se presiona una tecla
-                if event.key == pygame.K_ESCAPE:  # Si la tecla es ESC
-                    pygame.quit()  # Cierra pygame
-                    quit()  # Cierra la ventana
-                elif event.key == pygame.K_1:  # Si la tecla es 1, 2, 3 o 4
-                    current_figure = figures[1]
-                elif event.key == pygame.K_2:  # Si la tecla es 1, 2, 3 o 4
-                    current_figure = figures[2]  # Cambia la figura actual
-                elif event.key == pygame.K_r:  # Si la tecla 'R' se presiona
-                    cube_euler_angles[:] = [0, 0, 0]  # Reinicia la rotación del cubo
-                elif event.key == pygame.K_LEFT:
-                    cube_euler_angles[1] -= 5  # Rotar a la izquierda
-                elif event.key == pygame.K_RIGHT:
-                    cube_euler_angles[1] += 5  # Rotar a la derecha
-                elif event.key == pygame.K_UP:
-                    cube_euler_angles[0] -= 5  # Rotar hacia arriba
-                elif event.key == pygame.K_DOWN:
-                    cube_euler_angles[0] += 5  # Rotar hacia abajo
-                elif event.key == pygame.K_q:  # Si la tecla 'Q' se presiona
-                    controls_window = tk.Tk()
-                    controls_window.title("Controls")
-
-                    control1_label = tk.Label(controls_window, text="Si mantienes click izquierdo en la figura y mueves el mouse podras mover la figura")
-                    control1_label.pack()
-
-                    control2_label = tk.Label(controls_window, text="Tambien podras mover la figura con las flechas direccionales")
-                    control2_label.pack()
-
-                    control3_label = tk.Label(controls_window, text="Presiona 'R' para reiniciar la rotacion de la figura")
-                    control3_label.pack()
-
-                    control5_label = tk.Label(controls_window, text="Presiona 'M' para ingresar una rotacion en euler")
-                    control5_label.pack()
-
-                    control6_label = tk.Label(controls_window, text="Presiona 'N' para ingresar un quaternion")
-                    control6_label.pack()
-
-                    control7_label = tk.Label(controls_window, text="Presiona 'B' para ingresar un euler principal")
-                    control7_label.pack()
-
-                    control8_label = tk.Label(controls_window, text="Presiona 'V' para ingresar un vector de rotacion")
-                    control8_label.pack()
-
-                    control9_label = tk.Label(controls_window, text="Presiona 'C' para ingresar una matriz de rotacion")
-                    control9_label.pack()
-                    # Agrega mas
-
-                    controls_window.mainloop()
-                elif event.key == pygame.K_m:  # Si la tecla 'M' se presiona
-                    root = tk.Tk()
-                    root.withdraw()  # Oculta la ventana de Tkinter
-                    rotation_input_x = simpledialog.askstring("Input", "Enter rotation for x-axis:",
-                                                              parent=root)
-                    rotation_input_y = simpledialog.askstring("Input", "Enter rotation for y-axis:",
-                                                              parent=root)
-                    x = int(rotation_input_x)
-                    y = int(rotation_input_y)
-                    z = 0
-                    cube_euler_angles[:] = [x, y, z]
-                    root.destroy()  # Destruye la ventana de Tkinter
-                elif event.key == pygame.K_n:  # Si la tecla 'N' se presiona
-                    root = tk.Tk()
-                    root.withdraw()  # Oculta la ventana de Tkinter
-                    quaternion_input_w = simpledialog.askstring("Input", "Enter quaternion w component:",
-                                                                parent=root)
-                    quaternion_input_x = simpledialog.askstring("Input", "Enter quaternion x component:",
-                                                                parent=root)
-                    quaternion_input_y = simpledialog.askstring("Input", "Enter quaternion y component:",
-                                                                parent=root)
-                    quaternion_input_z = simpledialog.askstring("Input", "Enter quaternion z component:",
-                                                                parent=root)
-                    w = float(quaternion_input_w)
-                    x = float(quaternion_input_x)
-                    y = float(quaternion_input_y)
-                    z = float(quaternion_input_z)
-                    result = queaternion_to_cube_rotationxy(x, y, z, w)
-                    cube_euler_angles[:] = [result[0], result[1], 0]
-                    root.destroy()  # Destruye la ventana de Tkinter
-                elif event.key == pygame.K_b:
-                    root = tk.Tk()
-                    root.withdraw()
-                    euler_principal_input_x = simpledialog.askstring("Input", "Enter euler principal for x-axis:",
-                                                                         parent=root)
-                    euler_principal_input_y = simpledialog.askstring("Input", "Enter euler principal for y-axis:",
-                                                                         parent=root)
-                    euler_principal_input_z = simpledialog.askstring("Input", "Enter euler principal for z-axis:",
-                                                                         parent=root)
-                    x = float(euler_principal_input_x)
-                    y = float(euler_principal_input_y)
-                    z = float(euler_principal_input_z)
-                    result = euler_principal_to_cube_rotationxy(x, y, z)                    
-                    cube_euler_angles[:] = [result[0], result[1], 0]
-                    root.destroy()
-                elif event.key == pygame.K_v:
-                    root = tk.Tk()
-                    root.withdraw()
-                    rotation_vector_input_x = simpledialog.askstring("Input", "Enter rotation vector for x-axis:",
-                                                                         parent=root)
-                    rotation_vector_input_y = simpledialog.askstring("Input", "Enter rotation vector for y-axis:",
-                                                                         parent=root)
-                    rotation_vector_input_z = simpledialog.askstring("Input", "Enter rotation vector for z-axis:",
-                                                                         parent=root)
-                    x = float(rotation_vector_input_x)
-                    y = float(rotation_vector_input_y)
-                    z = float(rotation_vector_input_z)
-                    result = rotation_vector_to_cube_rotationxy(x, y, z)
-                    cube_euler_angles[:] = [result[0], result[1], 0]
-                    root.destroy()
-                elif event.key == pygame.K_c:
-                    root = tk.Tk()
-                    root.withdraw()
-                    rotation_matrix_input_11 = simpledialog.askstring("Input", "Enter rotation matrix for 1,1:",
-                                                                         parent=root)
-                    rotation_matrix_input_12 = simpledialog.askstring("Input", "Enter rotation matrix for 1,2:",
-                                                                         parent=root)
-                    rotation_matrix_input_13 = simpledialog.askstring("Input", "Enter rotation matrix for 1,3:",
-                                                                         parent=root)
-                    rotation_matrix_input_21 = simpledialog.askstring("Input", "Enter rotation matrix for 2,1:",
-                                                                         parent=root)
-                    rotation_matrix_input_22 = simpledialog.askstring("Input", "Enter rotation matrix for 2,2:",
-                                                                         parent=root)
-                    rotation_matrix_input_23 = simpledialog.askstring("Input", "Enter rotation matrix for 2,3:",
-                                                                         parent=root)
-                    rotation_matrix_input_31 = simpledialog.askstring("Input", "Enter rotation matrix for 3,1:",
-                                                                         parent=root)
-                    rotation_matrix_input_32 = simpledialog.askstring("Input", "Enter rotation matrix for 3,2:",
-                                                                         parent=root)
-                    rotation_matrix_input_33 = simpledialog.askstring("Input", "Enter rotation matrix for 3,3:",
-                                                                         parent=root)
-                    x = np.array([[float(rotation_matrix_input_11), float(rotation_matrix_input_12), float(rotation_matrix_input_13)], 
-                                  [float(rotation_matrix_input_21), float(rotation_matrix_input_22), float(rotation_matrix_input_23)],
-                                  [float(rotation_matrix_input_31), float(rotation_matrix_input_32), float(rotation_matrix_input_33)]])
-                    result = rotation_matrix_to_cube_rotationxy(x)
-                    cube_euler_angles[:] = [result[0], result[1], 0]
-                    root.destroy()              
-            elif event.type == pygame.MOUSEBUTTONDOWN:  # Si el botón del mouse se presiona
-                if event.button == 1:  # Si el botón izquierdo del mouse se presiona
-                    mouse_down = True
-                    last_mouse_pos = pygame.mouse.get_pos()  # Guarda la posición actual del mouse
-                elif event.button == 4:  # Si se gira la rueda del mouse hacia arriba
-                    fov = max(1, fov - 1)  # Disminuye el campo de visión para hacer zoom in
-                elif event.button == 5:  # Si se gira la rueda del mouse hacia abajo
-                    fov = min(180, fov + 1)  # Aumenta el campo de visión para hacer zoom out
-            elif event.type == pygame.MOUSEBUTTONUP:  # Si el botón del mouse se suelta
-                if event.button == 1:  # Si el botón izquierdo del mouse se suelta
-                    mouse_down = False
-            elif event.type == pygame.MOUSEMOTION:  # Si el mouse se mueve
-                if mouse_down:  # Si el botón izquierdo del mouse está presionado
-                    mouse_pos = pygame.mouse.get_pos()  # Obtiene la posición actual del mouse
-                    dx, dy = mouse_pos[0] - last_mouse_pos[0], mouse_pos[1] - last_mouse_pos[1]  # Calcula el desplazamiento del mouse
-                    cube_euler_angles[0] += dy  # Rota el cubo en el eje x según el desplazamiento vertical del mouse
-                    cube_euler_angles[1] += dx  # Rota el cubo en el eje y según el desplazamiento horizontal del mouse
-                    last_mouse_pos = mouse_pos  # Actualiza la última posición del mouse
-
-        cube_euler_angles[0] %= 360  # Limita la rotación en el eje x a 360 grados
-        cube_euler_angles[1] %= 360  # Limita la rotación en el eje y a 360 grados
-        cube_quaternion = euler_to_quaternion(cube_euler_angles[0], cube_euler_angles[1], 0)  # Actualiza el quaternion del cubo
-        cube_euler_principal = quaternion_to_euler_principal(cube_quaternion[0], cube_quaternion[1], cube_quaternion[2], cube_quaternion[3])  # Actualiza el euler principal del cubo
-        cube_rotation_matrix = euler_to_rotation_matrix(cube_euler_angles[0], cube_euler_angles[1], 0)  # Actualiza la matriz de rotación del cubo
-        cube_rotation_vector = rotation_matrix_to_rotation_vector(cube_rotation_matrix)  # Actualiza el vector de rotación del cubo
-
-        glLoadIdentity()
-        gluPerspective(fov, (display[0]/display[1]), 0.1, 100.0)  # Actualiza el campo de visión
-        glTranslatef(0.0, 0.0, -5)
-        glEnable(GL_CULL_FACE)
-        glCullFace(GL_BACK)
-        glClear(GL_COLOR_BUFFER_BIT|GL_DEPTH_BUFFER_BIT)
-
-        if current_figure is not None:  # Si hay una figura seleccionada
-            glPushMatrix()  # Guarda la matriz de transformación actual
-            glRotatef(cube_euler_angles[0], 1, 0, 0)  # Rota la figura en el eje x
-            glRotatef(cube_euler_angles[1], 0, 1, 0)  # Rota la figura en el eje y
-            current_figure.draw()  # Dibuja la figura
-            glPopMatrix()  # Restaura la matriz de transformación
-
-        pygame.display.set_caption("Ventana 3D: Presiona Q para ver los controles")
-
-        pygame.display.flip()
-        pygame.time.wait(10)
-
-def start_info_window(cube_rotation, cube_quaternion, cube_euler_principal, cube_rotation_vector, cube_rotation_matrix):
-    def update_info_window():
-        rotation_label.config(text="Euler Angles: " + str(cube_rotation))
-
-        print_quaternion = euler_to_quaternion(cube_rotation[0], cube_rotation[1], 0)
-        quaternion_label.config(text="Quaternion: (" + ", ".join(f"{i:.4f}" for i in print_quaternion) + ")")
-
-        print_euler_principal = quaternion_to_euler_principal(print_quaternion[0], print_quaternion[1], print_quaternion[2], print_quaternion[3])
-        euler_principal_label.config(text="Euler Principal: (" + ", ".join(f"{i:.4f}" for i in print_euler_principal) + ")")
-
-        print_rotation_matrix = euler_to_rotation_matrix(cube_rotation[0], cube_rotation[1], 0)
-        rotation_matrix_string = '\n'.join(['\t'.join([format(cell, ".4f") for cell in row]) for row in print_rotation_matrix])
-        rotation_matrix_label.config(text="Rotation Matrix:\n" + rotation_matrix_string)
-
-        print_rotation_vector = rotation_matrix_to_rotation_vector(print_rotation_matrix)
-        rotation_vector_string = ', '.join([format(i[0], ".4f") for i in print_rotation_vector])
-        rotation_vector_label.config(text="Rotation Vector: " + rotation_vector_string)
-        
-        info_window.after(100, update_info_window)  # Actualiza la ventana de información cada 100 ms
-
-    info_window = tk.Tk()
-    info_window.title("Information")
-
-    rotation_label = tk.Label(info_window)
-    rotation_label.pack()
-
-    quaternion_label = tk.Label(info_window)
-    quaternion_label.pack()
-
-    euler_principal_label = tk.Label(info_window)
-    euler_principal_label.pack()
-
-    rotation_vector_label = tk.Label(info_window)
-    rotation_vector_label.pack()
-
-    rotation_matrix_label = tk.Label(info_window)
-    rotation_matrix_label.pack()
-
-    info_window.after(100, update_info_window)
-    info_window.mainloop()
-
-def euler_to_quaternion(roll, pitch, yaw):
-    cos_roll_2 = np.cos(roll/2)
-    sin_roll_2 = np.sin(roll/2)
-    cos_pitch_2 = np.cos(pitch/2)
-    sin_pitch_2 = np.sin(pitch/2)
-    cos_yaw_2 = np.cos(yaw/2)
-    sin_yaw_2 = np.sin(yaw/2)
-
-    qx = sin_roll_2 * cos_pitch_2 * cos_yaw_2 - cos_roll_2 * sin_pitch_2 * sin_yaw_2
-    qy = cos_roll_2 * sin_pitch_2 * cos_yaw_2 + sin_roll_2 * cos_pitch_2 * sin_yaw_2
-    qz = cos_roll_2 * cos_pitch_2 * sin_yaw_2 - sin_roll_2 * sin_pitch_2 * cos_yaw_2
-    qw = cos_roll_2 * cos_pitch_2 * cos_yaw_2 + sin_roll_2 * sin_pitch_2 * sin_yaw_2
-    return [qx, qy, qz, qw]
-
-def queaternion_to_cube_rotationxy(qx, qy, qz, qw):
-    roll = np.arctan2(2*(qw*qx + qy*qz), 1 - 2*(qx**2 + qy**2))
-    pitch = np.arcsin(2*(qw*qy - qz*qx))
-    yaw = np.arctan2(2*(qw*qz + qx*qy), 1 - 2*(qy**2 + qz**2))
-    return [roll, pitch, yaw]
-
-def quaternion_to_euler_principal(x, y, z, w):
-    roll = np.arctan2(2*(w*x + y*z), 1 - 2*(x**2 + y**2))
-    pitch = np.arcsin(2*(w*y - z*x))
-    yaw = np.arctan2(2*(w*z + x*y), 1 - 2*(y**2 + z**2))
-    return [roll, pitch, yaw]
-
-def euler_principal_to_quaternion(roll, pitch, yaw):
-    cos_roll_2 = np.cos(roll/2)
-    sin_roll_2 = np.sin(roll/2)
-    cos_pitch_2 = np.cos(pitch/2)
-    sin_pitch_2 = np.sin(pitch/2)
-    cos_yaw_2 = np.cos(yaw/2)
-    sin_yaw_2 = np.sin(yaw/2)
-
-    qx = sin_roll_2 * cos_pitch_2 * cos_yaw_2 - cos_roll_2 * sin_pitch_2 * sin_yaw_2
-    qy = cos_roll_2 * sin_pitch_2 * cos_yaw_2 + sin_roll_2 * cos_pitch_2 * sin_yaw_2
-    qz = cos_roll_2 * cos_pitch_2 * sin_yaw_2 - sin_roll_2 * sin_pitch_2 * cos_yaw_2
-    qw = cos_roll_2 * cos_pitch_2 * cos_yaw_2 + sin_roll_2 * sin_pitch_2 * sin_yaw_2
-    return [qx, qy, qz, qw]
-
-def euler_principal_to_cube_rotationxy(roll, pitch, yaw):
-    roll = np.arctan2(np.sin(roll), np.cos(roll))
-    pitch = np.arctan2(np.sin(pitch), np.cos(pitch))
-    yaw = np.arctan2(np.sin(yaw), np.cos(yaw))
-    return [roll, pitch, yaw]
-
-def rotation_vector_to_quaternion(x, y, z):
-    theta = np.sqrt(x**2 + y**2 + z**2)
-    qx = x * np.sin(theta/2)/theta
-    qy = y * np.sin(theta/2)/theta
-    qz = z * np.sin(theta/2)/theta
-    qw = np.cos(theta/2)
-    return [qx, qy, qz, qw]
-
-def euler_to_rotation_matrix(roll, pitch, yaw):
-    R_x = np.array([[1, 0, 0],
-                    [0, np.cos(roll), -np.sin(roll)],
-                    [0, np.sin(roll), np.cos(roll)]])
-
-    R_y = np.array([[np.cos(pitch), 0, np.sin(pitch)],
-                    [0, 1, 0],
-                    [-np.sin(pitch), 0, np.cos(pitch)]])
-
-    R_z = np.array([[np.cos(yaw), -np.sin(yaw), 0],
-                    [np.sin(yaw), np.cos(yaw), 0],
-                    [0, 0, 1]])
-
-    R = np.dot(R_z, np.dot(R_y, R_x))
-    return R
-
-def rotation_matrix_to_rotation_vector(R):
-    theta = np.arccos((R[0, 0] + R[1, 1] + R[2, 2] - 1)/2)
-    k = 1/(2*np.sin(theta)) * np.array([[R[2, 1] - R[1, 2]],
-                                         [R[0, 2] - R[2, 0]],
-                                         [R[1, 0] - R[0, 1]]])
-    return theta*k
-
-def rotation_matrix_to_cube_rotationxy(R):
-    roll = np.arctan2(R[2, 1], R[2, 2])
-    pitch = np.arctan2(-R[2, 0], np.sqrt(R[2, 1]**2 + R[2, 2]**2))
-    yaw = np.arctan2(R[1, 0], R[0, 0])
-    return [roll, pitch, yaw]
-
-def rotation_vector_to_cube_rotationxy(x, y, z):
-    theta = np.sqrt(x**2 + y**2 + z**2)
-    roll = np.arctan2(z, y)
-    pitch = np.arctan2(-z, x)
-    yaw = np.arctan2(y, x)
-    return [roll, pitch, yaw]
+        keys = pygame.key.get_pressed()
+        if (on_demand and not window_exposed and player is None and transition is None
+                and not any(keys[key] for key in ARROW_KEYS)):
+            # En modo bajo demanda el visor se bloquea hasta el siguiente evento en vez de redibujar
+            events = [pygame.event.wait(UI_POLL_MS)]
+            clock.reset()  # El tiempo bloqueado no cuenta como delta time
+            profiler.cancel_frame()  # Ni como tiempo de ninguna etapa
+        else:
+            events = []
+
+        with profiler.stage("events"):
+            events += pygame.event.get()
+            for event in events:
+                if overlay.handle_event(event):  # Mientras se escribe, las teclas son para la línea de entrada
+                    continue
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    quit()
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):  # La ventana se volvió a mostrar
+                    window_exposed = True
+                elif event.type == pygame.KEYDOWN:  # Si se presiona una tecla
+                    if event.key == pygame.K_ESCAPE:  # Si la tecla es ESC
+                        pygame.quit()  # Cierra pygame
+                        quit()  # Cierra la ventana
+                    elif event.key == pygame.K_1:  # Si la tecla es 1, 2, 3 o 4
+                        current_figure = figures[1]
+                    elif event.key == pygame.K_2:  # Si la tecla es 1, 2, 3 o 4
+                        current_figure = figures[2]  # Cambia la figura actual
+                    elif event.key == pygame.K_3 and 3 in figures:  # Si la tecla es 3 y el modelo se cargó
+                        current_figure = figures[3]
+                    elif event.key == pygame.K_4:  # Si la tecla es 4, todas las figuras en una escena
+                        current_figure = figures[4]
+                    elif event.key == pygame.K_r:  # Si la tecla 'R' se presiona
+                        cube_rotation.set_from_quaternion((0.0, 0.0, 0.0, 1.0))  # Reinicia la rotación del cubo
+                    elif event.key == pygame.K_q:  # Si la tecla 'Q' se presiona
+                        ui.request("controls")  # La ventana de controles se abre en el proceso del panel
+                    elif event.key in DIALOG_KEYS:  # M, N, B, V o C: se escribe la rotación en la ventana sin pararla
+                        overlay.open(DIALOG_KEYS[event.key])
+                    elif event.key == pygame.K_p:  # Si la tecla 'P' se presiona, muestra u oculta los tiempos del frame
+                        profiler_hud.toggle()
+                elif event.type == pygame.MOUSEBUTTONDOWN:  # Si el botón del mouse se presiona
+                    if event.button == 1:  # Si el botón izquierdo del mouse se presiona
+                        mouse_down = True
+                        arcball.press(*event.pos)  # Punto de la esfera que se agarra
+                    elif event.button == 4:  # Si se gira la rueda del mouse hacia arriba
+                        fov = max(1, fov - 1)  # Disminuye el campo de visión para hacer zoom in
+                    elif event.button == 5:  # Si se gira la rueda del mouse hacia abajo
+                        fov = min(180, fov + 1)  # Aumenta el campo de visión para hacer zoom out
+                elif event.type == pygame.MOUSEBUTTONUP:  # Si el botón del mouse se suelta
+                    if event.button == 1:  # Si el botón izquierdo del mouse se suelta
+                        mouse_down = False
+                        arcball.release()
+                elif event.type == pygame.MOUSEMOTION:  # Si el mouse se mueve
+                    if mouse_down:  # Si el botón izquierdo del mouse está presionado
+                        # El cubo gira como una esfera arrastrada: el punto agarrado sigue al cursor
+                        cube_rotation.set_from_quaternion(arcball.drag(cube_rotation.quaternion, *event.pos))
+
+        # Valores que el usuario escribió en los diálogos del panel o en la línea de entrada
+        with profiler.stage("commands"):
+            rotation_before = cube_rotation.quaternion
+            for command, values in ui.commands() + overlay.take():
+                if command == "euler":  # Los grados en x e y de los glRotatef de siempre: R = R_x · R_y
+                    x, y = values
+                    around_y = rotate_about_axis((0.0, 0.0, 0.0, 1.0), (0, 1, 0), y)
+                    cube_rotation.set_from_quaternion(rotate_about_axis(around_y, (1, 0, 0), x))
+                elif command == "quaternion":
+                    w, x, y, z = values
+                    cube_rotation.set_from_quaternion((x, y, z, w))
+                elif command == "euler_principal":  # Aquí son ángulos de Euler (roll, pitch, yaw) en radianes
+                    cube_rotation.set_from_euler_angles(*values)
+                elif command == "rotation_vector":
+                    cube_rotation.set_from_rotation_vector(*values)
+                elif command == "rotation_matrix":
+                    cube_rotation.set_from_rotation_matrix(np.array(values).reshape(3, 3))
+            if cube_rotation.quaternion is not rotation_before:  # No se salta a la rotación nueva: se llega animando
+                transition = Transition(rotation_before, cube_rotation.quaternion)
+                cube_rotation.set_from_quaternion(rotation_before)
+            if transition is not None:
+                cube_rotation.set_from_quaternion(transition.current())
+                if transition.finished:
+                    transition = None
+
+        # Las flechas rotan a velocidad constante mientras están pulsadas, sin depender de los FPS
+        with profiler.stage("input"):
+            keys = pygame.key.get_pressed()
+            if overlay.active is not None:  # Las flechas no rotan mientras se escribe
+                keys = NO_KEYS
+            key_rotation = KEY_ROTATION_SPEED * clock.delta_time
+            horizontal = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]  # Rotar a la izquierda o a la derecha
+            vertical = keys[pygame.K_DOWN] - keys[pygame.K_UP]  # Rotar hacia arriba o hacia abajo
+            if horizontal:
+                cube_rotation.set_from_quaternion(rotate_about_axis(cube_rotation.quaternion, (0, 1, 0), horizontal * key_rotation))
+            if vertical:
+                cube_rotation.set_from_quaternion(rotate_about_axis(cube_rotation.quaternion, (1, 0, 0), vertical * key_rotation))
+
+            if player is not None:  # Mientras se reproduce un log, manda sobre el teclado y el mouse
+                played = player.current()
+                if played is None:  # Se terminó: el usuario recupera el control
+                    player = None
+                elif played != cube_rotation.quaternion:  # Entre dos muestras del log no cambia nada
+                    cube_rotation.set_from_quaternion(played)
+
+        with profiler.stage("publish"):
+            if cube_rotation.quaternion is not published_quaternion:  # Solo se publica cuando la rotación cambió
+                published_quaternion = cube_rotation.quaternion
+                if recorder is not None:
+                    recorder.record(published_quaternion)
+                # El panel muestra los ángulos de Euler en grados, como los glRotatef y los diálogos de este visor
+                rotation_feed.publish(np.degrees(cube_rotation.euler_angles), published_quaternion, cube_rotation.euler_principal,
+                                      cube_rotation.rotation_vector, cube_rotation.rotation_matrix)
+                gl_rotation_matrix(published_quaternion, model_matrix)  # La matriz solo se reescribe si cambió la rotación
+
+        view_state = (published_quaternion, fov, current_figure, overlay.version, profiler_hud.version)
+        if on_demand and view_state == last_view_state and not window_exposed:
+            clock.tick()
+            profiler.cancel_frame()  # Solo cuentan los frames que se dibujan
+            continue  # Nada cambió: no se recalcula ni se redibuja
+        last_view_state = view_state
+        window_exposed = False
+
+        with profiler.stage("draw"):
+            glLoadIdentity()
+            gluPerspective(fov, (display[0]/display[1]), 0.1, 100.0)  # Actualiza el campo de visión
+            glTranslatef(0.0, 0.0, -5)
+            glEnable(GL_CULL_FACE)
+            glCullFace(GL_BACK)
+            glClear(GL_COLOR_BUFFER_BIT|GL_DEPTH_BUFFER_BIT)
+
+            if current_figure is not None:  # Si hay una figura seleccionada
+                glPushMatrix()  # Guarda la matriz de transformación actual
+                raw_glMultMatrixf(model_matrix_pointer)  # Rota la figura con la matriz de su cuaternión
+                current_figure.draw()  # Dibuja la figura
+                glPopMatrix()  # Restaura la matriz de transformación
+            overlay.draw()  # La línea de entrada va encima de la figura
+            profiler_hud.draw()
+
+        with profiler.stage("flip"):
+            pygame.display.flip()
+        with profiler.stage("wait"):
+            clock.tick()  # Espera lo necesario para mantener los FPS objetivo
+        profiler.end_frame()
+        profiler_hud.update()
+
+        if time.perf_counter() - last_caption_update >= 1:  # Muestra las estadísticas de frame una vez por segundo
+            stats = clock.stats()
+            caption = f"{CAPTION} | {stats.fps:.0f} FPS, {stats.work_ms:.1f} ms por frame"
+            culling = getattr(current_figure, "culling", None)  # Las escenas y las flotas cuentan lo que descartan
+            if culling is not None:
+                caption += f" | {culling}"
+            pygame.display.set_caption(caption)
+            last_caption_update = time.perf_counter()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Ventana 3D")
+    parser.add_argument("--fps", type=int, default=60, help="FPS objetivo (0 para no limitarlos)")
+    parser.add_argument("--vsync", action="store_true", help="sincroniza los frames con el refresco de la pantalla")
+    parser.add_argument("--on-demand", action="store_true", help="solo redibuja cuando cambian la rotación, el fov o la figura")
+    parser.add_argument("--info-refresh-ms", type=int, default=DEFAULT_REFRESH_MS, help="cada cuánto se actualiza la ventana de información")
+    parser.add_argument("--monitors", type=int, default=1, help="paneles de información que se abren al arrancar")
+    parser.add_argument("--record", metavar="ARCHIVO", help="graba las orientaciones en un log binario (se añaden al final)")
+    parser.add_argument("--play", metavar="ARCHIVO", help="reproduce un log de orientaciones grabado")
+    parser.add_argument("--speed", type=float, default=1.0, help="velocidad de reproducción (1 es tiempo real)")
+    parser.add_argument("--loop", action="store_true", help="reproduce el log en bucle")
+    parser.add_argument("--instances", metavar="N_O_ARCHIVO",
+                        help="dibuja una flota: N orientaciones aleatorias o un .npy (N,4) de cuaterniones (x, y, z, w)")
+    parser.add_argument("--profile", action="store_true", help="muestra los percentiles del tiempo de cada etapa del frame")
+    parser.add_argument("--profile-out", metavar="ARCHIVO", help="guarda el tiempo de cada etapa de cada frame en un .csv o .json")
+    args = parser.parse_args()
+    main(target_fps=args.fps, vsync=args.vsync, on_demand=args.on_demand, info_refresh_ms=args.info_refresh_ms,
+         monitors=args.monitors,
+         record_path=args.record, play_path=args.play, play_speed=args.speed, play_loop=args.loop,
+         instances=load_quaternions(args.instances) if args.instances else None,
+         profile=args.profile, profile_path=args.profile_out)
 
 
 #hola muy buenas
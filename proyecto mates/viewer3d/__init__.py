@@ -0,0 +1,4 @@
+# Utilidades del visor 3D que se pueden importar desde los scripts y los benchmarks.
+# Este archivo no importa pygame, Tk ni OpenGL: los módulos que los necesitan se importan aparte.
+
+from viewer3d.rotation import Rotation
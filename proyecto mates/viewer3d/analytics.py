@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from viewer3d import batch
+from viewer3d.orientation_log import OrientationLog
+
+# Conversión por lotes de logs de orientación largos a columnas (ángulos de Euler, matriz,
+# vector de rotación...), repartida entre procesos.
+#   python -m viewer3d.analytics sesion.qlog columnas/ --workers 8
+#
+# La entrada es un log de viewer3d.orientation_log o un .npy (N, 4) de cuaterniones (x, y, z, w);
+# se mapea en memoria y se divide en bloques de chunk_rows filas. Cada bloque lo convierte un
+# proceso de un ProcessPoolExecutor que abre la entrada y las salidas por su ruta: entre procesos
+# solo viajan los índices del bloque, nunca arrays. Los cuaterniones se normalizan antes de
+# convertir (los de un sensor no tienen norma 1 exacta, y en el log van en float32).
+#
+# La salida es un directorio con un .npy por columna (N, ...) creado al principio a su tamaño
+# final y mapeado en memoria por todos los procesos, que escriben cada uno sus filas. Además:
+#   manifest.json  entrada, filas, tamaño de bloque, columnas y tipo
+#   progress.npy   un byte por bloque, 1 cuando el bloque está escrito y volcado a disco
+# Si la conversión se interrumpe (Ctrl+C, el proceso muere...), volver a lanzarla con los mismos
+# argumentos solo convierte los bloques que faltan.
+
+CHUNK_ROWS = 1 << 20
+MANIFEST = "manifest.json"
+PROGRESS = "progress.npy"
+TIMESTAMP_COLUMN = "timestamp"  # Solo con logs: los tiempos de cada registro
+
+# nombre: (conversión de viewer3d.batch, forma de cada fila)
+COLUMNS = {
+    "euler_principal": (batch.quaternion_to_euler_principal, (3,)),
+    "rotation_matrix": (batch.quaternion_to_rotation_matrix, (3, 3)),
+    "rotation_vector": (batch.quaternion_to_rotation_vector, (3,)),
+    "axis_angle": (batch.quaternion_to_axis_angle, (4,)),
+}
+DEFAULT_COLUMNS = ("euler_principal", "rotation_matrix", "rotation_vector")
+
+class ResumeError(ValueError):
+    pass
+
+def open_input(path):
+    # (cuaterniones mapeados en memoria, es_log): registros de un log o un array (N, 4)
+    if path.endswith(".npy"):
+        quaternions = np.load(path, mmap_mode="r")
+        if quaternions.ndim != 2 or quaternions.shape[1] != 4:
+            raise ValueError(f"{path}: se esperaban cuaterniones (N,4), no {quaternions.shape}")
+        return quaternions, False
+    return OrientationLog(path).records, True
+
+def read_quaternions(source, is_log, start, stop):
+    # Filas [start, stop) como cuaterniones (x, y, z, w) float64 de norma 1
+    if is_log:
+        quaternions = np.empty((stop - start, 4))
+        stored = source["quaternion"][start:stop]  # (w, x, y, z)
+        quaternions[:, :3] = stored[:, 1:]
+        quaternions[:, 3] = stored[:, 0]
+    else:
+        quaternions = np.array(source[start:stop], dtype=np.float64)
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    return quaternions
+
+def _column_path(output_dir, column):
+    return os.path.join(output_dir, f"{column}.npy")
+
+# En cada proceso trabajador, la entrada y las salidas abiertas (se abren con el primer bloque)
+_opened = {}
+
+def _open_for_worker(input_path, output_dir, columns):
+    key = (input_path, output_dir, columns)
+    if key not in _opened:
+        _opened.clear()
+        source, is_log = open_input(input_path)
+        outputs = {column: np.load(_column_path(output_dir, column), mmap_mode="r+") for column in columns}
+        _opened[key] = source, is_log, outputs
+    return _opened[key]
+
+def _init_worker():
+    # Ctrl+C lo atiende el proceso principal, que deja terminar los bloques empezados
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Los núcleos de numba no reparten cada bloque entre hilos: ya hay un proceso por núcleo
+    if batch.KERNEL_TIER == "numba":
+        from numba import set_num_threads
+        set_num_threads(1)
+
+def convert_chunk(input_path, output_dir, columns, start, stop):
+    # Convierte las filas [start, stop) y las escribe en las columnas; devuelve las filas convertidas
+    source, is_log, outputs = _open_for_worker(input_path, output_dir, columns)
+    quaternions = read_quaternions(source, is_log, start, stop)
+    for column, output in outputs.items():
+        if column == TIMESTAMP_COLUMN:
+            output[start:stop] = source["timestamp"][start:stop]
+        else:
+            output[start:stop] = COLUMNS[column][0](quaternions)
+    for output in outputs.values():
+        output.flush()  # El bloque solo se marca como hecho cuando ya está en el archivo
+    return stop - start
+
+def _manifest(input_path, rows, chunk_rows, columns, dtype):
+    status = os.stat(input_path)
+    return {"input": os.path.abspath(input_path), "input_bytes": status.st_size, "input_mtime": status.st_mtime,
+            "rows": rows, "chunk_rows": chunk_rows, "columns": list(columns), "dtype": dtype}
+
+def _prepare_output(output_dir, manifest, restart):
+    # Crea las columnas y el progreso, o abre los de una conversión anterior con la misma configuración
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    chunks = -(-manifest["rows"] // manifest["chunk_rows"])
+    if not restart and os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            previous = json.load(file)
+        if previous != manifest:
+            raise ResumeError(f"{output_dir} tiene otra conversión ({previous['input']}, "
+                              f"{previous['rows']} filas); usa --restart para empezarla de nuevo")
+        return np.load(os.path.join(output_dir, PROGRESS), mmap_mode="r+")
+
+    rows, dtype = manifest["rows"], np.dtype(manifest["dtype"])
+    for column in manifest["columns"]:
+        shape = (rows,) if column == TIMESTAMP_COLUMN else (rows,) + COLUMNS[column][1]
+        column_dtype = np.float64 if column == TIMESTAMP_COLUMN else dtype
+        np.lib.format.open_memmap(_column_path(output_dir, column), mode="w+", dtype=column_dtype, shape=shape)
+    progress = np.lib.format.open_memmap(os.path.join(output_dir, PROGRESS), mode="w+", dtype=np.uint8, shape=(chunks,))
+    with open(manifest_path, "w") as file:  # El último: sin él, la siguiente vez se empieza de cero
+        json.dump(manifest, file, indent=1)
+    return progress
+
+def analyze(input_path, output_dir, columns=DEFAULT_COLUMNS, workers=None, chunk_rows=CHUNK_ROWS,
+            dtype="float64", restart=False, report=print):
+    # Convierte los bloques que faltan; devuelve (filas convertidas ahora, filas que ya estaban, segundos)
+    source, is_log = open_input(input_path)
+    rows = len(source)
+    del source
+    columns = tuple(columns) + ((TIMESTAMP_COLUMN,) if is_log and TIMESTAMP_COLUMN not in columns else ())
+    manifest = _manifest(input_path, rows, chunk_rows, columns, np.dtype(dtype).name)
+    progress = _prepare_output(output_dir, manifest, restart)
+
+    pending = [index for index in range(len(progress)) if not progress[index]]
+    already = rows - sum(min(chunk_rows, rows - index * chunk_rows) for index in pending)
+    if already:
+        report(f"reanudando: {already:,d} de {rows:,d} filas ya convertidas")
+    done = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {executor.submit(convert_chunk, input_path, output_dir, columns,
+                                   index * chunk_rows, min((index + 1) * chunk_rows, rows)): index
+                   for index in pending}
+        try:
+            while futures:
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = futures.pop(future)
+                    done += future.result()
+                    progress[index] = 1
+                progress.flush()
+        except BaseException:  # Ctrl+C o un bloque que falla: se marcan también los que terminan mientras tanto
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future, index in futures.items():
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    progress[index] = 1
+            progress.flush()
+            raise
+    return done, already, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convierte un log de orientaciones a columnas con varios procesos")
+    parser.add_argument("input", help="log de orientaciones (.qlog) o .npy (N,4) de cuaterniones (x, y, z, w)")
+    parser.add_argument("output", help="directorio de salida, un .npy por columna")
+    parser.add_argument("--columns", nargs="+", choices=tuple(COLUMNS), default=DEFAULT_COLUMNS)
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto uno por núcleo)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="filas por bloque")
+    parser.add_argument("--dtype", choices=("float64", "float32"), default="float64")
+    parser.add_argument("--restart", action="store_true", help="descarta el progreso de una conversión anterior")
+    args = parser.parse_args(argv)
+
+    try:
+        done, already, seconds = analyze(args.input, args.output, args.columns, args.workers, args.chunk,
+                                         args.dtype, args.restart)
+    except ResumeError as error:
+        parser.error(str(error))
+    rate = done / seconds if seconds > 0 else 0.0
+    print(f"{done:,d} filas en {seconds:.2f} s ({rate:,.0f} filas/s), {done + already:,d} en total")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import math
+
+# Rotación con el mouse como si se arrastrara una esfera que envuelve la figura (arcball).
+# Cada MOUSEMOTION se convierte en el cuaternión que lleva el punto de la esfera bajo el cursor
+# anterior al punto bajo el cursor actual, y se compone directamente con la orientación: no se
+# pasa por ángulos de Euler, así que no hay bloqueo de cardán y el coste es unas pocas
+# multiplicaciones por evento. Todo en escalares con math, como Rotation.
+#
+# Para dibujar, viewer3d.transforms escribe la matriz 4x4 del cuaternión en un buffer reservado
+# una vez, que se pasa a glMultMatrixf. Los cuaterniones van en orden (x, y, z, w).
+
+def quaternion_multiply(a, b):
+    # Producto de Hamilton a·b: la rotación b seguida de la rotación a
+    ax, ay, az, aw = a
+    bx, by, bz, bw = b
+    return (aw*bx + ax*bw + ay*bz - az*by,
+            aw*by - ax*bz + ay*bw + az*bx,
+            aw*bz + ax*by - ay*bx + az*bw,
+            aw*bw - ax*bx - ay*by - az*bz)
+
+def normalize_quaternion(q):
+    # Las composiciones acumulan error de redondeo: se renormaliza en cada paso
+    x, y, z, w = q
+    norm = math.sqrt(x*x + y*y + z*z + w*w)
+    return (x/norm, y/norm, z/norm, w/norm)
+
+def rotate_about_axis(quaternion, axis, degrees):
+    # Gira la orientación alrededor de un eje de la vista (unitario), p. ej. (0, 1, 0) para el eje vertical de la pantalla
+    half = math.radians(degrees) / 2
+    s = math.sin(half)
+    increment = (axis[0]*s, axis[1]*s, axis[2]*s, math.cos(half))
+    return normalize_quaternion(quaternion_multiply(increment, quaternion))
+
+class Arcball:
+    def __init__(self, width, height):
+        self.resize(width, height)
+        self._last_point = None  # Punto de la esfera bajo el cursor en el último evento
+
+    def resize(self, width, height):
+        # La esfera está centrada en la ventana y su radio es la mitad del lado menor
+        self._center_x = width / 2
+        self._center_y = height / 2
+        self._radius = min(width, height) / 2
+
+    def _sphere_point(self, x, y):
+        # Punto unitario bajo el cursor, con y hacia arriba y z hacia el observador. Fuera de la
+        # esfera se usa una hipérbola (Bell) para que la rotación no salte al salir del círculo.
+        px = (x - self._center_x) / self._radius
+        py = (self._center_y - y) / self._radius
+        distance2 = px*px + py*py
+        pz = math.sqrt(1 - distance2) if distance2 <= 0.5 else 0.5 / math.sqrt(distance2)
+        norm = math.sqrt(distance2 + pz*pz)
+        return (px/norm, py/norm, pz/norm)
+
+    def press(self, x, y):
+        self._last_point = self._sphere_point(x, y)
+
+    def release(self):
+        self._last_point = None
+
+    def drag(self, quaternion, x, y):
+        # La orientación después de llevar el cursor hasta (x, y) en píxeles de la ventana
+        if self._last_point is None:
+            self.press(x, y)
+            return quaternion
+        ax, ay, az = self._last_point
+        bx, by, bz = self._last_point = self._sphere_point(x, y)
+        # Rotación mínima de a a b: eje a×b y ángulo el que forman (cuaternión (a×b, 1 + a·b) normalizado)
+        increment = (ay*bz - az*by, az*bx - ax*bz, ax*by - ay*bx, 1 + ax*bx + ay*by + az*bz)
+        return normalize_quaternion(quaternion_multiply(normalize_quaternion(increment), quaternion))
@@ -0,0 +1,287 @@
+import os
+
+import numpy as np
+
+# Versiones vectorizadas de las conversiones de viewer3d.rotation.
+# Cada función recibe arrays con la última dimensión igual a la de la representación
+# (N,3) euler, (N,4) quaternion (x, y, z, w), (N,4) ángulo y eje (angle, x, y, z),
+# (N,3) vector de rotación y (N,3,3) matriz, y devuelve el mismo resultado que la versión
+# escalar fila por fila, sin bucles de Python.
+#
+# Las conversiones no tienen casos especiales por fila: los ángulos nulos, los de 180 grados y los
+# valores que el redondeo deja un poco fuera de [-1, 1] se resuelven con fórmulas que valen para
+# todo el array (la matriz a cuaternión con el método de Shepperd, los cocientes sin(θ)/θ con su
+# desarrollo en serie cerca de 0 y arcsin con el argumento recortado), así que una muestra mala
+# no llena de NaN el resultado ni obliga a convertir fila por fila.
+#
+# Con numba instalado, al importar el módulo las conversiones públicas se cambian por las de
+# viewer3d.batch_numba, que hacen cada fila en una sola pasada y reparten las filas entre los
+# núcleos (KERNEL_TIER dice cuáles se usan). Con VIEWER3D_KERNELS=numpy se usan siempre las de
+# NumPy, que siguen en NUMPY_CONVERSIONS. convert_into escribe el resultado en un array ya reservado.
+
+SERIES_THRESHOLD = 1e-3  # Por debajo de este ángulo (radianes) se usa el desarrollo en serie
+
+def _as_rows(values, size):
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[-1:] != (size,):
+        raise ValueError(f"se esperaba un array con la última dimensión igual a {size}, no {values.shape}")
+    return values
+
+def _as_matrices(R):
+    R = np.asarray(R, dtype=np.float64)
+    if R.shape[-2:] != (3, 3):
+        raise ValueError(f"se esperaba un array de matrices (..., 3, 3), no {R.shape}")
+    return R
+
+def euler_to_quaternion(euler):
+    euler = _as_rows(euler, 3)
+    half = euler / 2
+    cos_half = np.cos(half)
+    sin_half = np.sin(half)
+    cos_roll_2, cos_pitch_2, cos_yaw_2 = cos_half[..., 0], cos_half[..., 1], cos_half[..., 2]
+    sin_roll_2, sin_pitch_2, sin_yaw_2 = sin_half[..., 0], sin_half[..., 1], sin_half[..., 2]
+
+    q = np.empty(euler.shape[:-1] + (4,))
+    q[..., 0] = sin_roll_2 * cos_pitch_2 * cos_yaw_2 - cos_roll_2 * sin_pitch_2 * sin_yaw_2
+    q[..., 1] = cos_roll_2 * sin_pitch_2 * cos_yaw_2 + sin_roll_2 * cos_pitch_2 * sin_yaw_2
+    q[..., 2] = cos_roll_2 * cos_pitch_2 * sin_yaw_2 - sin_roll_2 * sin_pitch_2 * cos_yaw_2
+    q[..., 3] = cos_roll_2 * cos_pitch_2 * cos_yaw_2 + sin_roll_2 * sin_pitch_2 * sin_yaw_2
+    return q
+
+def quaternion_to_euler_principal(quaternion):
+    # Primero yaw y luego pitch y roll de Rz(-yaw)·R = Ry(pitch)·Rx(roll), cuyos elementos no se
+    # anulan cerca de ±90°: ahí yaw sale de dos valores casi nulos y es arbitrario (bloqueo de
+    # cardán), pero roll lo compensa y los tres ángulos dan la rotación original. Con atan2 el
+    # pitch no pierde precisión cerca de ±90° como arcsin, ni puede salirse de su dominio.
+    quaternion = _as_rows(quaternion, 4)
+    x, y, z, w = quaternion[..., 0], quaternion[..., 1], quaternion[..., 2], quaternion[..., 3]
+    r00, r01, r02 = 1 - 2*(y*y + z*z), 2*(x*y - z*w), 2*(x*z + y*w)
+    r10, r11, r12 = 2*(x*y + z*w), 1 - 2*(x*x + z*z), 2*(y*z - x*w)
+    r20 = 2*(x*z - y*w)
+
+    euler = np.empty(quaternion.shape[:-1] + (3,))
+    yaw = np.arctan2(r10, r00)
+    cos_yaw, sin_yaw = np.cos(yaw), np.sin(yaw)
+    euler[..., 0] = np.arctan2(sin_yaw*r02 - cos_yaw*r12, cos_yaw*r11 - sin_yaw*r01)
+    euler[..., 1] = np.arctan2(-r20, cos_yaw*r00 + sin_yaw*r10)
+    euler[..., 2] = yaw
+    return euler
+
+# queaternion_to_cube_rotationxy usa la misma fórmula que quaternion_to_euler_principal
+quaternion_to_cube_rotationxy = quaternion_to_euler_principal
+
+# euler_principal_to_quaternion es idéntica a euler_to_quaternion en la versión escalar
+euler_principal_to_quaternion = euler_to_quaternion
+
+def euler_principal_to_cube_rotationxy(euler_principal):
+    euler_principal = _as_rows(euler_principal, 3)
+    return np.arctan2(np.sin(euler_principal), np.cos(euler_principal))
+
+def _half_sinc(theta):
+    # sin(θ/2)/θ, con su serie 1/2 - θ²/48 + θ⁴/3840 cerca de 0 (donde el cociente es 0/0)
+    small = theta < SERIES_THRESHOLD
+    theta2 = theta * theta
+    return np.where(small, 0.5 - theta2/48 + theta2*theta2/3840, np.sin(theta/2) / np.where(small, 1, theta))
+
+def _norm(vectors):
+    # Norma de vectores (..., 3) con hypot: el cuadrado de componentes por debajo de 1e-154 se queda en
+    # cero o en un subnormal sin precisión
+    return np.hypot(np.hypot(vectors[..., 0], vectors[..., 1]), vectors[..., 2])
+
+def _log_factor(norm, w):
+    # 2·atan2(|v|, w)/|v|: la parte vectorial v del cuaternión por este factor es el vector de rotación.
+    # Con |v| = 0 el límite es 2/w (la identidad, o la vuelta entera si w < 0, da el vector nulo).
+    zero = norm == 0
+    with np.errstate(divide="ignore"):  # 2/w solo se usa donde v = 0, y ahí w no es 0 salvo en el cuaternión nulo
+        return np.where(zero, 2 / w, 2*np.arctan2(norm, w) / np.where(zero, 1, norm))
+
+def rotation_vector_to_quaternion(rotation_vector):
+    rotation_vector = _as_rows(rotation_vector, 3)
+    theta = _norm(rotation_vector)
+
+    q = np.empty(rotation_vector.shape[:-1] + (4,))
+    q[..., :3] = rotation_vector * _half_sinc(theta)[..., None]
+    q[..., 3] = np.cos(theta/2)
+    return q
+
+def axis_angle_to_quaternion(axis_angle):
+    axis_angle = _as_rows(axis_angle, 4)
+    half = axis_angle[..., 0] / 2
+    q = np.empty(axis_angle.shape)
+    q[..., :3] = axis_angle[..., 1:] * np.sin(half)[..., None]
+    q[..., 3] = np.cos(half)
+    return q
+
+def quaternion_to_axis_angle(quaternion):
+    # El ángulo con atan2 no pierde precisión cerca de 0 como arccos(w) ni da NaN si |w| pasa de 1.
+    # Solo sin parte vectorial (ángulo nulo) el eje no está definido y se usa el eje x.
+    quaternion = _as_rows(quaternion, 4)
+    norm = _norm(quaternion[..., :3])
+    zero = (norm == 0)[..., None]
+
+    axis_angle = np.empty(quaternion.shape)
+    axis_angle[..., 0] = 2*np.arctan2(norm, quaternion[..., 3])
+    axis_angle[..., 1:] = np.where(zero, (1, 0, 0), quaternion[..., :3] / np.where(zero, 1, norm[..., None]))
+    return axis_angle
+
+def _rotation_vector(quaternion):
+    norm = _norm(quaternion[..., :3])
+    with np.errstate(invalid="ignore"):  # El cuaternión nulo no es una rotación: da NaN
+        return quaternion[..., :3] * _log_factor(norm, quaternion[..., 3])[..., None]
+
+def quaternion_to_rotation_vector(quaternion):
+    return _rotation_vector(_as_rows(quaternion, 4))
+
+def quaternion_to_rotation_matrix(quaternion):
+    quaternion = _as_rows(quaternion, 4)
+    x, y, z, w = quaternion[..., 0], quaternion[..., 1], quaternion[..., 2], quaternion[..., 3]
+
+    R = np.empty(quaternion.shape[:-1] + (3, 3))
+    R[..., 0, 0] = 1 - 2*y*y - 2*z*z
+    R[..., 0, 1] = 2*x*y - 2*z*w
+    R[..., 0, 2] = 2*x*z + 2*y*w
+    R[..., 1, 0] = 2*x*y + 2*z*w
+    R[..., 1, 1] = 1 - 2*x*x - 2*z*z
+    R[..., 1, 2] = 2*y*z - 2*x*w
+    R[..., 2, 0] = 2*x*z - 2*y*w
+    R[..., 2, 1] = 2*y*z + 2*x*w
+    R[..., 2, 2] = 1 - 2*x*x - 2*y*y
+    return R
+
+def _outer_quaternion(R):
+    # Los productos 4·q_i·q_j del cuaternión (x, y, z, w) de cada matriz, (..., 4, 4)
+    r00, r01, r02 = R[..., 0, 0], R[..., 0, 1], R[..., 0, 2]
+    r10, r11, r12 = R[..., 1, 0], R[..., 1, 1], R[..., 1, 2]
+    r20, r21, r22 = R[..., 2, 0], R[..., 2, 1], R[..., 2, 2]
+    P = np.empty(R.shape[:-2] + (4, 4))
+    P[..., 0, 0] = 1 + r00 - r11 - r22
+    P[..., 1, 1] = 1 - r00 + r11 - r22
+    P[..., 2, 2] = 1 - r00 - r11 + r22
+    P[..., 3, 3] = 1 + r00 + r11 + r22
+    P[..., 0, 1] = P[..., 1, 0] = r01 + r10
+    P[..., 0, 2] = P[..., 2, 0] = r02 + r20
+    P[..., 1, 2] = P[..., 2, 1] = r12 + r21
+    P[..., 0, 3] = P[..., 3, 0] = r21 - r12
+    P[..., 1, 3] = P[..., 3, 1] = r02 - r20
+    P[..., 2, 3] = P[..., 3, 2] = r10 - r01
+    return P
+
+def _shepperd(R):
+    # Método de Shepperd: de las cuatro fórmulas (una por componente) se usa en cada matriz la de la
+    # componente mayor, que es la fila de P con la diagonal mayor; así nunca se divide por algo pequeño,
+    # ni a 180 grados (traza -1). El resultado tiene w >= 0, como con la fórmula de la traza.
+    P = _outer_quaternion(R)
+    diagonal = np.diagonal(P, axis1=-2, axis2=-1)
+    largest = np.argmax(diagonal, axis=-1)[..., None, None]
+    row = np.take_along_axis(P, np.broadcast_to(largest, P.shape[:-2] + (1, 4)), axis=-2)[..., 0, :]
+    q = row / (2*np.sqrt(np.take_along_axis(diagonal, largest[..., 0], axis=-1)))
+    return q * np.where(q[..., 3:] < 0, -1, 1)
+
+def rotation_matrix_to_quaternion(R):
+    return _shepperd(_as_matrices(R))
+
+def euler_to_rotation_matrix(euler):
+    euler = _as_rows(euler, 3)
+    cos_e = np.cos(euler)
+    sin_e = np.sin(euler)
+    cr, cp, cy = cos_e[..., 0], cos_e[..., 1], cos_e[..., 2]
+    sr, sp, sy = sin_e[..., 0], sin_e[..., 1], sin_e[..., 2]
+
+    # R = R_z · R_y · R_x desarrollada término a término
+    R = np.empty(euler.shape[:-1] + (3, 3))
+    R[..., 0, 0] = cy*cp
+    R[..., 0, 1] = cy*sp*sr - sy*cr
+    R[..., 0, 2] = cy*sp*cr + sy*sr
+    R[..., 1, 0] = sy*cp
+    R[..., 1, 1] = sy*sp*sr + cy*cr
+    R[..., 1, 2] = sy*sp*cr - cy*sr
+    R[..., 2, 0] = -sp
+    R[..., 2, 1] = cp*sr
+    R[..., 2, 2] = cp*cr
+    return R
+
+def rotation_matrix_to_rotation_vector(R):
+    # Devuelve (N,3) en vez de los vectores columna (3,1) de la versión escalar. Pasa por el
+    # cuaternión de Shepperd: la fórmula con θ/(2·sin θ) es 0/0 a 0 grados y pierde el eje a 180.
+    return _rotation_vector(_shepperd(_as_matrices(R)))
+
+def rotation_matrix_to_cube_rotationxy(R):
+    R = _as_matrices(R)
+    euler = np.empty(R.shape[:-2] + (3,))
+    euler[..., 0] = np.arctan2(R[..., 2, 1], R[..., 2, 2])
+    euler[..., 1] = np.arctan2(-R[..., 2, 0], np.sqrt(R[..., 2, 1]**2 + R[..., 2, 2]**2))
+    euler[..., 2] = np.arctan2(R[..., 1, 0], R[..., 0, 0])
+    return euler
+
+def rotation_vector_to_cube_rotationxy(rotation_vector):
+    rotation_vector = _as_rows(rotation_vector, 3)
+    x, y, z = rotation_vector[..., 0], rotation_vector[..., 1], rotation_vector[..., 2]
+
+    euler = np.empty(rotation_vector.shape[:-1] + (3,))
+    euler[..., 0] = np.arctan2(z, y)
+    euler[..., 1] = np.arctan2(-z, x)
+    euler[..., 2] = np.arctan2(y, x)
+    return euler
+
+CONVERSIONS = ("euler_to_quaternion", "quaternion_to_euler_principal", "euler_principal_to_cube_rotationxy",
+               "rotation_vector_to_quaternion", "axis_angle_to_quaternion", "quaternion_to_axis_angle",
+               "quaternion_to_rotation_vector", "quaternion_to_rotation_matrix", "rotation_matrix_to_quaternion",
+               "euler_to_rotation_matrix", "rotation_matrix_to_rotation_vector", "rotation_matrix_to_cube_rotationxy",
+               "rotation_vector_to_cube_rotationxy")
+NUMPY_CONVERSIONS = {name: globals()[name] for name in CONVERSIONS}
+ALIASES = {"quaternion_to_cube_rotationxy": "quaternion_to_euler_principal",
+           "euler_principal_to_quaternion": "euler_to_quaternion"}
+
+def _compiled(name, kernels, row_in, row_out, batch_numba):
+    # La conversión con la misma firma que la de NumPy: cualquier número de dimensiones delante de la fila
+    serial, parallel = kernels
+    check = _as_matrices if row_in == (3, 3) else lambda values: _as_rows(values, row_in[0])
+    # Las de SIMD_BOUND van con NumPy desde SIMD_ROWS filas, salvo que el núcleo se reparta entre varios hilos
+    fallback = NUMPY_CONVERSIONS[name] if name in batch_numba.SIMD_BOUND else None
+    parallel_rows = batch_numba.PARALLEL_ROWS if batch_numba.THREADS > 1 else np.inf
+    simd_rows = batch_numba.SIMD_ROWS
+
+    def convert(values, out=None):
+        # Con out (contiguo, con la forma del resultado) el núcleo escribe ahí y no se reserva nada más
+        values = check(values)
+        leading = values.shape[:values.ndim - len(row_in)]
+        if out is not None and (out.shape != leading + row_out or not out.flags.c_contiguous):
+            raise ValueError(f"out debe ser un array contiguo {leading + row_out}, no {out.shape}")
+        rows = np.ascontiguousarray(values.reshape((-1,) + row_in))
+        if fallback is not None and simd_rows <= len(rows) < parallel_rows:
+            if out is None:
+                return fallback(values)
+            out[...] = fallback(values)
+            return out
+        if out is None:
+            out = np.empty(leading + row_out)
+        (parallel if len(rows) >= parallel_rows else serial)(rows, out.reshape((-1,) + row_out))
+        return out
+    return convert
+
+def _load_compiled_conversions():
+    # {nombre: conversión compilada}, o None si numba no está instalado
+    try:
+        from viewer3d import batch_numba
+    except ImportError:
+        return None
+    return {name: _compiled(name, kernels, row_in, row_out, batch_numba)
+            for name, (kernels, row_in, row_out) in batch_numba.KERNELS.items()}
+
+COMPILED_CONVERSIONS = None if os.environ.get("VIEWER3D_KERNELS") == "numpy" else _load_compiled_conversions()
+KERNEL_TIER = "numpy" if COMPILED_CONVERSIONS is None else "numba"
+if COMPILED_CONVERSIONS is not None:
+    globals().update(COMPILED_CONVERSIONS)
+    quaternion_to_cube_rotationxy = quaternion_to_euler_principal
+    euler_principal_to_quaternion = euler_to_quaternion
+
+def convert_into(name, values, out):
+    # La conversión name de values escrita en out (de la forma del resultado) en vez de en un array nuevo.
+    # Con los núcleos compilados no se crea ningún array por llamada; con NumPy se copia el resultado.
+    if name not in CONVERSIONS and name not in ALIASES:
+        raise ValueError(f"{name} no es una conversión de batch")
+    conversion = globals()[ALIASES.get(name, name)]
+    if COMPILED_CONVERSIONS is None:
+        out[...] = conversion(values)
+        return out
+    return conversion(values, out)
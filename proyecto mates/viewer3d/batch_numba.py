@@ -0,0 +1,195 @@
+import math
+
+from numba import config, njit, prange
+
+from viewer3d.rotation import SERIES_THRESHOLD
+
+# Las conversiones de viewer3d.batch compiladas con numba. Cada una recorre las filas una vez y
+# calcula la fila entera (senos, cosenos y productos) en registros: sin los arrays intermedios
+# que NumPy crea en cada operación. Las fórmulas son las de batch (Shepperd, atan2, hypot, la
+# serie cerca de 0), fila a fila.
+#
+# Cada núcleo recibe un array contiguo (N, ...) y escribe en out (N, ...). Se compila dos veces:
+# en serie para pocas filas y repartido entre los núcleos con prange desde PARALLEL_ROWS, donde
+# arrancar los hilos ya compensa. La compilación es perezosa (la primera llamada con cada tipo)
+# y se guarda en __pycache__ para las siguientes ejecuciones.
+#
+# Las conversiones de SIMD_BOUND son casi solo atan2, sin y cos, que NumPy evalúa con instrucciones
+# SIMD: desde SIMD_ROWS filas su bucle en un hilo es más rápido que el compilado (que llama a libm
+# valor a valor), así que ahí el núcleo solo se usa cuando se reparte entre varios hilos. Con menos
+# filas gana el núcleo, porque cada operación de NumPy tiene un coste fijo de microsegundos.
+#
+# Importar este módulo sin numba instalado lanza ImportError; batch lo usa solo si se puede.
+
+PARALLEL_ROWS = 20_000
+SIMD_ROWS = 256
+THREADS = config.NUMBA_NUM_THREADS
+SIMD_BOUND = {"euler_principal_to_cube_rotationxy", "quaternion_to_rotation_vector",
+              "rotation_matrix_to_cube_rotationxy", "rotation_vector_to_cube_rotationxy"}
+OPTIONS = dict(cache=True, error_model="numpy")  # Divisiones por 0 como en NumPy: inf/NaN, sin excepción
+
+def _kernel(function):
+    # (versión en serie, versión paralela) del mismo bucle
+    return njit(**OPTIONS)(function), njit(parallel=True, **OPTIONS)(function)
+
+def _euler_to_quaternion(euler, out):
+    for i in prange(euler.shape[0]):
+        cr, sr = math.cos(euler[i, 0] / 2), math.sin(euler[i, 0] / 2)
+        cp, sp = math.cos(euler[i, 1] / 2), math.sin(euler[i, 1] / 2)
+        cy, sy = math.cos(euler[i, 2] / 2), math.sin(euler[i, 2] / 2)
+        out[i, 0] = sr * cp * cy - cr * sp * sy
+        out[i, 1] = cr * sp * cy + sr * cp * sy
+        out[i, 2] = cr * cp * sy - sr * sp * cy
+        out[i, 3] = cr * cp * cy + sr * sp * sy
+
+def _quaternion_to_euler_principal(quaternion, out):
+    for i in prange(quaternion.shape[0]):
+        x, y, z, w = quaternion[i, 0], quaternion[i, 1], quaternion[i, 2], quaternion[i, 3]
+        r00, r01, r02 = 1 - 2*(y*y + z*z), 2*(x*y - z*w), 2*(x*z + y*w)
+        r10, r11, r12 = 2*(x*y + z*w), 1 - 2*(x*x + z*z), 2*(y*z - x*w)
+        yaw = math.atan2(r10, r00)
+        cos_yaw, sin_yaw = math.cos(yaw), math.sin(yaw)
+        out[i, 0] = math.atan2(sin_yaw*r02 - cos_yaw*r12, cos_yaw*r11 - sin_yaw*r01)
+        out[i, 1] = math.atan2(-2*(x*z - y*w), cos_yaw*r00 + sin_yaw*r10)
+        out[i, 2] = yaw
+
+def _euler_principal_to_cube_rotationxy(euler_principal, out):
+    for i in prange(euler_principal.shape[0]):
+        for j in range(3):
+            out[i, j] = math.atan2(math.sin(euler_principal[i, j]), math.cos(euler_principal[i, j]))
+
+def _rotation_vector_to_quaternion(rotation_vector, out):
+    for i in prange(rotation_vector.shape[0]):
+        x, y, z = rotation_vector[i, 0], rotation_vector[i, 1], rotation_vector[i, 2]
+        theta = math.hypot(math.hypot(x, y), z)
+        if theta < SERIES_THRESHOLD:
+            theta2 = theta * theta
+            factor = 0.5 - theta2/48 + theta2*theta2/3840
+        else:
+            factor = math.sin(theta/2) / theta
+        out[i, 0] = x * factor
+        out[i, 1] = y * factor
+        out[i, 2] = z * factor
+        out[i, 3] = math.cos(theta/2)
+
+def _axis_angle_to_quaternion(axis_angle, out):
+    for i in prange(axis_angle.shape[0]):
+        half = axis_angle[i, 0] / 2
+        s = math.sin(half)
+        out[i, 0] = axis_angle[i, 1] * s
+        out[i, 1] = axis_angle[i, 2] * s
+        out[i, 2] = axis_angle[i, 3] * s
+        out[i, 3] = math.cos(half)
+
+def _quaternion_to_axis_angle(quaternion, out):
+    for i in prange(quaternion.shape[0]):
+        x, y, z = quaternion[i, 0], quaternion[i, 1], quaternion[i, 2]
+        norm = math.hypot(math.hypot(x, y), z)
+        out[i, 0] = 2*math.atan2(norm, quaternion[i, 3])
+        if norm == 0:
+            out[i, 1], out[i, 2], out[i, 3] = 1.0, 0.0, 0.0
+        else:
+            out[i, 1], out[i, 2], out[i, 3] = x / norm, y / norm, z / norm
+
+@njit(**OPTIONS)
+def _rotation_vector(x, y, z, w):
+    # La parte vectorial por 2·atan2(|v|, w)/|v|, con el límite 2/w en |v| = 0
+    norm = math.hypot(math.hypot(x, y), z)
+    factor = 2 / w if norm == 0 else 2*math.atan2(norm, w) / norm
+    return x * factor, y * factor, z * factor
+
+def _quaternion_to_rotation_vector(quaternion, out):
+    for i in prange(quaternion.shape[0]):
+        out[i, 0], out[i, 1], out[i, 2] = _rotation_vector(quaternion[i, 0], quaternion[i, 1],
+                                                           quaternion[i, 2], quaternion[i, 3])
+
+def _quaternion_to_rotation_matrix(quaternion, out):
+    for i in prange(quaternion.shape[0]):
+        x, y, z, w = quaternion[i, 0], quaternion[i, 1], quaternion[i, 2], quaternion[i, 3]
+        out[i, 0, 0] = 1 - 2*y*y - 2*z*z
+        out[i, 0, 1] = 2*x*y - 2*z*w
+        out[i, 0, 2] = 2*x*z + 2*y*w
+        out[i, 1, 0] = 2*x*y + 2*z*w
+        out[i, 1, 1] = 1 - 2*x*x - 2*z*z
+        out[i, 1, 2] = 2*y*z - 2*x*w
+        out[i, 2, 0] = 2*x*z - 2*y*w
+        out[i, 2, 1] = 2*y*z + 2*x*w
+        out[i, 2, 2] = 1 - 2*x*x - 2*y*y
+
+@njit(**OPTIONS)
+def _shepperd(R, i):
+    # Shepperd como en batch: la fila de P = 4·q·qᵀ con la diagonal mayor (la primera si empatan), w >= 0
+    r00, r01, r02 = R[i, 0, 0], R[i, 0, 1], R[i, 0, 2]
+    r10, r11, r12 = R[i, 1, 0], R[i, 1, 1], R[i, 1, 2]
+    r20, r21, r22 = R[i, 2, 0], R[i, 2, 1], R[i, 2, 2]
+    px, py = 1 + r00 - r11 - r22, 1 - r00 + r11 - r22
+    pz, pw = 1 - r00 - r11 + r22, 1 + r00 + r11 + r22
+    if px >= py and px >= pz and px >= pw:
+        x, y, z, w = px, r01 + r10, r02 + r20, r21 - r12
+        scale = 2*math.sqrt(px)
+    elif py >= pz and py >= pw:
+        x, y, z, w = r01 + r10, py, r12 + r21, r02 - r20
+        scale = 2*math.sqrt(py)
+    elif pz >= pw:
+        x, y, z, w = r02 + r20, r12 + r21, pz, r10 - r01
+        scale = 2*math.sqrt(pz)
+    else:
+        x, y, z, w = r21 - r12, r02 - r20, r10 - r01, pw
+        scale = 2*math.sqrt(pw)
+    if w < 0:
+        scale = -scale
+    return x / scale, y / scale, z / scale, w / scale
+
+def _rotation_matrix_to_quaternion(R, out):
+    for i in prange(R.shape[0]):
+        out[i, 0], out[i, 1], out[i, 2], out[i, 3] = _shepperd(R, i)
+
+def _euler_to_rotation_matrix(euler, out):
+    for i in prange(euler.shape[0]):
+        cr, sr = math.cos(euler[i, 0]), math.sin(euler[i, 0])
+        cp, sp = math.cos(euler[i, 1]), math.sin(euler[i, 1])
+        cy, sy = math.cos(euler[i, 2]), math.sin(euler[i, 2])
+        out[i, 0, 0] = cy*cp
+        out[i, 0, 1] = cy*sp*sr - sy*cr
+        out[i, 0, 2] = cy*sp*cr + sy*sr
+        out[i, 1, 0] = sy*cp
+        out[i, 1, 1] = sy*sp*sr + cy*cr
+        out[i, 1, 2] = sy*sp*cr - cy*sr
+        out[i, 2, 0] = -sp
+        out[i, 2, 1] = cp*sr
+        out[i, 2, 2] = cp*cr
+
+def _rotation_matrix_to_rotation_vector(R, out):
+    for i in prange(R.shape[0]):
+        x, y, z, w = _shepperd(R, i)
+        out[i, 0], out[i, 1], out[i, 2] = _rotation_vector(x, y, z, w)
+
+def _rotation_matrix_to_cube_rotationxy(R, out):
+    for i in prange(R.shape[0]):
+        out[i, 0] = math.atan2(R[i, 2, 1], R[i, 2, 2])
+        out[i, 1] = math.atan2(-R[i, 2, 0], math.sqrt(R[i, 2, 1]**2 + R[i, 2, 2]**2))
+        out[i, 2] = math.atan2(R[i, 1, 0], R[i, 0, 0])
+
+def _rotation_vector_to_cube_rotationxy(rotation_vector, out):
+    for i in prange(rotation_vector.shape[0]):
+        x, y, z = rotation_vector[i, 0], rotation_vector[i, 1], rotation_vector[i, 2]
+        out[i, 0] = math.atan2(z, y)
+        out[i, 1] = math.atan2(-z, x)
+        out[i, 2] = math.atan2(y, x)
+
+# nombre en batch: (núcleos, forma de la entrada y de la salida de cada fila)
+KERNELS = {
+    "euler_to_quaternion": (_kernel(_euler_to_quaternion), (3,), (4,)),
+    "quaternion_to_euler_principal": (_kernel(_quaternion_to_euler_principal), (4,), (3,)),
+    "euler_principal_to_cube_rotationxy": (_kernel(_euler_principal_to_cube_rotationxy), (3,), (3,)),
+    "rotation_vector_to_quaternion": (_kernel(_rotation_vector_to_quaternion), (3,), (4,)),
+    "axis_angle_to_quaternion": (_kernel(_axis_angle_to_quaternion), (4,), (4,)),
+    "quaternion_to_axis_angle": (_kernel(_quaternion_to_axis_angle), (4,), (4,)),
+    "quaternion_to_rotation_vector": (_kernel(_quaternion_to_rotation_vector), (4,), (3,)),
+    "quaternion_to_rotation_matrix": (_kernel(_quaternion_to_rotation_matrix), (4,), (3, 3)),
+    "rotation_matrix_to_quaternion": (_kernel(_rotation_matrix_to_quaternion), (3, 3), (4,)),
+    "euler_to_rotation_matrix": (_kernel(_euler_to_rotation_matrix), (3,), (3, 3)),
+    "rotation_matrix_to_rotation_vector": (_kernel(_rotation_matrix_to_rotation_vector), (3, 3), (3,)),
+    "rotation_matrix_to_cube_rotationxy": (_kernel(_rotation_matrix_to_cube_rotationxy), (3, 3), (3,)),
+    "rotation_vector_to_cube_rotationxy": (_kernel(_rotation_vector_to_cube_rotationxy), (3,), (3,)),
+}
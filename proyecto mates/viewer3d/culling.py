@@ -0,0 +1,159 @@
+import numpy as np
+
+# Descarte de lo que queda fuera del frustum de la cámara, con esferas envolventes.
+#
+# frustum_planes saca los 6 planos de la matriz de clip (proyección · modelview, la misma que
+# aplica OpenGL) y sphere_visibility prueba N esferas contra los 6 a la vez. Con el fov a 1°
+# la mayor parte de una escena grande queda fuera y no llega a OpenGL.
+#
+# BoundingVolumeHierarchy agrupa las esferas en un árbol binario guardado en arrays planos: cada
+# nodo cubre un rango contiguo de las primitivas reordenadas y tiene su propia esfera. Se construye
+# sin un bucle de Python por nodo y se recorre por niveles, probando todos los nodos de un nivel
+# con una sola operación de NumPy: un nodo fuera descarta su rango entero, uno dentro lo acepta
+# entero y solo se baja por los que cortan algún plano. En las hojas que cortan se prueban las primitivas una a una (también vectorizado).
+
+LEAF_SIZE = 16  # Primitivas por hoja como mucho
+
+def frustum_planes(clip_matrix):
+    # Planos (6, 4) (a, b, c, d) con la normal unitaria hacia dentro: un punto p está dentro
+    # si a*x + b*y + c*z + d >= 0 en los seis (izquierda, derecha, abajo, arriba, cerca, lejos)
+    m = np.asarray(clip_matrix, dtype=np.float64)
+    planes = np.stack([m[3] + m[0], m[3] - m[0], m[3] + m[1], m[3] - m[1], m[3] + m[2], m[3] - m[2]])
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+def sphere_visibility(planes, centers, radii):
+    # (outside, inside) para cada esfera: fuera del todo de algún plano, o dentro del todo de los seis
+    distances = centers @ planes[:, :3].T + planes[:, 3]
+    radii = radii[:, None]
+    return (distances < -radii).any(axis=1), (distances >= radii).all(axis=1)
+
+def bounding_sphere(positions):
+    # Esfera centrada en la caja envolvente de los puntos (N, 3): centro y radio
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    if len(positions) == 0:
+        return np.zeros(3), 0.0
+    center = (positions.min(axis=0) + positions.max(axis=0)) / 2
+    return center, float(np.sqrt(((positions - center) ** 2).sum(axis=1).max()))
+
+def _ranges(starts, ends):
+    # Todos los índices de los rangos [start, end) seguidos
+    counts = ends - starts
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return np.arange(counts.sum()) + offsets
+
+class CullingStats:
+    # Contadores del último frame: esferas probadas (nodos del árbol y primitivas), esferas
+    # descartadas por estar fuera, y primitivas visibles de total
+    def __init__(self, total=0):
+        self.total = total
+        self.tested = 0
+        self.culled = 0
+        self.visible = total
+
+    def __str__(self):
+        return f"{self.visible}/{self.total} visibles, {self.tested} probadas, {self.culled} descartadas"
+
+class BoundingVolumeHierarchy:
+    def __init__(self, centers, radii, leaf_size=LEAF_SIZE):
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+        radii = np.asarray(radii, dtype=np.float64).reshape(-1)
+        count = len(centers)
+        # Árbol completo guardado como un heap: los hijos del nodo i son 2i+1 y 2i+2 y todas las hojas
+        # están en el último nivel, con count / 2**depth primitivas (como mucho leaf_size)
+        depth = int(np.ceil(np.log2(count / leaf_size))) if count > leaf_size else 0
+
+        # Construcción por niveles: en cada uno se parten a la vez todos los rangos por la mediana del
+        # eje en el que más se extienden sus centros. Un solo argsort ordena todos los rangos: la clave
+        # es el número de rango más la coordenada llevada a [0, 1) dentro de él.
+        order = np.arange(count)
+        ordered = centers
+        bounds = np.array([0, count])
+        for _ in range(depth):
+            starts, ends = bounds[:-1], bounds[1:]
+            low = np.minimum.reduceat(ordered, starts, axis=0)
+            spread = np.maximum.reduceat(ordered, starts, axis=0) - low
+            axis = np.argmax(spread, axis=1)
+            segment = np.repeat(np.arange(len(starts)), ends - starts)
+            key = np.choose(axis[segment], ordered.T) - low[segment, axis[segment]]
+            key /= (spread[np.arange(len(starts)), axis] * (1 + 1e-9) + 1e-300)[segment]
+            key += segment
+            permutation = np.argsort(key)
+            order = order[permutation]
+            ordered = ordered[permutation]
+            bounds = np.append(np.stack([starts, (starts + ends) // 2], axis=1).ravel(), count)
+        self.order = order  # Primitivas reordenadas: cada nodo cubre order[start:end]
+
+        # Rangos de todos los nodos, nivel a nivel: los del nivel l ocupan las posiciones 2**l - 1 ... 2**(l+1) - 2
+        level_bounds = [bounds[::2 ** (depth - level)] for level in range(depth + 1)]
+        self.starts = np.concatenate([level[:-1] for level in level_bounds])
+        self.ends = np.concatenate([level[1:] for level in level_bounds])
+        nodes = len(self.starts)
+        self.children = np.full((nodes, 2), -1, dtype=np.int64)
+        inner = np.arange(nodes - 2 ** depth)
+        self.children[inner] = np.stack([2 * inner + 1, 2 * inner + 2], axis=1)
+
+        # Esferas: las de las hojas, centradas en la caja de sus primitivas y con el radio justo para
+        # contenerlas; las de cada padre, centradas en la caja de las de sus hijos y conteniéndolas
+        self.node_centers = np.zeros((nodes, 3))
+        self.node_radii = np.zeros(nodes)
+        if count:
+            ordered_radii = radii[order]
+            starts, ends = level_bounds[-1][:-1], level_bounds[-1][1:]
+            low = np.minimum.reduceat(ordered - ordered_radii[:, None], starts, axis=0)
+            high = np.maximum.reduceat(ordered + ordered_radii[:, None], starts, axis=0)
+            node_centers = (low + high) / 2
+            segment = np.repeat(np.arange(len(starts)), ends - starts)
+            distances = np.linalg.norm(ordered - node_centers[segment], axis=1) + ordered_radii
+            node_radii = np.maximum.reduceat(distances, starts)
+            for level in range(depth, -1, -1):
+                first = 2 ** level - 1
+                self.node_centers[first:2 * first + 1] = node_centers
+                self.node_radii[first:2 * first + 1] = node_radii
+                if level == 0:
+                    break
+                child_centers, child_radii = node_centers, node_radii
+                low = np.minimum(low[0::2], low[1::2])
+                high = np.maximum(high[0::2], high[1::2])
+                node_centers = (low + high) / 2
+                distances = np.linalg.norm(child_centers - np.repeat(node_centers, 2, axis=0), axis=1) + child_radii
+                node_radii = np.maximum(distances[0::2], distances[1::2])
+        self.centers = centers
+        self.radii = radii
+        self.stats = CullingStats(count)
+
+    def __len__(self):
+        return len(self.centers)
+
+    def visible(self, planes):
+        # Índices ordenados de las primitivas que pueden verse con esos planos (frustum_planes)
+        stats = self.stats
+        stats.tested = stats.culled = 0
+        accepted = []
+        frontier = np.zeros(1 if len(self) else 0, dtype=np.int64)
+        while frontier.size:
+            outside, inside = sphere_visibility(planes, self.node_centers[frontier], self.node_radii[frontier])
+            stats.tested += frontier.size
+            stats.culled += int(outside.sum())
+            accepted.append(self.order[_ranges(self.starts[frontier[inside]], self.ends[frontier[inside]])])
+            crossing = frontier[~outside & ~inside]
+            leaf = self.children[crossing, 0] < 0
+            leaves = crossing[leaf]
+            if leaves.size:
+                candidates = self.order[_ranges(self.starts[leaves], self.ends[leaves])]
+                outside, _ = sphere_visibility(planes, self.centers[candidates], self.radii[candidates])
+                stats.tested += candidates.size
+                stats.culled += int(outside.sum())
+                accepted.append(candidates[~outside])
+            frontier = self.children[crossing[~leaf]].ravel()
+        result = np.sort(np.concatenate(accepted)) if accepted else np.zeros(0, dtype=np.int64)
+        stats.visible = len(result)
+        return result
+
+def current_clip_matrix():
+    # Proyección · modelview del contexto de OpenGL activo, como matriz de NumPy (por filas)
+    from OpenGL.GL import GL_MODELVIEW_MATRIX, GL_PROJECTION_MATRIX, glGetFloatv
+
+    # OpenGL devuelve las matrices por columnas: leídas por filas son las traspuestas
+    projection = np.asarray(glGetFloatv(GL_PROJECTION_MATRIX), dtype=np.float64).reshape(4, 4).T
+    modelview = np.asarray(glGetFloatv(GL_MODELVIEW_MATRIX), dtype=np.float64).reshape(4, 4).T
+    return projection @ modelview
@@ -0,0 +1,218 @@
+import mmap
+import struct
+import zlib
+
+import numpy as np
+
+from viewer3d.mesh import Mesh
+
+# Lector de FBX binario ("Kaydara FBX Binary") en Python puro y NumPy.
+# El archivo se mapea en memoria y los nodos se recorren por sus offsets sin crear objetos
+# para lo que no interesa; solo Vertices y PolygonVertexIndex se decodifican, directamente a arrays.
+
+FBX_MAGIC = b"Kaydara FBX Binary  \x00"
+
+# Tamaño de las propiedades escalares y tipo de NumPy de las propiedades array
+_SCALAR_SIZES = {b"Y": 2, b"C": 1, b"I": 4, b"F": 4, b"D": 8, b"L": 8}
+_SCALAR_DTYPES = {b"Y": "<i2", b"C": "?", b"I": "<i4", b"F": "<f4", b"D": "<f8", b"L": "<i8"}
+_ARRAY_DTYPES = {b"f": "<f4", b"d": "<f8", b"l": "<i8", b"i": "<i4", b"b": "?"}
+
+class FBXError(ValueError):
+    pass
+
+class FBXNode:
+    __slots__ = ("name", "end_offset", "property_count", "property_offset", "children_offset")
+
+    def __init__(self, name, end_offset, property_count, property_offset, children_offset):
+        self.name = name
+        self.end_offset = end_offset
+        self.property_count = property_count
+        self.property_offset = property_offset
+        self.children_offset = children_offset
+
+class FBXReader:
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise FBXError(f"{path} está vacío")
+        if self._buffer[:len(FBX_MAGIC)] != FBX_MAGIC:
+            self.close()
+            raise FBXError(f"{path} no es un FBX binario")
+        self.version = struct.unpack_from("<I", self._buffer, 23)[0]
+        # A partir de la 7500 los campos de cabecera de cada nodo son de 64 bits
+        if self.version >= 7500:
+            self._header = struct.Struct("<QQQB")
+        else:
+            self._header = struct.Struct("<IIIB")
+
+    def close(self):
+        self._buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def children(self, node=None):
+        # Recorre los nodos hijos (o los de primer nivel) sin leer sus propiedades
+        if node is None:
+            offset, end = 27, len(self._buffer)
+        else:
+            offset, end = node.children_offset, node.end_offset
+        header_size = self._header.size
+        while offset + header_size <= end:
+            end_offset, property_count, property_length, name_length = self._header.unpack_from(self._buffer, offset)
+            if end_offset == 0:  # Registro nulo que cierra la lista
+                return
+            name_offset = offset + header_size
+            name = self._buffer[name_offset:name_offset + name_length].decode("ascii", "replace")
+            property_offset = name_offset + name_length
+            yield FBXNode(name, end_offset, property_count, property_offset, property_offset + property_length)
+            offset = end_offset
+
+    def find(self, node, name):
+        for child in self.children(node):
+            if child.name == name:
+                return child
+        return None
+
+    def properties(self, node):
+        # Lee todas las propiedades de un nodo (para nodos pequeños como nombres y tipos)
+        values = []
+        offset = node.property_offset
+        for _ in range(node.property_count):
+            value, offset = self._read_property(offset)
+            values.append(value)
+        return values
+
+    def _read_property(self, offset):
+        buffer = self._buffer
+        type_code = buffer[offset:offset + 1]
+        offset += 1
+        if type_code in _SCALAR_SIZES:
+            value = np.frombuffer(buffer, _SCALAR_DTYPES[type_code], 1, offset)[0]
+            return value.item(), offset + _SCALAR_SIZES[type_code]
+        if type_code in _ARRAY_DTYPES:
+            return self._read_array(type_code, offset)
+        if type_code in (b"S", b"R"):
+            length = struct.unpack_from("<I", buffer, offset)[0]
+            data = buffer[offset + 4:offset + 4 + length]
+            return (data.decode("utf-8", "replace") if type_code == b"S" else data), offset + 4 + length
+        raise FBXError(f"tipo de propiedad desconocido {type_code!r} en el offset {offset - 1}")
+
+    def _read_array(self, type_code, offset):
+        length, encoding, compressed_length = struct.unpack_from("<III", self._buffer, offset)
+        offset += 12
+        dtype = np.dtype(_ARRAY_DTYPES[type_code])
+        if encoding == 0:
+            values = np.frombuffer(self._buffer, dtype, length, offset)
+        elif encoding == 1:
+            with memoryview(self._buffer)[offset:offset + compressed_length] as raw:
+                values = np.frombuffer(zlib.decompress(raw, bufsize=length * dtype.itemsize), dtype, length)
+        else:
+            raise FBXError(f"codificación de array desconocida {encoding}")
+        return values, offset + compressed_length
+
+    def array(self, node):
+        # Devuelve los datos numéricos de un nodo como un array plano. Sirve tanto para FBX 7
+        # (una propiedad array, posiblemente comprimida) como para FBX 6 (una propiedad escalar
+        # por valor, que se decodifica de golpe como un array con stride de 1 + tamaño).
+        # El array puede ser una vista del archivo mapeado: hay que copiarlo antes de cerrar el lector.
+        if node.property_count == 0:
+            return np.empty(0)
+        offset = node.property_offset
+        type_code = self._buffer[offset:offset + 1]
+        if type_code in _ARRAY_DTYPES:
+            return self._read_array(type_code, offset + 1)[0]
+        if type_code not in _SCALAR_SIZES:
+            raise FBXError(f"el nodo {node.name} no contiene datos numéricos")
+
+        size = _SCALAR_SIZES[type_code]
+        if offset + node.property_count * (1 + size) == node.children_offset:
+            record = np.dtype([("type", "S1"), ("value", _SCALAR_DTYPES[type_code])])
+            records = np.frombuffer(self._buffer, record, node.property_count, offset)
+            if np.all(records["type"] == type_code):
+                return records["value"]
+        # Propiedades de tipos mezclados: se leen una a una
+        return np.array(self.properties(node))
+
+    def geometry_nodes(self):
+        # Nodos con Vertices y PolygonVertexIndex: Objects/Geometry en FBX 7, Objects/Model en FBX 6
+        objects = self.find(None, "Objects")
+        if objects is None:
+            return
+        for node in self.children(objects):
+            if node.name not in ("Geometry", "Model"):
+                continue
+            names = {child.name for child in self.children(node)}
+            if "Vertices" in names and "PolygonVertexIndex" in names:
+                yield node
+
+def triangulate(polygon_vertex_index):
+    # Convierte PolygonVertexIndex (el último índice de cada polígono va negado con ~) en
+    # triángulos en abanico y en las aristas de los contornos, todo con operaciones de array.
+    polygon_vertex_index = np.asarray(polygon_vertex_index)
+    if polygon_vertex_index.dtype.kind != "i":
+        polygon_vertex_index = polygon_vertex_index.astype(np.int64)
+    ends = np.flatnonzero(polygon_vertex_index < 0)
+    if len(ends) == 0:
+        return np.empty((0, 3), dtype=np.uint32), np.empty((0, 2), dtype=np.uint32)
+    polygon_vertex_index = polygon_vertex_index[:ends[-1] + 1]  # Ignora un polígono final sin cerrar
+    indices = np.where(polygon_vertex_index < 0, ~polygon_vertex_index, polygon_vertex_index)
+
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    sizes = ends - starts + 1
+
+    triangle_counts = np.maximum(sizes - 2, 0)
+    polygon = np.repeat(np.arange(len(sizes)), triangle_counts)
+    first_triangle = np.cumsum(triangle_counts) - triangle_counts
+    k = np.arange(len(polygon)) - first_triangle[polygon]
+    corner = starts[polygon]
+    triangles = np.stack([indices[corner], indices[corner + k + 1], indices[corner + k + 2]], axis=1)
+
+    # Cada esquina se une con la siguiente del mismo polígono (la última con la primera).
+    # Las aristas repetidas entre polígonos vecinos se eliminan codificando cada par en un entero.
+    following = np.arange(1, len(indices) + 1)
+    following[ends] = starts
+    low = np.minimum(indices, indices[following])
+    high = np.maximum(indices, indices[following])
+    keep = low != high
+    stride = int(indices.max()) + 1
+    keys = np.sort(low[keep].astype(np.int64) * stride + high[keep])
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    edges = np.stack([keys // stride, keys % stride], axis=1)
+    return triangles.astype(np.uint32), edges.astype(np.uint32)
+
+def load_fbx(path, fit_radius=None):
+    # Carga todas las geometrías del archivo en una sola Mesh.
+    # Con fit_radius la malla se centra y se escala para que quepa en una esfera de ese radio.
+    positions = []
+    triangles = []
+    edges = []
+    vertex_count = 0
+    with FBXReader(path) as reader:
+        for node in reader.geometry_nodes():
+            vertices = reader.array(reader.find(node, "Vertices")).astype(np.float32).reshape(-1, 3)
+            node_triangles, node_edges = triangulate(reader.array(reader.find(node, "PolygonVertexIndex")))
+            if len(node_triangles) and node_triangles.max() >= len(vertices):
+                raise FBXError(f"{path}: PolygonVertexIndex apunta fuera de Vertices")
+            positions.append(vertices)
+            triangles.append(node_triangles + vertex_count)
+            edges.append(node_edges + vertex_count)
+            vertex_count += len(vertices)
+    if not positions:
+        raise FBXError(f"{path} no contiene ninguna malla")
+
+    positions = np.concatenate(positions)
+    if fit_radius is not None and len(positions):
+        center = (positions.min(axis=0) + positions.max(axis=0)) / 2
+        positions -= center
+        radius = np.sqrt(np.max(np.sum(positions**2, axis=1)))
+        if radius > 0:
+            positions *= fit_radius / radius
+    return Mesh(positions, np.concatenate(triangles), np.concatenate(edges))
@@ -0,0 +1,134 @@
+from viewer3d.mesh import Mesh
+
+# Figuras del visor. Los datos son los mismos que antes; la malla se construye una vez
+# y se sube a la GPU la primera vez que se dibuja (hace falta un contexto de OpenGL).
+# Si la malla tiene niveles de detalle (Mesh.lods), cada frame se dibuja el que corresponde al
+# tamaño de la figura en pantalla, y cada nivel se sube la primera vez que se usa.
+
+class Figure:
+    vertices = ()
+    edges = ()
+    faces = ()
+    colors = ()
+
+    def __init__(self):
+        self._mesh = None
+        self._gl_meshes = {}  # Nivel de detalle -> GLMesh
+        self._bounds = None  # Esfera envolvente de la malla, para elegir el nivel
+        self.lod_level = 0  # Nivel dibujado en el último frame (0 es la malla entera)
+
+    def mesh(self):
+        if self._mesh is None:
+            self._mesh = Mesh.from_faces(self.vertices, self.faces, self.colors, self.edges)
+        return self._mesh
+
+    @property
+    def triangles_submitted(self):
+        # Triángulos del nivel dibujado en el último frame
+        mesh = self.mesh()
+        return len((mesh.lods[self.lod_level - 1][1] if self.lod_level else mesh).triangles)
+
+    def draw(self):
+        mesh = self.mesh()
+        level = 0
+        if mesh.lods:
+            from viewer3d.lod import current_lod
+            if self._bounds is None:
+                from viewer3d.culling import bounding_sphere
+                self._bounds = bounding_sphere(mesh.positions)
+            level = current_lod(mesh.lods, *self._bounds)
+        if level not in self._gl_meshes:
+            from viewer3d.gl_mesh import GLMesh  # OpenGL solo se importa si se va a dibujar
+            self._gl_meshes[level] = GLMesh(mesh.lods[level - 1][1] if level else mesh)
+        self.lod_level = level
+        self._gl_meshes[level].draw()
+
+class Cube(Figure):
+    vertices = (
+        (1, -1, -1), (1, 1, -1), (-1, 1, -1), (-1, -1, -1),
+        (1, -1, 1), (1, 1, 1), (-1, -1, 1), (-1, 1, 1)
+    )
+
+    edges = (
+        (0, 1), (0, 3), (0, 4), (2, 1), (2, 3), (2, 7),
+        (6, 3), (6, 4), (6, 7), (5, 1), (5, 4), (5, 7)
+    )
+
+    faces = [
+        (0, 1, 2, 3), (3, 2, 7, 6), (6, 7, 5, 4),
+        (4, 5, 1, 0), (1, 5, 7, 2), (4, 0, 3, 6)
+    ]
+
+    colors = (
+        (1, 0, 0, 1), (0, 1, 0, 1), (0, 0, 1, 1),
+        (1, 1, 1, 1), (1, 1, 0, 1), (1, 0, 1, 1)
+    )
+
+class Tetrahedron(Figure):
+    vertices = (
+        (0, 1, 0), (-1, -1, 1), (1, -1, 1), (0, -1, -1)
+    )
+
+    edges = (
+        (0, 1), (0, 2), (0, 3), (1, 2), (2, 3), (3, 1)
+    )
+
+    faces = (
+        (0, 1, 2), (0, 2, 3), (0, 3, 1), (1, 3, 2)
+    )
+
+    colors = (
+        (1, 0, 0, 1), (0, 1, 0, 1), (0, 0, 1, 1), (1, 1, 1, 1)
+    )
+
+class MeshFigure(Figure):
+    # Figura a partir de una malla ya construida, por ejemplo un modelo FBX cargado
+    def __init__(self, mesh):
+        super().__init__()
+        self._mesh = mesh
+
+class FleetFigure(Figure):
+    # Muchas copias de figure con las orientaciones de una Fleet (viewer3d.instancing), dibujadas como una figura
+    def __init__(self, figure, fleet):
+        super().__init__()
+        self.figure = figure
+        self.fleet = fleet
+        self._mesh_version = None
+
+    def mesh(self):
+        # Todas las copias en una sola malla, para el renderizador por software
+        if self._mesh is None or self._mesh_version != self.fleet.version:
+            from viewer3d.instancing import batched_mesh
+            self._mesh = batched_mesh(self.figure.mesh(), self.fleet.instances)
+            self._mesh_version = self.fleet.version
+        return self._mesh
+
+    @property
+    def culling(self):
+        # Instancias probadas, descartadas y visibles en el último frame
+        return self.fleet.culling
+
+    def draw(self):
+        self.fleet.draw(self.figure)
+
+def load_model_figure(path, radius=3 ** 0.5, use_cache=True):
+    # Carga un modelo FBX como figura, escalado al tamaño del cubo y con sus niveles de detalle.
+    # Con use_cache la malla procesada se guarda en .meshcache y las siguientes cargas la mapean en memoria.
+    from viewer3d.fbx import load_fbx
+    from viewer3d.lod import with_lods
+    from viewer3d.mesh_cache import load_cached
+
+    def load(source_path):
+        return with_lods(load_fbx(source_path, fit_radius=radius))
+
+    if use_cache:
+        return MeshFigure(load_cached(path, load, variant=f"r{radius:.6g}"))
+    return MeshFigure(load(path))
+
+FIGURE_NAMES = {"cube": Cube, "tetrahedron": Tetrahedron}
+
+def figure_from_name(name):
+    # "cube", "tetrahedron" o la ruta de un modelo FBX (para las herramientas de línea de comandos)
+    if name.lower() in FIGURE_NAMES:
+        return FIGURE_NAMES[name.lower()]()
+    return load_model_figure(name)
@@ -0,0 +1,52 @@
+import time
+from collections import deque
+from typing import NamedTuple
+
+import pygame
+
+# Ritmo de frames del visor. En modo limitado espera lo justo para llegar a target_fps,
+# sin límite no espera nada y con vsync deja que display.flip marque el ritmo.
+# tick() devuelve el delta time en segundos para que las velocidades de rotación
+# no dependan de los FPS.
+
+class FrameStats(NamedTuple):
+    fps: float        # Frames por segundo medios de la ventana de estadísticas
+    frame_ms: float   # Duración media de un frame completo (trabajo + espera)
+    work_ms: float    # Duración media del trabajo de un frame (sin la espera)
+    worst_ms: float   # Frame más largo de la ventana de estadísticas
+
+class FrameClock:
+    def __init__(self, target_fps=60, vsync=False, stats_window=120):
+        self.target_fps = 0 if vsync else max(0, target_fps)
+        self.vsync = vsync
+        self._clock = pygame.time.Clock()
+        self._frame_times = deque(maxlen=stats_window)
+        self._work_times = deque(maxlen=stats_window)
+        self._last_tick = time.perf_counter()
+        self.delta_time = 0.0
+
+    def tick(self):
+        # Se llama una vez por frame, después de display.flip
+        work_done = time.perf_counter()
+        if self.target_fps:
+            self._clock.tick(self.target_fps)
+        now = time.perf_counter()
+
+        # Se limita el delta para que una pausa larga (por ejemplo un diálogo) no haga saltar la figura
+        self.delta_time = min(now - self._last_tick, 0.25)
+        self._frame_times.append(now - self._last_tick)
+        self._work_times.append(work_done - self._last_tick)
+        self._last_tick = now
+        return self.delta_time
+
+    def reset(self):
+        # Descarta el tiempo transcurrido desde el último tick (por ejemplo tras bloquearse esperando eventos)
+        self._last_tick = time.perf_counter()
+        self.delta_time = 0.0
+
+    def stats(self):
+        if not self._frame_times:
+            return FrameStats(0.0, 0.0, 0.0, 0.0)
+        frame = sum(self._frame_times) / len(self._frame_times)
+        work = sum(self._work_times) / len(self._work_times)
+        return FrameStats(1/frame if frame > 0 else 0.0, frame*1000, work*1000, max(self._frame_times)*1000)
@@ -0,0 +1,236 @@
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GL.shaders import ShaderCompilationError, ShaderLinkError, compileShader
+
+from viewer3d.instancing import INSTANCE_FLOATS, WIREFRAME_INSTANCE_LIMIT, batched_indices, batched_positions
+from viewer3d.mesh import DEFAULT_COLOR
+
+# Dibujo de una Fleet (viewer3d.instancing) con OpenGL, de dos formas con el mismo resultado:
+#   InstancedGLMesh  un shader gira cada vértice con el cuaternión de su instancia
+#                    (glVertexAttribDivisor + glDrawElementsInstanced): la CPU no toca los vértices
+#   BatchedGLMesh    para drivers sin shaders ni instancing: NumPy transforma todas las copias
+#                    y se dibujan con un glDrawElements para las caras y otro para las aristas
+# Los dos suben los datos de las instancias en un solo buffer en upload y necesitan un contexto activo.
+
+# Ubicaciones fijas de los atributos del shader; 0 tiene que ser la posición en el perfil de compatibilidad
+POSITION_LOCATION = 0
+COLOR_LOCATION = 1
+ORIENTATION_LOCATION = 2
+PLACEMENT_LOCATION = 3
+
+VERTEX_SHADER = """
+#version 120
+attribute vec3 position;
+attribute vec4 color;
+attribute vec4 orientation;  // Por instancia: cuaternión (x, y, z, w)
+attribute vec4 placement;    // Por instancia: centro (xyz) y escala (w)
+uniform vec4 flat_color;     // Si alfa < 0 se usa el color de cada vértice
+varying vec4 vertex_color;
+
+void main() {
+    vec4 q = normalize(orientation);
+    vec3 t = 2.0 * cross(q.xyz, position);
+    vec3 rotated = position + q.w * t + cross(q.xyz, t);
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(rotated * placement.w + placement.xyz, 1.0);
+    vertex_color = flat_color.a < 0.0 ? color : flat_color;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+varying vec4 vertex_color;
+
+void main() {
+    gl_FragColor = vertex_color;
+}
+"""
+
+VERTEX_COLORS = (0, 0, 0, -1)
+EDGE_COLOR = (0, 0, 0, 1)
+
+def create_fleet_renderer(mesh):
+    # Usa el shader con instancing si el contexto lo permite y si no el lote en la CPU
+    major, minor = (int(part) for part in glGetString(GL_VERSION).split(b" ")[0].split(b".")[:2])
+    if (major, minor) >= (3, 3):
+        try:
+            return InstancedGLMesh(mesh)
+        except (ShaderCompilationError, ShaderLinkError, RuntimeError) as error:
+            print(f"Sin instancing ({error}): la flota se dibuja en un lote desde la CPU")
+    return BatchedGLMesh(mesh)
+
+class InstancedGLMesh:
+    def __init__(self, mesh):
+        # Las ubicaciones de los atributos se fijan antes de enlazar, así no hace falta preguntarlas
+        shaders = [compileShader(VERTEX_SHADER, GL_VERTEX_SHADER), compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER)]
+        self.program = glCreateProgram()
+        for shader in shaders:
+            glAttachShader(self.program, shader)
+        for name, location in (("position", POSITION_LOCATION), ("color", COLOR_LOCATION),
+                               ("orientation", ORIENTATION_LOCATION), ("placement", PLACEMENT_LOCATION)):
+            glBindAttribLocation(self.program, location, name)
+        glLinkProgram(self.program)
+        for shader in shaders:
+            glDeleteShader(shader)
+        if not glGetProgramiv(self.program, GL_LINK_STATUS):
+            raise ShaderLinkError(glGetProgramInfoLog(self.program))
+        self.flat_color = glGetUniformLocation(self.program, "flat_color")
+
+        self.vertex_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, mesh.positions.nbytes, mesh.positions, GL_STATIC_DRAW)
+        self.color_buffer = None
+        if mesh.colors is not None:
+            self.color_buffer = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+            glBufferData(GL_ARRAY_BUFFER, mesh.colors.nbytes, mesh.colors, GL_STATIC_DRAW)
+        self.instance_buffer = glGenBuffers(1)
+        self.instance_count = 0
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        # Igual que GLMesh: triángulos y aristas en un solo buffer de índices
+        self.triangle_count = mesh.triangles.size
+        self.edge_count = mesh.edges.size
+        self.edge_offset = ctypes.c_void_p(mesh.triangles.nbytes)
+        self.index_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, mesh.triangles.nbytes + mesh.edges.nbytes, None, GL_STATIC_DRAW)
+        glBufferSubData(GL_ELEMENT_ARRAY_BUFFER, 0, mesh.triangles.nbytes, mesh.triangles)
+        glBufferSubData(GL_ELEMENT_ARRAY_BUFFER, mesh.triangles.nbytes, mesh.edges.nbytes, mesh.edges)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.version = None
+
+    def upload(self, instances):
+        # Todo el array de instancias de una vez; GL_STREAM_DRAW porque puede cambiar en cada frame
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+        glBufferData(GL_ARRAY_BUFFER, instances.nbytes, instances, GL_STREAM_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.instance_count = len(instances)
+
+    def draw(self):
+        if self.instance_count == 0:
+            return
+        # Con muchas figuras hace falta el test de profundidad (el visor no lo activa para una sola)
+        glPushAttrib(GL_ENABLE_BIT | GL_DEPTH_BUFFER_BIT)
+        glEnable(GL_DEPTH_TEST)
+        glDepthFunc(GL_LEQUAL)  # Las aristas quedan encima de las caras a la misma profundidad
+        glUseProgram(self.program)
+
+        glEnableVertexAttribArray(POSITION_LOCATION)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glVertexAttribPointer(POSITION_LOCATION, 3, GL_FLOAT, GL_FALSE, 0, None)
+        if self.color_buffer is not None:
+            glEnableVertexAttribArray(COLOR_LOCATION)
+            glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+            glVertexAttribPointer(COLOR_LOCATION, 4, GL_FLOAT, GL_FALSE, 0, None)
+        else:
+            glVertexAttrib4f(COLOR_LOCATION, *DEFAULT_COLOR)
+
+        # Los dos atributos por instancia salen del mismo buffer y avanzan una vez por copia
+        stride = INSTANCE_FLOATS * 4
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+        for location, offset in ((ORIENTATION_LOCATION, 0), (PLACEMENT_LOCATION, 16)):
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(offset))
+            glVertexAttribDivisor(location, 1)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glUniform4f(self.flat_color, *VERTEX_COLORS)
+        glDrawElementsInstanced(GL_TRIANGLES, self.triangle_count, GL_UNSIGNED_INT, None, self.instance_count)
+        if self.instance_count <= WIREFRAME_INSTANCE_LIMIT:
+            glUniform4f(self.flat_color, *EDGE_COLOR)
+            glDrawElementsInstanced(GL_LINES, self.edge_count, GL_UNSIGNED_INT, self.edge_offset, self.instance_count)
+
+        for location in (ORIENTATION_LOCATION, PLACEMENT_LOCATION):
+            glVertexAttribDivisor(location, 0)
+            glDisableVertexAttribArray(location)
+        glDisableVertexAttribArray(COLOR_LOCATION)
+        glDisableVertexAttribArray(POSITION_LOCATION)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
+        glPopAttrib()
+
+    def delete(self):
+        buffers = [self.vertex_buffer, self.index_buffer, self.instance_buffer]
+        if self.color_buffer is not None:
+            buffers.append(self.color_buffer)
+        glDeleteBuffers(len(buffers), buffers)
+        glDeleteProgram(self.program)
+
+class BatchedGLMesh:
+    # Sin shaders: los vértices de todas las copias se calculan con NumPy en un buffer reutilizable
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.vertex_buffer, self.color_buffer, self.index_buffer = glGenBuffers(3)
+        self.capacity = 0
+        self.instance_count = 0
+        self.positions = None
+        self.version = None
+
+    def _reserve(self, count):
+        # Colores e índices solo dependen del número de copias y los de las k primeras son un prefijo
+        # de los de todas: se suben una vez para la capacidad y se dibuja solo la parte que se usa
+        mesh = self.mesh
+        self.positions = np.empty((count, len(mesh.positions), 3), dtype=np.float32)
+        if mesh.colors is not None:
+            colors = np.tile(mesh.colors, (count, 1))
+            glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+            glBufferData(GL_ARRAY_BUFFER, colors.nbytes, colors, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+        triangles = batched_indices(mesh.triangles, len(mesh.positions), count)
+        edges = batched_indices(mesh.edges, len(mesh.positions), count)
+        self.edge_offset = ctypes.c_void_p(triangles.nbytes)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, triangles.nbytes + edges.nbytes, None, GL_STATIC_DRAW)
+        glBufferSubData(GL_ELEMENT_ARRAY_BUFFER, 0, triangles.nbytes, triangles)
+        glBufferSubData(GL_ELEMENT_ARRAY_BUFFER, triangles.nbytes, edges.nbytes, edges)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.capacity = count
+
+    def upload(self, instances):
+        count = len(instances)
+        if count > self.capacity:
+            self._reserve(count)
+        self.instance_count = count
+        self.triangle_count = count * self.mesh.triangles.size
+        self.edge_count = count * self.mesh.edges.size
+        positions = batched_positions(self.mesh.positions, instances, out=self.positions[:count])
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, positions.nbytes, positions, GL_STREAM_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self):
+        if self.instance_count == 0:
+            return
+        glPushAttrib(GL_ENABLE_BIT | GL_DEPTH_BUFFER_BIT)
+        glEnable(GL_DEPTH_TEST)
+        glDepthFunc(GL_LEQUAL)
+
+        # Lo mismo que GLMesh.draw, con todas las copias en los mismos buffers
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        if self.mesh.colors is not None:
+            glEnableClientState(GL_COLOR_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+            glColorPointer(4, GL_FLOAT, 0, None)
+        else:
+            glColor4fv(DEFAULT_COLOR)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glDrawElements(GL_TRIANGLES, self.triangle_count, GL_UNSIGNED_INT, None)
+        if self.mesh.colors is not None:
+            glDisableClientState(GL_COLOR_ARRAY)
+        if self.instance_count <= WIREFRAME_INSTANCE_LIMIT:
+            glColor3fv(EDGE_COLOR[:3])
+            glDrawElements(GL_LINES, self.edge_count, GL_UNSIGNED_INT, self.edge_offset)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glPopAttrib()
+
+    def delete(self):
+        glDeleteBuffers(3, [self.vertex_buffer, self.color_buffer, self.index_buffer])
@@ -0,0 +1,63 @@
+import ctypes
+
+from OpenGL.GL import *
+
+from viewer3d.mesh import DEFAULT_COLOR
+
+# Sube una Mesh una sola vez a vertex buffer objects y la dibuja con dos glDrawElements
+# (caras y wireframe) en vez de un glVertex3fv por vértice en cada frame.
+# Necesita un contexto de OpenGL activo al crearse.
+
+class GLMesh:
+    def __init__(self, mesh):
+        self.vertex_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, mesh.positions.nbytes, mesh.positions, GL_STATIC_DRAW)
+
+        self.color_buffer = None
+        if mesh.colors is not None:
+            self.color_buffer = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+            glBufferData(GL_ARRAY_BUFFER, mesh.colors.nbytes, mesh.colors, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        # Triángulos y aristas comparten un único buffer de índices
+        self.triangle_count = mesh.triangles.size
+        self.edge_count = mesh.edges.size
+        self.edge_offset = ctypes.c_void_p(mesh.triangles.nbytes)
+        self.index_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, mesh.triangles.nbytes + mesh.edges.nbytes, None, GL_STATIC_DRAW)
+        glBufferSubData(GL_ELEMENT_ARRAY_BUFFER, 0, mesh.triangles.nbytes, mesh.triangles)
+        glBufferSubData(GL_ELEMENT_ARRAY_BUFFER, mesh.triangles.nbytes, mesh.edges.nbytes, mesh.edges)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def draw(self):
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+
+        if self.color_buffer is not None:
+            glEnableClientState(GL_COLOR_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+            glColorPointer(4, GL_FLOAT, 0, None)
+        else:
+            glColor4fv(DEFAULT_COLOR)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glDrawElements(GL_TRIANGLES, self.triangle_count, GL_UNSIGNED_INT, None)
+
+        if self.color_buffer is not None:
+            glDisableClientState(GL_COLOR_ARRAY)
+        glColor3fv((0, 0, 0))
+        glDrawElements(GL_LINES, self.edge_count, GL_UNSIGNED_INT, self.edge_offset)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def delete(self):
+        buffers = [self.vertex_buffer, self.index_buffer]
+        if self.color_buffer is not None:
+            buffers.append(self.color_buffer)
+        glDeleteBuffers(len(buffers), buffers)
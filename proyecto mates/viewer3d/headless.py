@@ -0,0 +1,107 @@
+import os
+
+# Render sin ventana. El contexto se crea con EGL, que con Mesa (llvmpipe) funciona sin GPU
+# ni pantalla, y se dibuja en un framebuffer object del tamaño pedido. PyOpenGL elige la
+# plataforma al importarse, así que este módulo se tiene que importar antes que OpenGL.
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+import ctypes
+
+import numpy as np
+from OpenGL import EGL
+from OpenGL.GL import *
+from OpenGL.GLU import *
+from OpenGL.raw.GL.VERSION.GL_1_0 import glMultMatrixf as raw_glMultMatrixf
+
+from viewer3d import render_cli
+from viewer3d.transforms import gl_cube_rotation_matrix, gl_matrix_pointer, new_gl_matrix
+
+def create_egl_context():
+    display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    EGL.eglInitialize(display, None, None)
+
+    config_attributes = (EGL.EGLint * 11)(
+        EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+        EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+        EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+        EGL.EGL_NONE,
+    )
+    config = EGL.EGLConfig()
+    config_count = EGL.EGLint()
+    EGL.eglChooseConfig(display, config_attributes, ctypes.pointer(config), 1, ctypes.pointer(config_count))
+    if config_count.value == 0:
+        raise RuntimeError("EGL no tiene ninguna configuración con OpenGL y pbuffers")
+
+    # El pbuffer de 1×1 solo sirve para activar el contexto; se dibuja en el framebuffer object
+    surface_attributes = (EGL.EGLint * 5)(EGL.EGL_WIDTH, 1, EGL.EGL_HEIGHT, 1, EGL.EGL_NONE)
+    surface = EGL.eglCreatePbufferSurface(display, config, surface_attributes)
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+    EGL.eglMakeCurrent(display, surface, surface, context)
+    return display, surface, context
+
+class HeadlessRenderer:
+    def __init__(self, width=256, height=256, fov=45):
+        self.width = width
+        self.height = height
+        self.fov = fov
+        self._display, self._surface, self._context = create_egl_context()
+
+        self._framebuffer = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self._framebuffer)
+        self._renderbuffers = glGenRenderbuffers(2)
+        for renderbuffer, storage, attachment in zip(self._renderbuffers,
+                                                     (GL_RGBA8, GL_DEPTH_COMPONENT24),
+                                                     (GL_COLOR_ATTACHMENT0, GL_DEPTH_ATTACHMENT)):
+            glBindRenderbuffer(GL_RENDERBUFFER, renderbuffer)
+            glRenderbufferStorage(GL_RENDERBUFFER, storage, width, height)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, attachment, GL_RENDERBUFFER, renderbuffer)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("no se pudo crear el framebuffer object")
+
+        glViewport(0, 0, width, height)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        glClearColor(0, 0, 0, 1)
+        # Buffers reutilizables: glReadPixels deja la imagen con la primera fila abajo y se copia
+        # invertida a image, que se devuelve en cada render sin reservar memoria nueva
+        self.pixels = np.empty((height, width, 4), dtype=np.uint8)
+        self.image = np.empty((height, width, 4), dtype=np.uint8)
+        self.model_matrix = new_gl_matrix()
+        self._model_matrix_pointer = gl_matrix_pointer(self.model_matrix)
+
+    def render(self, figure, euler_angles):
+        # Dibuja la figura igual que ventana 3d.py: ángulos en grados, rotación en x y luego en y (y z si se da)
+        glLoadIdentity()
+        gluPerspective(self.fov, self.width/self.height, 0.1, 100.0)
+        glTranslatef(0.0, 0.0, -5)
+        glEnable(GL_CULL_FACE)
+        glCullFace(GL_BACK)
+        glClear(GL_COLOR_BUFFER_BIT|GL_DEPTH_BUFFER_BIT)
+
+        gl_cube_rotation_matrix(euler_angles, self.model_matrix)
+        raw_glMultMatrixf(self._model_matrix_pointer)  # Los glRotatef en x, y (y z) en una sola llamada
+        figure.draw()
+
+        glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE, array=self.pixels)
+        np.copyto(self.image, self.pixels[::-1])
+        return self.image
+
+    def close(self):
+        glDeleteRenderbuffers(2, self._renderbuffers)
+        glDeleteFramebuffers(1, [self._framebuffer])
+        EGL.eglMakeCurrent(self._display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        EGL.eglDestroyContext(self._display, self._context)
+        EGL.eglDestroySurface(self._display, self._surface)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv=None):
+    render_cli.main(HeadlessRenderer, "Renderiza una figura en muchas orientaciones con OpenGL sin abrir ventanas", argv)
+
+if __name__ == "__main__":
+    main()
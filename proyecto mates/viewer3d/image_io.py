@@ -0,0 +1,23 @@
+import struct
+import zlib
+
+import numpy as np
+
+# Escritura de imágenes sin dependencias extra: PNG RGBA de 8 bits con zlib.
+
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+def write_png(path, rgba, compression=1):
+    # rgba: (alto, ancho, 4) uint8 con la primera fila arriba
+    rgba = np.asarray(rgba, dtype=np.uint8)
+    height, width = rgba.shape[:2]
+    # Cada fila va precedida por el tipo de filtro (0 = ninguno)
+    rows = np.zeros((height, width*4 + 1), dtype=np.uint8)
+    rows[:, 1:] = rgba.reshape(height, width*4)
+
+    with open(path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n")
+        file.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        file.write(_chunk(b"IDAT", zlib.compress(rows.tobytes(), compression)))
+        file.write(_chunk(b"IEND", b""))
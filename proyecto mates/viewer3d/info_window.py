@@ -0,0 +1,44 @@
+import tkinter as tk
+
+# Panel de información de los dos visores, dentro del proceso de la interfaz (viewer3d.ui_process).
+# Lee la última instantánea del canal (un OrientationFeedReader) cada refresh_ms milisegundos y
+# solo cambia los textos cuando hay una versión nueva.
+
+DEFAULT_REFRESH_MS = 100
+
+def build_info_panel(parent, channel, refresh_ms=DEFAULT_REFRESH_MS):
+    last_version = None  # Versión mostrada por última vez
+
+    def update_info_window():
+        nonlocal last_version
+        snapshot = channel.latest()
+        if snapshot is not None and snapshot.version != last_version:
+            last_version = snapshot.version
+            rotation_label.config(text="Euler Angles: " + str(list(snapshot.euler_angles)))
+            quaternion_label.config(text="Quaternion: (" + ", ".join(f"{i:.4f}" for i in snapshot.quaternion) + ")")
+            euler_principal_label.config(text="Euler Principal: (" + ", ".join(f"{i:.4f}" for i in snapshot.euler_principal) + ")")
+
+            rotation_matrix_string = '\n'.join(['\t'.join([format(cell, ".4f") for cell in row]) for row in snapshot.rotation_matrix])
+            rotation_matrix_label.config(text="Rotation Matrix:\n" + rotation_matrix_string)
+
+            rotation_vector_string = ', '.join([format(i, ".4f") for i in snapshot.rotation_vector])
+            rotation_vector_label.config(text="Rotation Vector: " + rotation_vector_string)
+
+        parent.after(refresh_ms, update_info_window)
+
+    rotation_label = tk.Label(parent)
+    rotation_label.pack()
+
+    quaternion_label = tk.Label(parent)
+    quaternion_label.pack()
+
+    euler_principal_label = tk.Label(parent)
+    euler_principal_label.pack()
+
+    rotation_vector_label = tk.Label(parent)
+    rotation_vector_label.pack()
+
+    rotation_matrix_label = tk.Label(parent)
+    rotation_matrix_label.pack()
+
+    parent.after(refresh_ms, update_info_window)
@@ -0,0 +1,169 @@
+import re
+
+import numpy as np
+import pygame
+from OpenGL.GL import *
+
+# Entrada de rotaciones dentro de la ventana del visor, sin diálogos modales. Una tecla abre una
+# línea de texto sobre la escena donde se escribe la rotación entera de una vez (por ejemplo
+# "1, 0, 0, 0" o "[[1,0,0],[0,1,0],[0,0,1]]"). Enter la valida: si está mal, el error se muestra
+# debajo y la línea sigue abierta; si está bien, el visor la recoge con take() y la aplica en el
+# siguiente frame. El bucle de render sigue a los FPS normales mientras se escribe.
+#
+# Los formatos los define cada visor: {tecla: (comando, título, número de valores)}, con el orden
+# de los valores en el título. Según el comando se comprueba además que la rotación tenga sentido:
+#   quaternion       no puede ser nulo; se normaliza
+#   axis_angle       ángulo y eje, el eje no puede ser nulo; se normaliza
+#   rotation_matrix  9 valores por filas; se reortonormaliza con SVD a la rotación más cercana,
+#                    y se rechaza si es singular o una reflexión
+
+FONT_SIZE = 24
+MARGIN = 8
+TEXT_COLOR = (255, 255, 255)
+ERROR_COLOR = (255, 120, 120)
+BACKGROUND_COLOR = (0, 0, 0, 170)
+RANK_TOLERANCE = 1e-9
+
+_SEPARATORS = re.compile(r"[\s,;\[\]()]+")
+
+def parse_numbers(text):
+    # Los números de la línea, separados por espacios, comas o punto y coma; los corchetes y paréntesis se ignoran
+    values = []
+    for token in _SEPARATORS.split(text):
+        if not token:
+            continue
+        try:
+            value = float(token)
+        except ValueError:
+            raise ValueError(f"'{token}' no es un número") from None
+        if not np.isfinite(value):
+            raise ValueError(f"'{token}' no es un número finito")
+        values.append(value)
+    return values
+
+def orthonormalize(matrix):
+    # La rotación más cercana a matrix (el factor ortogonal de su descomposición polar, con la SVD).
+    # Las matrices singulares y las reflexiones (determinante negativo) no están cerca de ninguna rotación.
+    matrix = np.asarray(matrix, dtype=np.float64)
+    u, singular_values, vt = np.linalg.svd(matrix)
+    if singular_values[-1] <= RANK_TOLERANCE * max(singular_values[0], RANK_TOLERANCE):
+        raise ValueError("la matriz es singular")
+    if np.linalg.det(matrix) < 0:
+        raise ValueError("la matriz es una reflexión, no una rotación")
+    return u @ vt
+
+def parse_rotation(command, text, count):
+    # Devuelve los valores listos para aplicar, o lanza ValueError con un mensaje para el usuario
+    values = parse_numbers(text)
+    if len(values) != count:
+        raise ValueError(f"se esperaban {count} números y hay {len(values)}")
+    if command == "quaternion":
+        norm = np.linalg.norm(values)
+        if norm == 0:
+            raise ValueError("el cuaternión no puede ser nulo")
+        values = [float(value / norm) for value in values]
+    elif command == "axis_angle":
+        norm = np.linalg.norm(values[1:])
+        if norm == 0:
+            raise ValueError("el eje no puede ser nulo")
+        values = [values[0]] + [float(value / norm) for value in values[1:]]
+    elif command == "rotation_matrix":
+        values = orthonormalize(np.reshape(values, (3, 3))).ravel().tolist()
+    return tuple(values)
+
+class InputOverlay:
+    def __init__(self, formats):
+        self.formats = formats
+        self.active = None  # Tecla del formato que se está escribiendo
+        self.text = ""
+        self.error = ""
+        self.version = 0  # Cambia cada vez que hay que redibujar la línea (modo bajo demanda)
+        self._pending = []
+        self._font = None
+        self._lines = None  # (bytes, ancho, alto) de cada línea ya renderizada
+        pygame.key.stop_text_input()  # La tecla que abre la línea no debe escribirse en ella
+
+    def open(self, key):
+        self.active = key
+        self.text = ""
+        self.error = ""
+        self._changed()
+        pygame.key.start_text_input()
+
+    def close(self):
+        self.active = None
+        self._changed()
+        pygame.key.stop_text_input()
+
+    def handle_event(self, event):
+        # True si el evento era para la línea de texto y el visor no debe usarlo
+        if self.active is None:
+            return False
+        if event.type == pygame.TEXTINPUT:
+            self.text += event.text
+            self._changed()
+            return True
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_ESCAPE:
+            self.close()
+        elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+            self._submit()
+        elif event.key == pygame.K_BACKSPACE:
+            self.text = self.text[:-1]
+            self._changed()
+        return True  # Las demás teclas (R, 1, 2, Q...) no hacen nada mientras se escribe
+
+    def take(self):
+        # Los (comando, valores) aceptados desde la última llamada
+        pending, self._pending = self._pending, []
+        return pending
+
+    def _submit(self):
+        command, title, count = self.formats[self.active]
+        try:
+            values = parse_rotation(command, self.text, count)
+        except ValueError as error:
+            self.error = str(error)
+            self._changed()
+            return
+        self._pending.append((command, values))
+        self.close()
+
+    def _changed(self):
+        self.version += 1
+        self._lines = None
+
+    def _render_lines(self):
+        if self._font is None:
+            self._font = pygame.font.Font(None, FONT_SIZE)
+        command, title, count = self.formats[self.active]
+        texts = [(f"{title}: {self.text}_", TEXT_COLOR)]
+        if self.error:
+            texts.append((self.error, ERROR_COLOR))
+        lines = []
+        for text, color in texts:
+            surface = self._font.render(text, True, color)
+            background = pygame.Surface((surface.get_width() + 2*MARGIN, surface.get_height() + MARGIN), pygame.SRCALPHA)
+            background.fill(BACKGROUND_COLOR)
+            background.blit(surface, (MARGIN, MARGIN // 2))
+            # Volteada porque glDrawPixels empieza por la fila de abajo
+            lines.append((pygame.image.tostring(background, "RGBA", True), background.get_width(), background.get_height()))
+        return lines
+
+    def draw(self):
+        # Se dibuja encima de la escena, abajo a la izquierda; solo se rasteriza el texto cuando cambia
+        if self.active is None:
+            return
+        if self._lines is None:
+            self._lines = self._render_lines()
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT)
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        y = MARGIN
+        for data, width, height in reversed(self._lines):
+            glWindowPos2i(MARGIN, y)
+            glDrawPixels(width, height, GL_RGBA, GL_UNSIGNED_BYTE, data)
+            y += height
+        glPopAttrib()
@@ -0,0 +1,131 @@
+import math
+
+import numpy as np
+
+from viewer3d.batch import _as_rows, quaternion_to_rotation_matrix
+from viewer3d.culling import BoundingVolumeHierarchy, CullingStats, current_clip_matrix, frustum_planes
+from viewer3d.mesh import Mesh
+
+# Flotas de figuras: N copias de la misma figura, cada una con su propia orientación, colocadas
+# en una rejilla que ocupa lo mismo que una figura sola (la cámara del visor no cambia y el
+# arcball gira la flota entera). Sirve para ver de un vistazo un array de sensores o un ensemble.
+#
+# Los datos por instancia van en un único array (N, INSTANCE_FLOATS) float32:
+#   [0:4] cuaternión (x, y, z, w)   [4:7] posición del centro   [7] escala
+# y se suben como un solo buffer, como mucho una vez por frame y solo si cambiaron.
+# Antes de dibujar se descartan con viewer3d.culling las instancias fuera del frustum: solo se
+# suben las visibles, y el buffer se vuelve a subir también cuando cambia cuáles lo son.
+#
+# Fleet.draw usa viewer3d.gl_instancing (instancing en la GPU, o un lote calculado aquí con
+# batched_positions si el driver no tiene shaders). batched_mesh da la misma flota como una
+# Mesh normal, para el renderizador por software. Este módulo no importa OpenGL.
+
+INSTANCE_FLOATS = 8
+FLEET_HALF_WIDTH = 1.0  # La rejilla entera cabe en el cubo [-1, 1]³, como una figura sola
+CELL_PITCH = 3.0  # Distancia entre centros de la rejilla, en unidades de la figura (el cubo mide 2)
+# Con más instancias no se dibuja el wireframe: cada figura ocupa pocos píxeles y las aristas la taparían
+# casi entera, y con un driver por software las líneas cuestan más que las caras
+WIREFRAME_INSTANCE_LIMIT = 2000
+
+def random_quaternions(count, seed=0):
+    # Orientaciones uniformes: cuaterniones con componentes normales, normalizados
+    quaternions = np.random.default_rng(seed).normal(size=(count, 4))
+    return quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+
+def load_quaternions(spec):
+    # Las orientaciones de una flota desde la línea de comandos: un número N (aleatorias)
+    # o un .npy (N, 4) de cuaterniones (x, y, z, w), que se mapea en memoria
+    if spec.isdigit():
+        return random_quaternions(int(spec))
+    return _as_rows(np.load(spec, mmap_mode="r"), 4).reshape(-1, 4)
+
+def grid_layout(count, half_width=FLEET_HALF_WIDTH):
+    # Centros (count, 3) de una rejilla cúbica que se llena por filas y escala de cada instancia
+    side = max(math.ceil(round(count ** (1 / 3), 9)), 1)
+    scale = 2 * half_width / (side * CELL_PITCH)
+    index = np.arange(count)
+    cells = np.stack([index % side, index // side % side, index // (side * side)], axis=1)
+    return ((cells - (side - 1) / 2) * CELL_PITCH * scale).astype(np.float32), scale
+
+class Fleet:
+    # Orientaciones y colocación de las instancias. version cambia cada vez que cambian los datos,
+    # y cada renderizador vuelve a subir el buffer solo cuando su versión no coincide.
+    def __init__(self, quaternions):
+        quaternions = _as_rows(quaternions, 4).reshape(-1, 4)
+        self.instances = np.empty((len(quaternions), INSTANCE_FLOATS), dtype=np.float32)
+        offsets, self.scale = grid_layout(len(quaternions))
+        self.instances[:, 4:7] = offsets
+        self.instances[:, 7] = self.scale
+        self.instances[:, :4] = quaternions
+        self.version = 0
+        self.culling = CullingStats(len(quaternions))  # Contadores del último frame dibujado
+        self._renderers = {}  # Figura -> renderizador, creado la primera vez que se dibuja
+        self._hierarchies = {}  # Figura -> árbol de esferas de sus instancias (el radio depende de la malla)
+        self._visible_instances = np.empty_like(self.instances)
+
+    def __len__(self):
+        return len(self.instances)
+
+    def set_orientations(self, quaternions):
+        # Escribe las nuevas orientaciones (N, 4) en el mismo buffer, sin reservar memoria
+        self.instances[:, :4] = _as_rows(quaternions, 4)
+        self.version += 1
+
+    def _hierarchy(self, figure):
+        # Las posiciones no cambian al girar las instancias: el árbol se construye una vez por figura,
+        # con esferas centradas en cada instancia que la contienen en cualquier orientación
+        hierarchy = self._hierarchies.get(figure)
+        if hierarchy is None:
+            positions = figure.mesh().positions.astype(np.float64)
+            radius = self.scale * float(np.sqrt((positions ** 2).sum(axis=1).max())) if len(positions) else 0.0
+            hierarchy = self._hierarchies[figure] = BoundingVolumeHierarchy(self.instances[:, 4:7],
+                                                                            np.full(len(self), radius))
+        return hierarchy
+
+    def draw(self, figure):
+        # Necesita un contexto de OpenGL activo con la matriz de la cámara ya cargada
+        renderer = self._renderers.get(figure)
+        if renderer is None:
+            from viewer3d.gl_instancing import create_fleet_renderer  # OpenGL solo se importa si se va a dibujar
+            renderer = self._renderers[figure] = create_fleet_renderer(figure.mesh())
+            renderer.visible = None
+        hierarchy = self._hierarchy(figure)
+        visible = hierarchy.visible(frustum_planes(current_clip_matrix()))
+        self.culling = hierarchy.stats
+        if renderer.version != self.version or not np.array_equal(renderer.visible, visible):
+            instances = np.take(self.instances, visible, axis=0, out=self._visible_instances[:len(visible)])
+            renderer.upload(instances)
+            renderer.version = self.version
+            renderer.visible = visible
+        renderer.draw()
+
+    def delete(self):
+        for renderer in self._renderers.values():
+            renderer.delete()
+        self._renderers.clear()
+        self._hierarchies.clear()
+
+def batched_positions(positions, instances, out=None):
+    # Vértices de todas las copias (N, V, 3) float32: cada una girada, escalada y trasladada
+    quaternions = instances[:, :4].astype(np.float64)
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    rotations = quaternion_to_rotation_matrix(quaternions).astype(np.float32)
+    rotations *= instances[:, 7, None, None]
+    if out is None:
+        out = np.empty((len(instances), len(positions), 3), dtype=np.float32)
+    np.matmul(positions, rotations.transpose(0, 2, 1), out=out)
+    out += instances[:, None, 4:7]
+    return out
+
+def batched_indices(indices, vertex_count, instance_count):
+    # Los índices de la malla repetidos para cada copia, desplazados a sus vértices
+    offsets = (np.arange(instance_count, dtype=np.uint32) * np.uint32(vertex_count))[:, None, None]
+    return (indices[None] + offsets).reshape(-1, indices.shape[1])
+
+def batched_mesh(mesh, instances):
+    # La flota como una sola Mesh, por ejemplo para SoftwareRenderer con MeshFigure
+    count = len(instances)
+    colors = None if mesh.colors is None else np.tile(mesh.colors, (count, 1))
+    edges = batched_indices(mesh.edges, len(mesh.positions), count) if count <= WIREFRAME_INSTANCE_LIMIT else None
+    return Mesh(batched_positions(mesh.positions, instances).reshape(-1, 3),
+                batched_indices(mesh.triangles, len(mesh.positions), count), edges, colors)
@@ -0,0 +1,142 @@
+import time
+
+import numpy as np
+
+from viewer3d.batch import _as_rows
+
+# Interpolación de cuaterniones (x, y, z, w) con NumPy, sin bucles de Python: todas las funciones
+# aceptan arrays (..., 4) y se aplican fila por fila, así que una sola llamada a resample pasa
+# miles de keyframes a la línea de tiempo de los frames.
+#   slerp  interpolación esférica entre dos orientaciones, a velocidad angular constante
+#   squad  spline esférica por los keyframes, sin cambios bruscos de velocidad en cada keyframe
+# Interpolar cuaterniones en vez de ángulos de Euler no pasa por el bloqueo de cardán.
+
+SLERP_EPSILON = 1e-6  # Por debajo de este seno del ángulo se interpola linealmente y se normaliza
+TRANSITION_SECONDS = 0.4
+
+def quaternion_multiply(a, b):
+    # Producto de Hamilton a·b (primero se aplica b y luego a)
+    a, b = _as_rows(a, 4), _as_rows(b, 4)
+    ax, ay, az, aw = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+    bx, by, bz, bw = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+    q = np.empty(np.broadcast_shapes(a.shape, b.shape))
+    q[..., 0] = aw*bx + ax*bw + ay*bz - az*by
+    q[..., 1] = aw*by - ax*bz + ay*bw + az*bx
+    q[..., 2] = aw*bz + ax*by - ay*bx + az*bw
+    q[..., 3] = aw*bw - ax*bx - ay*by - az*bz
+    return q
+
+def quaternion_conjugate(q):
+    q = _as_rows(q, 4)
+    return q * [-1, -1, -1, 1]
+
+def quaternion_log(q):
+    # Logaritmo de un cuaternión unitario: el vector eje * ángulo/2, (..., 3)
+    q = _as_rows(q, 4)
+    vector = q[..., :3]
+    norm = np.linalg.norm(vector, axis=-1, keepdims=True)
+    half_angle = np.arctan2(norm, q[..., 3:])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(norm < SLERP_EPSILON, 1.0, half_angle / norm)
+    return vector * scale
+
+def quaternion_exp(vector):
+    # La inversa de quaternion_log: de un vector (..., 3) a un cuaternión unitario
+    vector = _as_rows(vector, 3)
+    half_angle = np.linalg.norm(vector, axis=-1, keepdims=True)
+    q = np.empty(vector.shape[:-1] + (4,))
+    q[..., :3] = vector * np.sinc(half_angle / np.pi)  # sin(a)/a, que vale 1 en a = 0
+    q[..., 3:] = np.cos(half_angle)
+    return q
+
+def align_hemispheres(keyframes):
+    # q y -q son la misma orientación: se eligen los signos para que cada keyframe quede en el
+    # mismo hemisferio que el anterior y la interpolación no dé la vuelta larga
+    keyframes = _as_rows(keyframes, 4)
+    if len(keyframes) < 2:
+        return keyframes.copy()
+    dot = np.sum(keyframes[1:] * keyframes[:-1], axis=-1)
+    signs = np.concatenate([[1.0], np.cumprod(np.where(dot < 0, -1.0, 1.0))])
+    return keyframes * signs[:, None]
+
+def slerp(q0, q1, t, shortest_path=True):
+    # Orientaciones entre q0 (t = 0) y q1 (t = 1). Con shortest_path se usa -q1 si está más cerca.
+    q0, q1 = _as_rows(q0, 4), _as_rows(q1, 4)
+    t = np.asarray(t, dtype=np.float64)[..., None]
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    if shortest_path:
+        q1 = np.where(dot < 0, -q1, q1)
+        dot = np.abs(dot)
+    angle = np.arccos(np.clip(dot, -1, 1))
+    sin_angle = np.sin(angle)
+    near = sin_angle < SLERP_EPSILON
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w0 = np.where(near, 1 - t, np.sin((1 - t) * angle) / sin_angle)
+        w1 = np.where(near, t, np.sin(t * angle) / sin_angle)
+    q = w0*q0 + w1*q1
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+def squad_control_points(keyframes):
+    # Puntos de control s_i de la spline: s_i = q_i·exp(-(log(q_i⁻¹·q_i+1) + log(q_i⁻¹·q_i-1))/4).
+    # Los keyframes tienen que estar alineados con align_hemispheres. En los extremos s_i = q_i.
+    keyframes = _as_rows(keyframes, 4)
+    control = keyframes.copy()
+    if len(keyframes) > 2:
+        inverse = quaternion_conjugate(keyframes[1:-1])
+        tangent = (quaternion_log(quaternion_multiply(inverse, keyframes[2:]))
+                   + quaternion_log(quaternion_multiply(inverse, keyframes[:-2])))
+        control[1:-1] = quaternion_multiply(keyframes[1:-1], quaternion_exp(-tangent / 4))
+    return control
+
+def squad(q0, q1, s0, s1, t):
+    # Tramo de la spline entre los keyframes q0 y q1 con sus puntos de control s0 y s1
+    t = np.asarray(t, dtype=np.float64)
+    return slerp(slerp(q0, q1, t, shortest_path=False), slerp(s0, s1, t, shortest_path=False),
+                 2*t*(1 - t), shortest_path=False)
+
+def resample(times, keyframes, sample_times, method="slerp"):
+    # Orientaciones (M, 4) en sample_times a partir de N keyframes en los instantes crecientes times.
+    # Antes del primer keyframe y después del último se repiten los extremos.
+    times = np.asarray(times, dtype=np.float64)
+    keyframes = align_hemispheres(keyframes)
+    if times.shape != keyframes.shape[:1]:
+        raise ValueError(f"hay {len(times)} instantes para {len(keyframes)} keyframes")
+    if np.any(np.diff(times) <= 0):
+        raise ValueError("los instantes de los keyframes tienen que ser crecientes")
+    if method not in ("slerp", "squad"):
+        raise ValueError(f"método de interpolación desconocido: {method}")
+    sample_times = np.asarray(sample_times, dtype=np.float64)
+    if len(keyframes) == 1:
+        return np.broadcast_to(keyframes[0], sample_times.shape + (4,)).copy()
+
+    segment = np.clip(np.searchsorted(times, sample_times, side="right") - 1, 0, len(times) - 2)
+    start, end = times[segment], times[segment + 1]
+    t = np.clip((sample_times - start) / (end - start), 0, 1)
+    if method == "slerp":
+        return slerp(keyframes[segment], keyframes[segment + 1], t, shortest_path=False)
+    control = squad_control_points(keyframes)
+    return squad(keyframes[segment], keyframes[segment + 1], control[segment], control[segment + 1], t)
+
+def smoothstep(t):
+    # Acelera al principio y frena al final, con velocidad 0 en los dos extremos
+    t = np.clip(t, 0, 1)
+    return t*t*(3 - 2*t)
+
+class Transition:
+    # Paso animado de una orientación a otra en duration segundos, con SLERP y smoothstep
+    def __init__(self, start, end, duration=TRANSITION_SECONDS, now=None):
+        self.start = _as_rows(start, 4)
+        self.end = _as_rows(end, 4)
+        self.duration = duration
+        self.finished = False
+        self._start_time = time.monotonic() if now is None else now
+
+    def current(self, now=None):
+        # Cuaternión (x, y, z, w) para el instante now (time.monotonic()); al final devuelve end tal cual
+        if now is None:
+            now = time.monotonic()
+        progress = (now - self._start_time) / self.duration if self.duration > 0 else 1
+        if progress >= 1:
+            self.finished = True
+            return tuple(self.end.tolist())
+        return tuple(slerp(self.start, self.end, smoothstep(progress)).tolist())
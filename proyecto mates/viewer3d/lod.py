@@ -0,0 +1,177 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from viewer3d.mesh import Mesh
+
+# Niveles de detalle (LOD) de una malla: versiones simplificadas que se dibujan cuando la figura
+# ocupa pocos píxeles (fov grande con la rueda del mouse), en vez de mandar todos los triángulos.
+#
+# La simplificación es por agrupación de vértices con métricas de error cuadráticas (Lindstrom):
+# los vértices se reparten en una rejilla, cada celda se reduce a un solo vértice colocado donde
+# minimiza la suma de las distancias al cuadrado a los planos de sus triángulos (las cuádricas de
+# Garland y Heckbert), y se quitan los triángulos que quedan degenerados o repetidos. Todo va con
+# arrays de NumPy, sin la cola de prioridad por arista del colapso de aristas, así que una malla de
+# millones de triángulos se simplifica en segundos. Cada nivel usa una rejilla con la mitad de
+# celdas por lado que el anterior.
+#
+# Cada nivel guarda su error: el lado de la celda, lo más que se puede haber movido la superficie.
+# Al dibujar se elige el nivel más simple cuyo error proyectado en la pantalla no pasa de
+# LOD_PIXEL_ERROR píxeles con el fov actual. Los niveles se guardan con la malla en la caché
+# (viewer3d.mesh_cache), así que se calculan una sola vez por modelo:
+#   python -m viewer3d.lod modelo.fbx     (genera la caché con los niveles antes de abrir el visor)
+
+LOD_MIN_TRIANGLES = 2000  # Las mallas más pequeñas se dibujan siempre enteras
+LOD_COARSEST_TRIANGLES = 64  # No se simplifica por debajo de esto
+LOD_MIN_REDUCTION = 0.6  # Un nivel se guarda solo si tiene como mucho esta fracción de los triángulos del anterior
+LOD_PIXEL_ERROR = 1.5  # Error máximo en píxeles del nivel elegido
+REGULARIZATION = 1e-3  # Peso de la media de la celda al resolver la cuádrica (evita sistemas singulares)
+
+_QUADRIC_TERMS = [(i, j) for i in range(4) for j in range(i, 4)]  # Los 10 términos distintos de la cuádrica 4x4
+
+def face_quadrics(positions, triangles):
+    # Cuádrica de cada triángulo ponderada por su área: (10, T) con los términos de área·p·pᵀ,
+    # donde p = (a, b, c, d) es su plano (normal unitaria)
+    corners = positions[triangles].astype(np.float64)
+    normal = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    double_area = np.linalg.norm(normal, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normal = np.where(double_area[:, None] > 0, normal / double_area[:, None], 0)
+    plane = np.concatenate([normal, -(normal * corners[:, 0]).sum(axis=1, keepdims=True)], axis=1)
+    weight = double_area / 2
+    return np.stack([plane[:, i] * plane[:, j] * weight for i, j in _QUADRIC_TERMS])
+
+def _unique_rows(rows, count):
+    # Índices (ordenados) de la primera aparición de cada fila sin contar el orden de sus elementos,
+    # que son enteros en [0, count). lexsort es estable: en cada grupo de filas iguales va primero la original.
+    rows = np.sort(rows, axis=1)
+    key = rows[:, 0] * count + rows[:, 1]
+    order = np.lexsort((rows[:, 2], key) if rows.shape[1] == 3 else (key,))
+    ordered = rows[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (ordered[1:] != ordered[:-1]).any(axis=1)
+    return np.sort(order[first])
+
+def cluster_vertices(mesh, cell_size, quadrics=None):
+    # La malla simplificada con una rejilla de celdas de lado cell_size. quadrics (face_quadrics de
+    # la malla) se puede pasar para no recalcularlas en cada nivel.
+    positions = np.asarray(mesh.positions, dtype=np.float64)
+    triangles = np.asarray(mesh.triangles, dtype=np.int64)
+    low = positions.min(axis=0)
+    cells = np.floor((positions - low) / cell_size).astype(np.int64)
+    shape = cells.max(axis=0) + 1 if len(cells) else np.ones(3, dtype=np.int64)
+    _, cell = np.unique((cells[:, 0] * shape[1] + cells[:, 1]) * shape[2] + cells[:, 2], return_inverse=True)
+    cell = cell.reshape(-1)
+    cell_count = cell.max() + 1
+
+    # Suma de las cuádricas de los triángulos de cada celda (cada triángulo cuenta en las celdas de sus tres esquinas)
+    if quadrics is None:
+        quadrics = face_quadrics(positions, triangles)
+    corner_cells = np.ascontiguousarray(cell[triangles].T)
+    full = np.empty((cell_count, 4, 4))
+    for k, (i, j) in enumerate(_QUADRIC_TERMS):
+        full[:, i, j] = full[:, j, i] = sum(np.bincount(cells, quadrics[k], cell_count) for cells in corner_cells)
+
+    # Posición óptima: minimiza xᵀ A x + 2 bᵀ x, regularizada hacia la media de la celda para que
+    # las celdas planas o con una sola arista (A singular) tengan solución
+    counts = np.bincount(cell, minlength=cell_count)
+    mean = np.stack([np.bincount(cell, positions[:, axis], cell_count) for axis in range(3)], axis=1) / counts[:, None]
+    A, b = full[:, :3, :3], full[:, :3, 3]
+    weight = REGULARIZATION * np.trace(A, axis1=1, axis2=2) + 1e-12
+    optimal = np.linalg.solve(A + weight[:, None, None] * np.eye(3), (weight[:, None] * mean - b)[..., None])[..., 0]
+    # Si el óptimo cae lejos de su celda (superficies casi paralelas), se usa la media
+    cell_low = low + np.floor((mean - low) / cell_size) * cell_size
+    outside = ((optimal < cell_low - cell_size / 2) | (optimal > cell_low + 1.5 * cell_size)).any(axis=1)
+    optimal[outside] = mean[outside]
+
+    new_triangles = cell[triangles]
+    keep = ((new_triangles[:, 0] != new_triangles[:, 1]) & (new_triangles[:, 1] != new_triangles[:, 2])
+            & (new_triangles[:, 0] != new_triangles[:, 2]))
+    new_triangles = new_triangles[keep]
+    new_triangles = new_triangles[_unique_rows(new_triangles, cell_count)]
+    new_edges = cell[np.asarray(mesh.edges, dtype=np.int64)]
+    new_edges = new_edges[new_edges[:, 0] != new_edges[:, 1]]
+    new_edges = new_edges[_unique_rows(new_edges, cell_count)]
+
+    colors = None
+    if mesh.colors is not None:
+        colors = np.stack([np.bincount(cell, mesh.colors[:, channel], cell_count) for channel in range(4)],
+                          axis=1) / counts[:, None]
+
+    # Solo se quedan los vértices que usa algún triángulo o arista
+    used = np.zeros(cell_count, dtype=bool)
+    used[new_triangles] = True
+    used[new_edges] = True
+    remap = np.cumsum(used) - 1
+    return Mesh(optimal[used], remap[new_triangles], remap[new_edges], None if colors is None else colors[used])
+
+def build_lods(mesh, min_triangles=LOD_MIN_TRIANGLES):
+    # Los niveles [(error, Mesh)] de más detallado a más simple; ninguno si la malla es pequeña
+    if len(mesh.triangles) < min_triangles:
+        return []
+    positions = np.asarray(mesh.positions, dtype=np.float64)
+    extent = float((positions.max(axis=0) - positions.min(axis=0)).max())
+    # Primera rejilla: del orden de una celda por cada dos vértices a lo largo del lado mayor
+    cells_per_side = 2 ** int(np.log2(max(np.sqrt(len(mesh.triangles)) / 2, 2)))
+    quadrics = face_quadrics(positions, mesh.triangles)
+    lods = []
+    previous = len(mesh.triangles)
+    while cells_per_side >= 2:
+        cell_size = extent / cells_per_side
+        level = cluster_vertices(mesh, cell_size, quadrics)
+        if len(level.triangles) <= LOD_MIN_REDUCTION * previous:
+            lods.append((cell_size, level))
+            previous = len(level.triangles)
+        if len(level.triangles) <= LOD_COARSEST_TRIANGLES:
+            break
+        cells_per_side //= 2
+    return lods
+
+def with_lods(mesh):
+    # La misma malla con sus niveles calculados en mesh.lods
+    mesh.lods = build_lods(mesh)
+    return mesh
+
+def pixels_per_unit(clip_matrix, center, radius, viewport_height):
+    # Cuántos píxeles mide en pantalla una longitud de 1 (en coordenadas del objeto) en la parte más
+    # cercana a la cámara de la esfera (center, radius). La fila 1 de proyección · modelview tiene
+    # norma cot(fov/2)·escala, y la 3 da la distancia a la cámara (w).
+    w = clip_matrix[3, :3] @ center + clip_matrix[3, 3] - radius * np.linalg.norm(clip_matrix[3, :3])
+    if w <= 0:
+        return np.inf  # La cámara está dentro de la esfera: el nivel más detallado
+    return np.linalg.norm(clip_matrix[1, :3]) / w * viewport_height / 2
+
+def select_lod(lods, pixels):
+    # Índice del nivel a dibujar (0 es la malla entera, i el lods[i - 1]) con pixels píxeles por unidad
+    level = 0
+    for index, (error, _) in enumerate(lods, 1):
+        if error * pixels > LOD_PIXEL_ERROR:
+            break
+        level = index
+    return level
+
+def current_lod(lods, center, radius):
+    # select_lod con la matriz de la cámara y el viewport del contexto de OpenGL activo
+    from OpenGL.GL import GL_VIEWPORT, glGetIntegerv
+
+    from viewer3d.culling import current_clip_matrix
+
+    viewport_height = glGetIntegerv(GL_VIEWPORT)[3]
+    return select_lod(lods, pixels_per_unit(current_clip_matrix(), center, radius, viewport_height))
+
+def main(argv=None):
+    from viewer3d.figures import load_model_figure
+
+    parser = argparse.ArgumentParser(description="Genera la caché de un modelo FBX con sus niveles de detalle")
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    mesh = load_model_figure(args.path).mesh()
+    print(f"{os.path.basename(args.path)}: {len(mesh.triangles):,d} triángulos, {time.perf_counter() - start:.2f} s")
+    for error, level in mesh.lods:
+        print(f"  error {error:.4f}: {len(level.triangles):,d} triángulos, {len(level.positions):,d} vértices")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import numpy as np
+
+# Malla en memoria lista para subirse a la GPU (o para el renderizado por software).
+# positions: (V,3) float32, triangles: (T,3) uint32, edges: (E,2) uint32 y
+# colors: (V,4) float32 o None si la malla se dibuja con un color uniforme.
+# lods: niveles de detalle [(error, Mesh)] de más detallado a más simple (viewer3d.lod), vacío
+# en las mallas que se dibujan siempre enteras.
+
+DEFAULT_COLOR = (0.8, 0.8, 0.8, 1)
+
+class Mesh:
+    def __init__(self, positions, triangles, edges=None, colors=None):
+        self.positions = np.ascontiguousarray(positions, dtype=np.float32).reshape(-1, 3)
+        self.triangles = np.ascontiguousarray(triangles, dtype=np.uint32).reshape(-1, 3)
+        if edges is None:
+            edges = np.empty((0, 2), dtype=np.uint32)
+        self.edges = np.ascontiguousarray(edges, dtype=np.uint32).reshape(-1, 2)
+        if colors is not None:
+            colors = np.ascontiguousarray(colors, dtype=np.float32).reshape(-1, 4)
+        self.colors = colors
+        self.lods = []
+
+    @classmethod
+    def from_faces(cls, vertices, faces, face_colors, edges):
+        # Construye la malla a partir de la descripción de Cube/Tetrahedron.
+        # Cada cara tiene un color plano, así que sus esquinas se duplican con el color de la cara;
+        # los vértices originales se añaden al final para las aristas del wireframe.
+        vertices = np.asarray(vertices, dtype=np.float32)
+        corner_positions = []
+        corner_colors = []
+        triangles = []
+        for face, color in zip(faces, face_colors):
+            first = len(corner_positions)
+            corner_positions.extend(vertices[vertex] for vertex in face)
+            corner_colors.extend(color for _ in face)
+            # Triangulación en abanico manteniendo el sentido de giro de la cara (para glCullFace)
+            triangles.extend((first, first + k, first + k + 1) for k in range(1, len(face) - 1))
+
+        edge_offset = len(corner_positions)
+        positions = np.concatenate([np.asarray(corner_positions, dtype=np.float32).reshape(-1, 3), vertices])
+        colors = np.concatenate([np.asarray(corner_colors, dtype=np.float32).reshape(-1, 4),
+                                 np.zeros((len(vertices), 4), dtype=np.float32)])
+        edges = np.asarray(edges, dtype=np.uint32) + edge_offset
+        return cls(positions, triangles, edges, colors)
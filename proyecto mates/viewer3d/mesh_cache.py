@@ -0,0 +1,169 @@
+import os
+import struct
+
+import numpy as np
+
+from viewer3d.mesh import Mesh
+
+# Caché binaria de mallas ya procesadas. Cada archivo tiene una cabecera fija seguida de las
+# posiciones (float32), los colores opcionales (float32), los triángulos y las aristas (uint32),
+# alineados a 64 bytes para poder abrirlos con np.memmap y pasarlos a la GPU sin copiarlos.
+# Detrás van los niveles de detalle de la malla (Mesh.lods), con las mismas secciones cada uno y
+# su error y tamaños en una tabla a continuación de la cabecera.
+# La caché se guarda en un directorio .meshcache junto al archivo original y se invalida
+# cuando cambian su fecha de modificación o su tamaño.
+
+CACHE_MAGIC = b"V3DMESH\0"
+CACHE_VERSION = 2
+CACHE_DIRECTORY = ".meshcache"
+CACHE_SUFFIX = ".mesh"
+DEFAULT_MAX_CACHE_BYTES = 512 * 2**20
+
+# magic, versión, flags, mtime_ns y tamaño del original, vértices, triángulos, aristas, niveles de detalle
+_HEADER = struct.Struct("<8sIIqqQQQI")
+# Tabla de niveles: error, vértices, triángulos y aristas de cada uno
+_LEVEL = struct.Struct("<dQQQ")
+_HEADER_SIZE = 64
+_ALIGNMENT = 64
+_HAS_COLORS = 1
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+def _layout(counts, has_colors):
+    # Nivel (0 la malla entera), nombre, dtype, forma y offset de cada sección del archivo.
+    # counts: (vértices, triángulos, aristas) de la malla y de cada nivel de detalle.
+    layout = []
+    offset = _align(_HEADER_SIZE + _LEVEL.size * (len(counts) - 1))
+    for level, (vertex_count, triangle_count, edge_count) in enumerate(counts):
+        sections = [("positions", np.float32, (vertex_count, 3))]
+        if has_colors:
+            sections.append(("colors", np.float32, (vertex_count, 4)))
+        sections.append(("triangles", np.uint32, (triangle_count, 3)))
+        sections.append(("edges", np.uint32, (edge_count, 2)))
+        for name, dtype, shape in sections:
+            layout.append((level, name, dtype, shape, offset))
+            offset = _align(offset + np.dtype(dtype).itemsize * shape[0] * shape[1])
+    return layout, offset
+
+def _counts(mesh):
+    return len(mesh.positions), len(mesh.triangles), len(mesh.edges)
+
+def cache_path(source_path, variant=""):
+    # variant distingue cachés del mismo archivo procesado con opciones distintas
+    directory, name = os.path.split(os.path.abspath(source_path))
+    if variant:
+        name = f"{name}.{variant}"
+    return os.path.join(directory, CACHE_DIRECTORY, name + CACHE_SUFFIX)
+
+def write_mesh_cache(path, mesh, source_stat):
+    has_colors = mesh.colors is not None
+    meshes = [mesh] + [level for _, level in mesh.lods]
+    layout, total = _layout([_counts(level) for level in meshes], has_colors)
+    header = _HEADER.pack(CACHE_MAGIC, CACHE_VERSION, _HAS_COLORS if has_colors else 0,
+                          source_stat.st_mtime_ns, source_stat.st_size, *_counts(mesh), len(mesh.lods))
+    header = header.ljust(_HEADER_SIZE, b"\0") + b"".join(_LEVEL.pack(error, *_counts(level)) for error, level in mesh.lods)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(header)
+        for level, name, dtype, shape, offset in layout:
+            file.seek(offset)
+            file.write(np.ascontiguousarray(getattr(meshes[level], name), dtype=dtype).tobytes())
+        file.truncate(total)
+    os.replace(temporary_path, path)  # Otro proceso nunca ve un archivo a medio escribir
+
+def read_mesh_cache(path, source_stat):
+    # Devuelve la Mesh mapeada en memoria, o None si la caché no existe o no corresponde al original
+    try:
+        with open(path, "rb") as file:
+            header = file.read(_HEADER.size)
+        file_size = os.path.getsize(path)
+    except OSError:
+        return None
+    if len(header) != _HEADER.size:
+        return None
+
+    magic, version, flags, mtime_ns, size, *counts, level_count = _HEADER.unpack(header)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION:
+        return None
+    if mtime_ns != source_stat.st_mtime_ns or size != source_stat.st_size:
+        return None
+    try:
+        with open(path, "rb") as file:
+            file.seek(_HEADER_SIZE)
+            table = file.read(_LEVEL.size * level_count)
+    except OSError:
+        return None
+    if len(table) != _LEVEL.size * level_count:
+        return None
+    levels = list(_LEVEL.iter_unpack(table))
+    layout, total = _layout([tuple(counts)] + [level[1:] for level in levels], flags & _HAS_COLORS)
+    if file_size != total:
+        return None
+
+    arrays = [{} for _ in range(level_count + 1)]
+    for level, name, dtype, shape, offset in layout:
+        if shape[0] == 0:
+            arrays[level][name] = np.empty(shape, dtype=dtype)
+        else:
+            arrays[level][name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+    meshes = [Mesh(level["positions"], level["triangles"], level["edges"], level.get("colors")) for level in arrays]
+    mesh = meshes[0]
+    mesh.lods = [(error, level) for (error, *_), level in zip(levels, meshes[1:])]
+    return mesh
+
+def evict_cache(directory, max_bytes=DEFAULT_MAX_CACHE_BYTES, keep=()):
+    # Borra las cachés usadas hace más tiempo hasta que el directorio ocupe como mucho max_bytes.
+    # La fecha de modificación hace de fecha de último uso (load_cached la actualiza en cada acierto).
+    keep = {os.path.abspath(path) for path in keep}
+    entries = []
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        if not name.endswith(CACHE_SUFFIX):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if os.path.abspath(path) in keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:  # En uso por otro proceso (por ejemplo mapeada en Windows)
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+def load_cached(source_path, loader, variant="", max_cache_bytes=DEFAULT_MAX_CACHE_BYTES):
+    # Carga la malla desde la caché si está al día; si no, la genera con loader(source_path) y la guarda
+    source_stat = os.stat(source_path)
+    path = cache_path(source_path, variant)
+    mesh = read_mesh_cache(path, source_stat)
+    if mesh is not None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return mesh
+
+    mesh = loader(source_path)
+    try:
+        write_mesh_cache(path, mesh, source_stat)
+        evict_cache(os.path.dirname(path), max_cache_bytes, keep=[path])
+    except OSError as error:  # Sin permisos de escritura: se sigue sin caché
+        print(f"No se pudo guardar la caché {path}: {error}")
+    return mesh
@@ -0,0 +1,144 @@
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from viewer3d.snapshot import RotationSnapshot
+
+# Estado de la rotación compartido entre procesos. El visor escribe cada orientación nueva en un
+# buffer circular de registros dentro de un bloque de multiprocessing.shared_memory, y cualquier
+# número de procesos (los paneles de información) se conecta por nombre y lo lee sin locks.
+#
+# Cada registro lleva un número de secuencia que el escritor pone impar antes de escribirlo y par
+# al terminar (un seqlock). El lector copia el registro y lo da por bueno solo si la secuencia era
+# par y no cambió mientras copiaba, así que nunca ve un registro a medio escribir.
+# Solo puede haber un proceso escribiendo.
+
+FEED_MAGIC = 0x44454546443356  # "V3DFEED"
+DEFAULT_CAPACITY = 256
+
+_HEADER_DTYPE = np.dtype([("magic", "<u8"), ("capacity", "<u8"), ("head", "<u8"), ("closed", "<u8")])
+_HEADER_SIZE = 64
+
+RECORD_DTYPE = np.dtype([
+    ("sequence", "<u8"),             # 2*versión mientras el registro es válido, impar mientras se escribe
+    ("timestamp", "<f8"),            # time.monotonic() del visor al publicar
+    ("euler_angles", "<f8", 3),
+    ("quaternion", "<f8", 4),        # (x, y, z, w)
+    ("euler_principal", "<f8", 4),   # 3 o 4 valores según el visor; euler_principal_size dice cuántos
+    ("euler_principal_size", "<u8"),
+    ("rotation_vector", "<f8", 3),
+    ("rotation_matrix", "<f8", (3, 3)),
+])
+
+def _attach(name):
+    # Los lectores no deben borrar el bloque al salir: en Python < 3.13 el resource_tracker lo haría.
+    # Un proceso lanzado por el visor comparte su resource_tracker, que ya tiene el bloque registrado
+    # a nombre del visor: ahí no hay que quitarlo, solo en los procesos con su propio tracker.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        inherited_tracker = getattr(resource_tracker._resource_tracker, "_fd", None) is not None
+        memory = shared_memory.SharedMemory(name=name)
+        if not inherited_tracker:
+            resource_tracker.unregister(memory._name, "shared_memory")
+        return memory
+
+def _views(buffer):
+    header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=buffer)
+    capacity = int(header["capacity"])
+    records = np.ndarray((capacity,), dtype=RECORD_DTYPE, buffer=buffer, offset=_HEADER_SIZE)
+    return header, records
+
+class OrientationFeed:
+    # Lado del visor: crea el bloque de memoria compartida y publica orientaciones
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        size = _HEADER_SIZE + capacity * RECORD_DTYPE.itemsize
+        self._memory = shared_memory.SharedMemory(create=True, size=size)
+        header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=self._memory.buf)
+        header["capacity"] = capacity
+        header["head"] = 0
+        header["closed"] = 0
+        header["magic"] = FEED_MAGIC
+        self._header, self._records = _views(self._memory.buf)
+        self.name = self._memory.name
+
+    def publish(self, euler_angles, quaternion, euler_principal, rotation_vector, rotation_matrix):
+        # Las representaciones de la rotación que se muestran en los paneles (los campos de RotationSnapshot)
+        head = int(self._header["head"])
+        record = self._records[head % len(self._records)]
+        version = head + 1
+        record["sequence"] = 2*version - 1
+        record["timestamp"] = time.monotonic()
+        record["euler_angles"] = euler_angles
+        record["quaternion"] = quaternion
+        euler_principal = np.ravel(euler_principal)
+        record["euler_principal"][:len(euler_principal)] = euler_principal
+        record["euler_principal_size"] = len(euler_principal)
+        record["rotation_vector"] = np.ravel(rotation_vector)
+        record["rotation_matrix"] = rotation_matrix
+        record["sequence"] = 2*version
+        self._header["head"] = version
+        return version
+
+    def close(self):
+        if self._memory is None:
+            return
+        self._header["closed"] = 1  # Los paneles conectados se cierran solos
+        self._header = self._records = None
+        self._memory.close()
+        self._memory.unlink()
+        self._memory = None
+
+class OrientationFeedReader:
+    # Lado de los paneles: se conecta por nombre y lee la última orientación (o todas desde una versión)
+    def __init__(self, name):
+        self._memory = _attach(name)
+        header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=self._memory.buf)
+        if int(header["magic"]) != FEED_MAGIC:
+            self._memory.close()
+            raise ValueError(f"{name} no es un feed de orientaciones del visor")
+        self._header, self._records = _views(self._memory.buf)
+
+    @property
+    def closed(self):
+        return bool(self._header["closed"])
+
+    @property
+    def version(self):
+        return int(self._header["head"])
+
+    def _read(self, version):
+        # Copia el registro de una versión, o None si ya se sobrescribió o se está escribiendo
+        index = (version - 1) % len(self._records)
+        sequence = self._records["sequence"][index]
+        record = self._records[index].copy()
+        if sequence != 2*version or self._records["sequence"][index] != sequence:
+            return None
+        size = int(record["euler_principal_size"])
+        return RotationSnapshot(version, tuple(record["euler_angles"].tolist()), tuple(record["quaternion"].tolist()),
+                                tuple(record["euler_principal"][:size].tolist()),
+                                tuple(record["rotation_vector"].tolist()),
+                                tuple(map(tuple, record["rotation_matrix"].tolist())))
+
+    def latest(self):
+        # La última orientación publicada, o None si todavía no hay ninguna
+        for _ in range(3):  # Si el visor la está sobrescribiendo justo ahora, se vuelve a leer la cabecera
+            version = self.version
+            if version == 0:
+                return None
+            snapshot = self._read(version)
+            if snapshot is not None:
+                return snapshot
+        return None
+
+    def read_since(self, version):
+        # Las orientaciones publicadas después de version que siguen en el buffer, en orden
+        head = self.version
+        first = max(version + 1, head - len(self._records) + 1, 1)
+        snapshots = (self._read(v) for v in range(first, head + 1))
+        return [snapshot for snapshot in snapshots if snapshot is not None]
+
+    def close(self):
+        self._header = self._records = None
+        self._memory.close()
@@ -0,0 +1,171 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+# Grabación y reproducción de orientaciones en un archivo binario de solo añadir.
+#
+# Formato: una cabecera de 16 bytes (LOG_MAGIC, versión y tamaño de registro, enteros de 32 bits
+# little endian) seguida de registros de 24 bytes sin relleno:
+#   timestamp   float64, segundos desde el principio de la grabación
+#   quaternion  float32 x 4, en orden (w, x, y, z)
+# En el resto del proyecto los cuaterniones van en orden (x, y, z, w): el grabador y el
+# reproductor reciben y devuelven ese orden y solo el archivo usa (w, x, y, z).
+#
+# Grabar otra vez en un archivo que ya existe añade los registros al final, con los tiempos
+# siguiendo desde el último. Si el visor se cerró a mitad de un registro, el trozo se descarta.
+# El reproductor mapea el archivo en memoria y busca cada muestra hacia delante desde la anterior,
+# así que un log de varios GB se reproduce leyendo solo las páginas por las que pasa.
+#   python -m viewer3d.orientation_log sesion.qlog     (resumen del archivo)
+
+LOG_MAGIC = b"V3DQLOG\x00"
+LOG_VERSION = 1
+LOG_DTYPE = np.dtype([("timestamp", "<f8"), ("quaternion", "<f4", 4)])
+HEADER_SIZE = 16
+FLUSH_RECORDS = 256  # Registros que se acumulan en memoria antes de escribirlos
+
+_HEADER_DTYPE = np.dtype([("magic", "S8"), ("version", "<u4"), ("record_size", "<u4")])
+
+class LogFormatError(ValueError):
+    pass
+
+def _header():
+    return np.array((LOG_MAGIC, LOG_VERSION, LOG_DTYPE.itemsize), dtype=_HEADER_DTYPE).tobytes()
+
+def _record_count(path):
+    # Registros completos del archivo, comprobando antes la cabecera
+    with open(path, "rb") as file:
+        header = file.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or header[:8] != LOG_MAGIC:
+        raise LogFormatError(f"{path} no es un log de orientaciones")
+    header = np.frombuffer(header, dtype=_HEADER_DTYPE)[0]
+    if header["version"] != LOG_VERSION or header["record_size"] != LOG_DTYPE.itemsize:
+        raise LogFormatError(f"{path}: versión {header['version']} del formato no soportada")
+    return (os.path.getsize(path) - HEADER_SIZE) // LOG_DTYPE.itemsize
+
+class OrientationRecorder:
+    def __init__(self, path):
+        self.path = path
+        offset = 0.0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            count = _record_count(path)
+            os.truncate(path, HEADER_SIZE + count * LOG_DTYPE.itemsize)  # Quita un registro a medias
+            if count:
+                offset = float(np.fromfile(path, dtype=LOG_DTYPE, count=1,
+                                           offset=HEADER_SIZE + (count - 1) * LOG_DTYPE.itemsize)["timestamp"][0])
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_header())
+        self._start = time.monotonic() - offset
+        self._buffer = np.empty(FLUSH_RECORDS, dtype=LOG_DTYPE)
+        self._size = 0
+
+    def record(self, quaternion, timestamp=None):
+        # quaternion en orden (x, y, z, w); timestamp en segundos, por defecto el tiempo desde que se empezó a grabar
+        if timestamp is None:
+            timestamp = time.monotonic() - self._start
+        record = self._buffer[self._size]
+        record["timestamp"] = timestamp
+        x, y, z, w = quaternion
+        record["quaternion"] = (w, x, y, z)
+        self._size += 1
+        if self._size == FLUSH_RECORDS:
+            self.flush()
+
+    def flush(self):
+        self._file.write(self._buffer[:self._size].tobytes())
+        self._file.flush()
+        self._size = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class OrientationLog:
+    # Los registros de un log, mapeados en memoria (solo lectura)
+    def __init__(self, path):
+        self.path = path
+        count = _record_count(path)
+        if count:
+            self.records = np.memmap(path, dtype=LOG_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=LOG_DTYPE)  # No se puede mapear un rango vacío
+        self.timestamps = self.records["timestamp"]
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self):
+        return float(self.timestamps[-1] - self.timestamps[0]) if len(self) else 0.0
+
+    def quaternion(self, index):
+        w, x, y, z = self.records["quaternion"][index].tolist()
+        return (x, y, z, w)
+
+    def index_at(self, timestamp, hint=0):
+        # El último registro con timestamp <= timestamp (el primero si todavía no se llegó a ninguno).
+        # Busca hacia delante desde hint con pasos que se duplican y luego bisecciona ese tramo:
+        # al reproducir en orden solo se tocan las páginas del archivo cercanas a la posición actual.
+        timestamps = self.timestamps
+        if hint >= len(timestamps) or timestamps[hint] > timestamp:
+            hint = 0
+            if timestamps[0] > timestamp:
+                return 0
+        step = 1
+        high = hint + 1
+        while high < len(timestamps) and timestamps[high] <= timestamp:
+            hint = high
+            step *= 2
+            high = hint + step
+        high = min(high, len(timestamps))
+        return hint + int(np.searchsorted(timestamps[hint:high], timestamp, side="right")) - 1
+
+class OrientationPlayer:
+    # Devuelve en cada frame la orientación grabada que toca según el reloj, a speed veces la velocidad real
+    def __init__(self, path, speed=1.0, loop=False):
+        self.log = OrientationLog(path)
+        self.speed = speed
+        self.loop = loop
+        self.finished = len(self.log) == 0
+        self._start = None
+        self._index = 0  # Último registro devuelto, desde donde empieza la siguiente búsqueda
+
+    def current(self, now=None):
+        # Cuaternión (x, y, z, w) para el instante now (time.monotonic()), o None cuando se termina el log
+        if self.finished:
+            return None
+        if now is None:
+            now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        elapsed = (now - self._start) * self.speed
+        if elapsed > self.log.duration:
+            if not self.loop:
+                self.finished = True
+                return None
+            elapsed %= max(self.log.duration, 1e-9)
+        self._index = self.log.index_at(self.log.timestamps[0] + elapsed, self._index)
+        return self.log.quaternion(self._index)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resumen de un log de orientaciones")
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+    log = OrientationLog(args.path)
+    print(f"{args.path}: {len(log)} registros, {log.duration:.3f} s")
+    if len(log) > 1 and log.duration > 0:
+        print(f"{(len(log) - 1) / log.duration:.1f} muestras por segundo de media")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import csv
+import json
+import time
+
+import numpy as np
+
+# Tiempos de cada etapa del bucle del visor (eventos, conversiones, publicación, envío a OpenGL,
+# display.flip, espera...). Cada etapa se mide con un bloque with:
+#
+#     with profiler.stage("draw"):
+#         ...
+#     profiler.end_frame()
+#
+# y al final del frame se guarda una fila con lo que tardó cada etapa y el frame entero. Las
+# últimas PROFILE_WINDOW filas sirven para los percentiles (p50/p95/p99) del HUD; con export_path
+# además se guardan todas en un CSV o un JSON, según la extensión. Los dos se escriben según se
+# dibuja, una fila por frame, sin guardar nada en memoria. El JSON se completa al cerrar con los
+# percentiles de los últimos frames: si el proceso muere antes, solo le falta el cierre.
+# Para los percentiles de toda una sesión larga, mejor el CSV.
+#
+# Desactivado, stage() devuelve siempre el mismo bloque vacío y end_frame() no hace nada, así que
+# el coste es el de un with vacío por etapa. OpenGL encola el trabajo: lo que tarda la GPU en
+# dibujar aparece en display.flip (o en glReadPixels), no en la etapa que lo envió.
+
+PROFILE_WINDOW = 600  # Frames que entran en los percentiles (10 s a 60 FPS)
+PERCENTILES = (50, 95, 99)
+TOTAL_COLUMN = "total"
+
+class _Stage:
+    __slots__ = ("_times", "_index", "_start")
+
+    def __init__(self, times, index):
+        self._times = times
+        self._index = index
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        # Una etapa que se repite en el mismo frame suma sus tiempos
+        self._times[self._index] += time.perf_counter() - self._start
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+NULL_STAGE = _NullStage()
+
+class FrameProfiler:
+    def __init__(self, stages, window=PROFILE_WINDOW, export_path=None, enabled=False):
+        self.stages = tuple(stages)
+        self.columns = self.stages + (TOTAL_COLUMN,)
+        self.export_path = export_path
+        self.enabled = enabled or export_path is not None
+        self.frames = 0  # Frames medidos desde el principio
+        self._current = [0.0] * len(self.stages)  # Segundos de cada etapa en el frame actual
+        self._stages = {name: _Stage(self._current, index) for index, name in enumerate(self.stages)}
+        self._history = np.zeros((window, len(self.columns)))  # Milisegundos de los últimos frames, circular
+        self._frame_start = time.perf_counter()
+
+        self._file = self._writer = None
+        if export_path is not None and export_path.lower().endswith(".json"):
+            self._file = open(export_path, "w")
+            self._file.write(f'{{"unit": "ms", "columns": {json.dumps(list(self.columns))}, "frames": [')
+        elif export_path is not None:
+            self._file = open(export_path, "w", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(("frame",) + tuple(f"{column}_ms" for column in self.columns))
+
+    def stage(self, name):
+        # Bloque with que suma su duración a la etapa name del frame actual
+        return self._stages[name] if self.enabled else NULL_STAGE
+
+    def enable(self, enabled=True):
+        if enabled and not self.enabled:
+            self.cancel_frame()  # El frame a medias no se midió entero
+        self.enabled = enabled or self.export_path is not None
+
+    def cancel_frame(self):
+        # Descarta lo medido desde el último end_frame (por ejemplo en un frame que no se dibuja)
+        self._current[:] = [0.0] * len(self._current)
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        row = [seconds * 1000 for seconds in self._current]
+        row.append((now - self._frame_start) * 1000)
+        self._history[self.frames % len(self._history)] = row
+        if self._writer is not None:
+            self._writer.writerow([self.frames] + [f"{value:.4f}" for value in row])
+        elif self._file is not None:
+            self._file.write((",\n[" if self.frames else "\n[") + ", ".join(f"{value:.4f}" for value in row) + "]")
+        self.frames += 1
+        self._current[:] = [0.0] * len(self._current)
+        self._frame_start = now
+
+    def percentiles(self, q=PERCENTILES):
+        # {columna: array con los percentiles q en milisegundos} de los últimos frames medidos
+        history = self._history[:min(self.frames, len(self._history))]
+        if not len(history):
+            return {column: np.zeros(len(q)) for column in self.columns}
+        values = np.percentile(history, q, axis=0)
+        return {column: values[:, index] for index, column in enumerate(self.columns)}
+
+    def summary_lines(self):
+        # Una línea por etapa con p50, p95 y p99, para el HUD o la consola
+        lines = [f"{'etapa':10s}" + "".join(f"{f'p{q}':>8s}" for q in PERCENTILES) + "  ms"]
+        for column, values in self.percentiles().items():
+            lines.append(f"{column:10s}" + "".join(f"{value:8.2f}" for value in values))
+        return lines
+
+    def close(self):
+        if self._file is None:
+            return
+        if self._writer is None:  # JSON: cierra la lista de frames y añade los percentiles de la ventana
+            summary = {}
+            if self.frames:
+                summary = {column: {f"p{q}": float(value) for q, value in zip(PERCENTILES, values)}
+                           for column, values in self.percentiles().items()}
+            self._file.write(f'\n], "percentiles_window": {min(self.frames, len(self._history))}, '
+                             f'"percentiles": {json.dumps(summary)}}}\n')
+        self._file.close()
+        self._file = self._writer = None
@@ -0,0 +1,65 @@
+import time
+
+import pygame
+from OpenGL.GL import *
+
+# Tabla de percentiles de un FrameProfiler (viewer3d.profiler) dibujada arriba a la izquierda,
+# encima de la escena, igual que la línea de entrada de InputOverlay. El texto se rasteriza como
+# mucho una vez cada HUD_REFRESH segundos; el resto de frames solo se copia con glDrawPixels.
+
+HUD_REFRESH = 0.5
+FONT_SIZE = 18
+MARGIN = 8
+TEXT_COLOR = (200, 255, 200)
+BACKGROUND_COLOR = (0, 0, 0, 170)
+
+class ProfilerHUD:
+    def __init__(self, profiler, visible=False):
+        self.profiler = profiler
+        self.visible = visible
+        self.version = 0  # Cambia cada vez que cambia el texto (modo bajo demanda)
+        self._font = None
+        self._image = None  # (bytes, ancho, alto) del texto ya renderizado
+        self._last_update = 0.0
+        profiler.enable(visible)
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.profiler.enable(self.visible)
+        self._image = None
+        self.version += 1
+
+    def update(self):
+        # Se llama una vez por frame; rehace el texto si ha pasado HUD_REFRESH desde la última vez
+        if not self.visible or time.perf_counter() - self._last_update < HUD_REFRESH:
+            return
+        self._last_update = time.perf_counter()
+        self._image = self._render()
+        self.version += 1
+
+    def _render(self):
+        if self._font is None:
+            self._font = pygame.font.SysFont("monospace", FONT_SIZE)
+        lines = self.profiler.summary_lines()
+        surfaces = [self._font.render(line, True, TEXT_COLOR) for line in lines]
+        width = max(surface.get_width() for surface in surfaces) + 2*MARGIN
+        line_height = self._font.get_linesize()
+        background = pygame.Surface((width, line_height * len(surfaces) + MARGIN), pygame.SRCALPHA)
+        background.fill(BACKGROUND_COLOR)
+        for index, surface in enumerate(surfaces):
+            background.blit(surface, (MARGIN, MARGIN // 2 + index * line_height))
+        # Volteada porque glDrawPixels empieza por la fila de abajo
+        return pygame.image.tostring(background, "RGBA", True), background.get_width(), background.get_height()
+
+    def draw(self):
+        if not self.visible or self._image is None:
+            return
+        data, width, height = self._image
+        viewport_height = glGetIntegerv(GL_VIEWPORT)[3]
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT)
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glWindowPos2i(MARGIN, viewport_height - MARGIN - height)
+        glDrawPixels(width, height, GL_RGBA, GL_UNSIGNED_BYTE, data)
+        glPopAttrib()
@@ -0,0 +1,70 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from viewer3d.figures import FleetFigure, figure_from_name
+from viewer3d.image_io import write_png
+from viewer3d.instancing import Fleet, load_quaternions
+
+# Línea de comandos común a los renderizadores sin ventana (viewer3d.headless con OpenGL y
+# viewer3d.software con NumPy). Un renderizador se crea con (ancho, alto, fov), se usa como
+# context manager y su render(figura, ángulos) devuelve una imagen (alto, ancho, 4) uint8
+# con la primera fila arriba, que puede reutilizar entre llamadas.
+
+def load_orientations(path):
+    # Ángulos de Euler en grados, (N,2) o (N,3), desde un .npy (mapeado en memoria) o un CSV
+    if path.endswith(".npy"):
+        orientations = np.load(path, mmap_mode="r")
+    else:
+        orientations = np.loadtxt(path, delimiter=",", ndmin=2)
+    if orientations.ndim != 2 or orientations.shape[1] not in (2, 3):
+        raise ValueError(f"{path}: se esperaban ángulos de Euler (N,2) o (N,3), no {orientations.shape}")
+    return orientations
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+def main(renderer_class, description, argv=None):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--figure", default="cube", help="cube, tetrahedron o la ruta de un modelo FBX")
+    parser.add_argument("--orientations", help="ángulos de Euler en grados, .npy o CSV con 2 o 3 columnas")
+    parser.add_argument("--random", type=int, default=0, help="renderiza N orientaciones aleatorias")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--instances", metavar="N_O_ARCHIVO",
+                        help="dibuja una flota de la figura: N orientaciones aleatorias o un .npy (N,4) de cuaterniones")
+    parser.add_argument("--size", type=parse_size, default=(256, 256), help="ANCHOxALTO")
+    parser.add_argument("--fov", type=float, default=45)
+    parser.add_argument("--format", choices=("png", "raw"), default="png",
+                        help="png: un archivo por frame en --out; raw: todos los frames RGBA seguidos en el archivo --out")
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    if args.orientations:
+        orientations = load_orientations(args.orientations)
+    elif args.random:
+        orientations = np.random.default_rng(args.seed).uniform(0, 360, size=(args.random, 3))
+    else:
+        parser.error("hace falta --orientations o --random")
+
+    width, height = args.size
+    with renderer_class(width, height, args.fov) as renderer:
+        figure = figure_from_name(args.figure)
+        if args.instances:
+            figure = FleetFigure(figure, Fleet(load_quaternions(args.instances)))
+        start = time.perf_counter()
+        if args.format == "raw":
+            with open(args.out, "wb") as raw_file:
+                for euler_angles in orientations:
+                    renderer.render(figure, euler_angles).tofile(raw_file)
+        else:
+            os.makedirs(args.out, exist_ok=True)
+            for index, euler_angles in enumerate(orientations):
+                write_png(os.path.join(args.out, f"frame_{index:06d}.png"), renderer.render(figure, euler_angles))
+        seconds = time.perf_counter() - start
+
+    print(f"{len(orientations)} frames de {width}x{height} en {seconds:.2f} s ({len(orientations)/seconds:.0f} frames/s)")
+    if args.format == "raw":
+        print(f"{args.out}: {len(orientations)} frames RGBA de {height} filas × {width} columnas, primera fila arriba")
@@ -0,0 +1,288 @@
+import math
+
+import numpy as np
+
+# Motor de rotaciones común a los dos visores. Se puede importar sin pygame, Tk ni OpenGL.
+#
+# Todos los cuaterniones van en orden (x, y, z, w), igual que en viewer3d.batch.
+# Los ángulos de Euler son (roll, pitch, yaw) en x, y, z, con R = R_z · R_y · R_x.
+# El "euler principal" de Rotation es el ángulo y eje de rotación (angle, x, y, z).
+#
+# Hay tres implementaciones de las mismas conversiones:
+#   - Rotation: un valor cada vez con math, la más rápida para una sola rotación
+#   - las funciones de este módulo: un valor cada vez con NumPy (las de ventana 3d.py,
+#     con los mismos nombres; ahí quaternion_to_euler_principal devuelve ángulos de Euler)
+#   - viewer3d.batch: las mismas funciones sobre arrays de N valores
+#
+# Las tres usan las mismas fórmulas en los casos difíciles: el método de Shepperd para pasar de
+# matriz a cuaternión (también a 180 grados), atan2 para el ángulo del cuaternión y para los
+# ángulos de Euler (también en el bloqueo de cardán), hypot para las normas de vectores diminutos
+# y el desarrollo en serie de sin(θ/2)/θ cerca de 0.
+
+SERIES_THRESHOLD = 1e-3  # Por debajo de este ángulo (radianes) se usa el desarrollo en serie
+
+def euler_to_quaternion(roll, pitch, yaw):
+    cos_roll_2 = np.cos(roll/2)
+    sin_roll_2 = np.sin(roll/2)
+    cos_pitch_2 = np.cos(pitch/2)
+    sin_pitch_2 = np.sin(pitch/2)
+    cos_yaw_2 = np.cos(yaw/2)
+    sin_yaw_2 = np.sin(yaw/2)
+
+    qx = sin_roll_2 * cos_pitch_2 * cos_yaw_2 - cos_roll_2 * sin_pitch_2 * sin_yaw_2
+    qy = cos_roll_2 * sin_pitch_2 * cos_yaw_2 + sin_roll_2 * cos_pitch_2 * sin_yaw_2
+    qz = cos_roll_2 * cos_pitch_2 * sin_yaw_2 - sin_roll_2 * sin_pitch_2 * cos_yaw_2
+    qw = cos_roll_2 * cos_pitch_2 * cos_yaw_2 + sin_roll_2 * sin_pitch_2 * sin_yaw_2
+    return [qx, qy, qz, qw]
+
+def quaternion_to_euler_principal(x, y, z, w):
+    # yaw primero; pitch y roll salen de Rz(-yaw)·R, que no se anula en el bloqueo de cardán (ver batch)
+    r00, r01, r02 = 1 - 2*(y*y + z*z), 2*(x*y - z*w), 2*(x*z + y*w)
+    r10, r11, r12 = 2*(x*y + z*w), 1 - 2*(x*x + z*z), 2*(y*z - x*w)
+    yaw = np.arctan2(r10, r00)
+    cos_yaw, sin_yaw = np.cos(yaw), np.sin(yaw)
+    roll = np.arctan2(sin_yaw*r02 - cos_yaw*r12, cos_yaw*r11 - sin_yaw*r01)
+    pitch = np.arctan2(-2*(x*z - y*w), cos_yaw*r00 + sin_yaw*r10)
+    return [roll, pitch, yaw]
+
+def queaternion_to_cube_rotationxy(qx, qy, qz, qw):
+    return quaternion_to_euler_principal(qx, qy, qz, qw)
+
+quaternion_to_cube_rotationxy = queaternion_to_cube_rotationxy
+
+def euler_principal_to_quaternion(roll, pitch, yaw):
+    return euler_to_quaternion(roll, pitch, yaw)
+
+def euler_principal_to_cube_rotationxy(roll, pitch, yaw):
+    roll = np.arctan2(np.sin(roll), np.cos(roll))
+    pitch = np.arctan2(np.sin(pitch), np.cos(pitch))
+    yaw = np.arctan2(np.sin(yaw), np.cos(yaw))
+    return [roll, pitch, yaw]
+
+def axis_angle_to_quaternion(angle, x, y, z):
+    # El eje tiene que ser unitario
+    sin_angle_2 = np.sin(angle/2)
+    return [x*sin_angle_2, y*sin_angle_2, z*sin_angle_2, np.cos(angle/2)]
+
+def quaternion_to_axis_angle(x, y, z, w):
+    # Devuelve (angle, x, y, z) como Rotation.euler_principal. Con el ángulo nulo
+    # el eje no está definido y se usa el eje x.
+    norm = np.hypot(np.hypot(x, y), z)
+    angle = 2*np.arctan2(norm, w)
+    if norm == 0:
+        return [angle, 1.0, 0.0, 0.0]
+    return [angle, x/norm, y/norm, z/norm]
+
+def rotation_vector_to_quaternion(x, y, z):
+    theta = np.hypot(np.hypot(x, y), z)
+    if theta < SERIES_THRESHOLD:  # sin(θ/2)/θ es 0/0 en θ = 0
+        factor = 0.5 - theta**2/48 + theta**4/3840
+    else:
+        factor = np.sin(theta/2)/theta
+    return [x*factor, y*factor, z*factor, np.cos(theta/2)]
+
+def quaternion_to_rotation_vector(x, y, z, w):
+    # La parte vectorial por 2·atan2(|v|, w)/|v|, que con |v| = 0 tiende a 2/w
+    norm = np.hypot(np.hypot(x, y), z)
+    if norm == 0:
+        factor = 2/w if w else np.nan  # El cuaternión nulo no es una rotación
+    else:
+        factor = 2*np.arctan2(norm, w)/norm
+    return [x*factor, y*factor, z*factor]
+
+def quaternion_to_rotation_matrix(x, y, z, w):
+    return np.array([[1 - 2*y*y - 2*z*z, 2*x*y - 2*z*w, 2*x*z + 2*y*w],
+                     [2*x*y + 2*z*w, 1 - 2*x*x - 2*z*z, 2*y*z - 2*x*w],
+                     [2*x*z - 2*y*w, 2*y*z + 2*x*w, 1 - 2*x*x - 2*y*y]])
+
+def rotation_matrix_to_quaternion(R):
+    # Método de Shepperd: P = 4·q·qᵀ se saca de R y se usa la fila de la componente mayor, así que
+    # nunca se divide por algo pequeño (con la traza sola, a 180 grados se divide por 0). w >= 0.
+    R = np.asarray(R, dtype=np.float64)
+    P = np.array([[1 + R[0, 0] - R[1, 1] - R[2, 2], R[0, 1] + R[1, 0], R[0, 2] + R[2, 0], R[2, 1] - R[1, 2]],
+                  [R[0, 1] + R[1, 0], 1 - R[0, 0] + R[1, 1] - R[2, 2], R[1, 2] + R[2, 1], R[0, 2] - R[2, 0]],
+                  [R[0, 2] + R[2, 0], R[1, 2] + R[2, 1], 1 - R[0, 0] - R[1, 1] + R[2, 2], R[1, 0] - R[0, 1]],
+                  [R[2, 1] - R[1, 2], R[0, 2] - R[2, 0], R[1, 0] - R[0, 1], 1 + R[0, 0] + R[1, 1] + R[2, 2]]])
+    largest = np.argmax(np.diagonal(P))
+    q = P[largest] / (2*np.sqrt(P[largest, largest]))
+    if q[3] < 0:
+        q = -q
+    return list(q)
+
+def euler_to_rotation_matrix(roll, pitch, yaw):
+    # R = R_z · R_y · R_x desarrollada término a término, sin las tres matrices intermedias
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    return np.array([[cy*cp, cy*sp*sr - sy*cr, cy*sp*cr + sy*sr],
+                     [sy*cp, sy*sp*sr + cy*cr, sy*sp*cr - cy*sr],
+                     [-sp, cp*sr, cp*cr]])
+
+def rotation_matrix_to_rotation_vector(R):
+    # Vector columna (3,1). Pasa por el cuaternión: con θ/(2·sin θ) y la parte antisimétrica de R,
+    # a 0 grados se divide 0/0 y a 180 la parte antisimétrica es nula y se pierde el eje.
+    return np.array(quaternion_to_rotation_vector(*rotation_matrix_to_quaternion(R))).reshape(3, 1)
+
+def rotation_matrix_to_cube_rotationxy(R):
+    roll = np.arctan2(R[2, 1], R[2, 2])
+    pitch = np.arctan2(-R[2, 0], np.sqrt(R[2, 1]**2 + R[2, 2]**2))
+    yaw = np.arctan2(R[1, 0], R[0, 0])
+    return [roll, pitch, yaw]
+
+def rotation_vector_to_cube_rotationxy(x, y, z):
+    roll = np.arctan2(z, y)
+    pitch = np.arctan2(-z, x)
+    yaw = np.arctan2(y, x)
+    return [roll, pitch, yaw]
+
+class Rotation:
+    # El cuaternión es la única representación que se guarda. Las demás se calculan la primera vez
+    # que se leen y se guardan junto al cuaternión del que salen: si el cuaternión cambió desde
+    # entonces, se recalculan. Al comparar por identidad no hace falta invalidar nada al asignarlo,
+    # y un hilo que lee (la ventana de información) nunca se queda con un valor viejo.
+    __slots__ = ("_quaternion", "_euler_principal", "_euler_angles", "_rotation_vector", "_rotation_matrix")
+
+    def __init__(self):
+        # Inicializa la rotación a una identidad (sin rotación)
+        self._euler_principal = self._euler_angles = self._rotation_vector = self._rotation_matrix = None
+        self.quaternion = (0, 0, 0, 1)
+
+    @property
+    def quaternion(self):
+        return self._quaternion
+
+    @quaternion.setter
+    def quaternion(self, quaternion):
+        # Se guarda como tupla nueva: no se puede modificar sin pasar por aquí
+        self._quaternion = tuple(quaternion)
+
+    @property
+    def euler_principal(self):
+        quaternion = self._quaternion
+        cached = self._euler_principal
+        if cached is None or cached[0] is not quaternion:
+            cached = self._euler_principal = (quaternion, self.quaternion_to_euler_principal())
+        return cached[1]
+
+    @property
+    def euler_angles(self):
+        quaternion = self._quaternion
+        cached = self._euler_angles
+        if cached is None or cached[0] is not quaternion:
+            cached = self._euler_angles = (quaternion, self.quaternion_to_euler_angles())
+        return cached[1]
+
+    @property
+    def rotation_vector(self):
+        quaternion = self._quaternion
+        cached = self._rotation_vector
+        if cached is None or cached[0] is not quaternion:
+            cached = self._rotation_vector = (quaternion, self.quaternion_to_rotation_vector())
+        return cached[1]
+
+    @property
+    def rotation_matrix(self):
+        quaternion = self._quaternion
+        cached = self._rotation_matrix
+        if cached is None or cached[0] is not quaternion:
+            cached = self._rotation_matrix = (quaternion, self.quaternion_to_rotation_matrix())
+        return cached[1]
+
+    def quaternion_to_euler_principal(self):
+        # Convierte el cuaternión a Euler Principal (Ángulo y Eje)
+        x, y, z, w = self.quaternion
+        norm = math.hypot(x, y, z)
+        angle = 2 * math.atan2(norm, w)  # Con acos(w) se pierde precisión cerca de 0 y |w| > 1 da error
+        if norm == 0:  # Con el ángulo nulo el eje no está definido: se usa el eje x
+            x=1
+            y=z=0
+        else:
+            x /= norm
+            y /= norm
+            z /= norm
+        return (angle, x, y, z)
+
+    def quaternion_to_euler_angles(self):
+        # Convierte el cuaternión a Ángulos de Euler: Z primero, y X e Y de Rz(-Z)·R, cuyos
+        # elementos no se anulan en el bloqueo de cardán (Y = ±90°), donde Z es arbitrario
+        x, y, z, w = self.quaternion
+        r00, r01, r02 = 1 - 2*(y*y + z*z), 2*(x*y - z*w), 2*(x*z + y*w)
+        r10, r11, r12 = 2*(x*y + z*w), 1 - 2*(x*x + z*z), 2*(y*z - x*w)
+        Z = math.atan2(r10, r00)
+        cos_z, sin_z = math.cos(Z), math.sin(Z)
+        X = math.atan2(sin_z*r02 - cos_z*r12, cos_z*r11 - sin_z*r01)
+        Y = math.atan2(-2*(x*z - y*w), cos_z*r00 + sin_z*r10)
+
+        return X, Y, Z  # in radians
+
+    def quaternion_to_rotation_vector(self):
+        # Convierte el cuaternión a Vector de Rotación: la parte vectorial por 2·atan2(|v|, w)/|v|
+        x, y, z, w = self.quaternion
+        norm = math.hypot(x, y, z)
+        if norm == 0:
+            factor = 2/w if w else math.nan  # Límite en |v| = 0: la identidad da el vector nulo
+        else:
+            factor = 2 * math.atan2(norm, w) / norm
+        return (x*factor, y*factor, z*factor)
+
+    def quaternion_to_rotation_matrix(self):
+        # Convierte el cuaternión a Matriz de Rotación
+        x, y, z, w = self.quaternion
+        return [[1 - 2*y*y - 2*z*z, 2*x*y - 2*z*w, 2*x*z + 2*y*w],
+                [2*x*y + 2*z*w, 1 - 2*x*x - 2*z*z, 2*y*z - 2*x*w],
+                [2*x*z - 2*y*w, 2*y*z + 2*x*w, 1 - 2*x*x - 2*y*y]]
+
+    def set_from_quaternion(self, quaternion):
+        # Establece la rotación a partir de un cuaternión (x, y, z, w)
+        self.quaternion = quaternion
+
+    def set_from_euler_principal(self, angle, x, y, z):
+        # Establece la rotación a partir de un ángulo y eje
+        sin_angle_2 = math.sin(angle/2)
+        self.quaternion = (x*sin_angle_2, y*sin_angle_2, z*sin_angle_2, math.cos(angle/2))
+
+    def set_from_euler_angles(self, x, y, z):
+        # Establece la rotación a partir de ángulos de Euler (la inversa de quaternion_to_euler_angles)
+        cos_roll_2, sin_roll_2 = math.cos(x/2), math.sin(x/2)
+        cos_pitch_2, sin_pitch_2 = math.cos(y/2), math.sin(y/2)
+        cos_yaw_2, sin_yaw_2 = math.cos(z/2), math.sin(z/2)
+
+        self.quaternion = (sin_roll_2 * cos_pitch_2 * cos_yaw_2 - cos_roll_2 * sin_pitch_2 * sin_yaw_2,
+                           cos_roll_2 * sin_pitch_2 * cos_yaw_2 + sin_roll_2 * cos_pitch_2 * sin_yaw_2,
+                           cos_roll_2 * cos_pitch_2 * sin_yaw_2 - sin_roll_2 * sin_pitch_2 * cos_yaw_2,
+                           cos_roll_2 * cos_pitch_2 * cos_yaw_2 + sin_roll_2 * sin_pitch_2 * sin_yaw_2)
+
+    def set_from_rotation_vector(self, x, y, z):
+        # Establece la rotación a partir de un vector de rotación
+        angle = math.hypot(x, y, z)
+        if angle < SERIES_THRESHOLD:  # sin(θ/2)/θ es 0/0 en θ = 0
+            factor = 0.5 - angle*angle/48 + angle**4/3840
+        else:
+            factor = math.sin(angle/2)/angle
+        self.quaternion = (x*factor, y*factor, z*factor, math.cos(angle/2))
+
+    def set_from_rotation_matrix(self, R):
+        # Establece la rotación a partir de una matriz de rotación, con el método de Shepperd: se
+        # calcula primero la componente mayor del cuaternión y las demás se dividen por ella
+        diagonal = (1 + R[0][0] - R[1][1] - R[2][2], 1 - R[0][0] + R[1][1] - R[2][2],
+                    1 - R[0][0] - R[1][1] + R[2][2], 1 + R[0][0] + R[1][1] + R[2][2])
+        largest = diagonal.index(max(diagonal))
+        if largest == 0:
+            x = math.sqrt(diagonal[0]) / 2
+            f = 1 / (4*x)
+            y, z, w = (R[0][1] + R[1][0]) * f, (R[0][2] + R[2][0]) * f, (R[2][1] - R[1][2]) * f
+        elif largest == 1:
+            y = math.sqrt(diagonal[1]) / 2
+            f = 1 / (4*y)
+            x, z, w = (R[0][1] + R[1][0]) * f, (R[1][2] + R[2][1]) * f, (R[0][2] - R[2][0]) * f
+        elif largest == 2:
+            z = math.sqrt(diagonal[2]) / 2
+            f = 1 / (4*z)
+            x, y, w = (R[0][2] + R[2][0]) * f, (R[1][2] + R[2][1]) * f, (R[1][0] - R[0][1]) * f
+        else:
+            w = math.sqrt(diagonal[3]) / 2
+            f = 1 / (4*w)
+            x, y, z = (R[2][1] - R[1][2]) * f, (R[0][2] - R[2][0]) * f, (R[1][0] - R[0][1]) * f
+        if w < 0:  # q y -q son la misma rotación: w >= 0 como con la fórmula de la traza
+            x, y, z, w = -x, -y, -z, -w
+        self.quaternion = (x, y, z, w)
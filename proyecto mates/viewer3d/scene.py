@@ -0,0 +1,90 @@
+import numpy as np
+
+from viewer3d.batch import quaternion_to_rotation_matrix
+from viewer3d.culling import BoundingVolumeHierarchy, CullingStats, bounding_sphere, current_clip_matrix, frustum_planes
+
+# Grafo de escena: nodos con una figura opcional y una transformación relativa a su padre
+# (posición, cuaternión (x, y, z, w) y escala uniforme). Al dibujar, solo las figuras cuya esfera
+# envolvente corta el frustum actual llegan a OpenGL; las esferas de todas las figuras se guardan
+# en un BoundingVolumeHierarchy de viewer3d.culling, que descarta de una vez los grupos de fuera.
+#
+# Las matrices del mundo, las esferas y el árbol se calculan la primera vez que se dibuja y cada
+# vez que la escena cambia (add o invalidate). Una Scene se dibuja con draw(), como una figura.
+
+ROW_SPACING = 2.0  # Distancia entre figuras de row_scene
+ROW_SCALE = 0.55  # Con esta escala tres figuras del tamaño del cubo caben en la vista inicial del visor
+
+class SceneNode:
+    def __init__(self, figure=None, position=(0, 0, 0), quaternion=(0, 0, 0, 1), scale=1.0):
+        self.figure = figure
+        self.position = position
+        self.quaternion = quaternion
+        self.scale = scale
+        self.children = []
+
+    def local_matrix(self):
+        # Traslación · rotación · escala, por filas
+        matrix = np.eye(4)
+        matrix[:3, :3] = quaternion_to_rotation_matrix(self.quaternion) * self.scale
+        matrix[:3, 3] = self.position
+        return matrix
+
+class Scene:
+    def __init__(self):
+        self.root = SceneNode()
+        self.culling = CullingStats()  # Contadores del último frame dibujado
+        self._hierarchy = None
+
+    def add(self, figure=None, parent=None, position=(0, 0, 0), quaternion=(0, 0, 0, 1), scale=1.0):
+        # Añade un nodo debajo de parent (la raíz si no se da) y lo devuelve
+        node = SceneNode(figure, position, quaternion, scale)
+        (parent or self.root).children.append(node)
+        self.invalidate()
+        return node
+
+    def invalidate(self):
+        # Hay que llamarlo después de cambiar la transformación o la figura de algún nodo
+        self._hierarchy = None
+
+    def _build(self):
+        figures, matrices, centers, radii = [], [], [], []
+        spheres = {}  # Figura -> esfera de su malla, para no recalcularla si se repite
+        stack = [(self.root, np.eye(4))]
+        while stack:
+            node, parent_matrix = stack.pop()
+            matrix = parent_matrix @ node.local_matrix()
+            stack.extend((child, matrix) for child in node.children)
+            if node.figure is None:
+                continue
+            if node.figure not in spheres:
+                spheres[node.figure] = bounding_sphere(node.figure.mesh().positions)
+            center, radius = spheres[node.figure]
+            figures.append(node.figure)
+            matrices.append(matrix)
+            centers.append(matrix[:3, :3] @ center + matrix[:3, 3])
+            radii.append(radius * np.linalg.norm(matrix[:3, :3], axis=0).max())  # Con escala no uniforme, la mayor
+        self._figures = figures
+        # Por columnas, como las espera glMultMatrixf
+        self._gl_matrices = np.ascontiguousarray(np.transpose(np.reshape(matrices, (-1, 4, 4)), (0, 2, 1)), dtype=np.float32).reshape(-1, 16)
+        self._hierarchy = BoundingVolumeHierarchy(np.reshape(centers, (-1, 3)), radii)
+
+    def draw(self):
+        # Necesita un contexto de OpenGL activo con la matriz de la cámara ya cargada
+        from OpenGL.GL import glMultMatrixf, glPopMatrix, glPushMatrix
+
+        if self._hierarchy is None:
+            self._build()
+        visible = self._hierarchy.visible(frustum_planes(current_clip_matrix()))
+        self.culling = self._hierarchy.stats
+        for index in visible:
+            glPushMatrix()
+            glMultMatrixf(self._gl_matrices[index])
+            self._figures[index].draw()
+            glPopMatrix()
+
+def row_scene(figures, spacing=ROW_SPACING, scale=ROW_SCALE):
+    # Las figuras en fila sobre el eje x, centrada en el origen
+    scene = Scene()
+    for index, figure in enumerate(figures):
+        scene.add(figure, position=(spacing * (index - (len(figures) - 1) / 2), 0, 0), scale=scale)
+    return scene
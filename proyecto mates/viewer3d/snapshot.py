@@ -0,0 +1,12 @@
+from typing import NamedTuple
+
+# Instantánea inmutable con todas las representaciones de una rotación ya calculadas por el visor.
+# Es lo que los paneles de información leen del OrientationFeed (viewer3d.orientation_feed).
+
+class RotationSnapshot(NamedTuple):
+    version: int            # Crece en cada publicación: si no cambió, no hay nada nuevo que mostrar
+    euler_angles: tuple
+    quaternion: tuple       # (x, y, z, w)
+    euler_principal: tuple
+    rotation_vector: tuple
+    rotation_matrix: tuple  # Tres filas de tres floats
@@ -0,0 +1,198 @@
+import numpy as np
+
+from viewer3d import render_cli
+from viewer3d.mesh import DEFAULT_COLOR
+
+# Renderizado por software con NumPy, para sacar imágenes en máquinas sin OpenGL.
+# Reproduce lo que dibuja el visor: la misma cámara (gluPerspective + glTranslatef(0, 0, -5)),
+# las rotaciones con glRotatef en x, y (y z), descarte de caras traseras como glCullFace(GL_BACK)
+# y el wireframe negro encima de las caras. Las caras se resuelven con un z-buffer.
+#
+# No hay ningún bucle de Python por píxel ni por triángulo: cada triángulo se expande a los
+# píxeles de su rectángulo envolvente y todos se evalúan a la vez con coordenadas baricéntricas.
+# Para acotar la memoria, los triángulos se procesan en bloques de como mucho FRAGMENT_BUDGET
+# píxeles candidatos.
+
+NEAR = 0.1
+FAR = 100.0
+CAMERA_DISTANCE = 5
+FRAGMENT_BUDGET = 1 << 22
+EDGE_COLOR = (0, 0, 0, 1)
+
+def perspective_matrix(fov, aspect, near=NEAR, far=FAR):
+    # La misma matriz que gluPerspective (fov vertical en grados)
+    f = 1 / np.tan(np.radians(fov) / 2)
+    return np.array([
+        [f / aspect, 0, 0, 0],
+        [0, f, 0, 0],
+        [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)],
+        [0, 0, -1, 0],
+    ])
+
+def axis_rotation_matrix(degrees, axis):
+    # La misma matriz que glRotatef(degrees, ...) sobre el eje x (0), y (1) o z (2)
+    c, s = np.cos(np.radians(degrees)), np.sin(np.radians(degrees))
+    i, j = [(1, 2), (2, 0), (0, 1)][axis]
+    matrix = np.eye(4)
+    matrix[i, i] = matrix[j, j] = c
+    matrix[i, j] = -s
+    matrix[j, i] = s
+    return matrix
+
+def model_view_projection(euler_angles, fov, aspect):
+    # Equivale a la secuencia de llamadas de ventana 3d.py: ángulos en grados, rotación en x y luego en y (y z si se da)
+    matrix = perspective_matrix(fov, aspect)
+    matrix[:, 3] += matrix[:, 2] * -CAMERA_DISTANCE  # glTranslatef(0, 0, -5)
+    for axis, degrees in enumerate(euler_angles[:3]):
+        matrix = matrix @ axis_rotation_matrix(degrees, axis)
+    return matrix
+
+def _chunks(counts, budget=FRAGMENT_BUDGET):
+    # Divide los elementos en rangos consecutivos cuya suma de counts no pase de budget
+    # (un elemento que ya lo supera va solo en su rango)
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(counts):
+        base = ends[start - 1] if start else 0
+        stop = max(int(np.searchsorted(ends, base + budget, side="right")), start + 1)
+        yield start, stop
+        start = stop
+
+def _expand(counts):
+    # Para cada elemento i repetido counts[i] veces: a qué elemento pertenece y su posición 0..counts[i]-1
+    owner = np.repeat(np.arange(len(counts)), counts)
+    first = np.cumsum(counts) - counts
+    return owner, np.arange(len(owner)) - first[owner]
+
+class SoftwareRenderer:
+    def __init__(self, width=256, height=256, fov=45, background=(0, 0, 0, 1)):
+        self.width = width
+        self.height = height
+        self.fov = fov
+        self.background = np.round(np.asarray(background) * 255).astype(np.uint8)
+        # Buffers reutilizables entre frames
+        self.image = np.empty((height, width, 4), dtype=np.uint8)
+        self.depth = np.empty(height * width, dtype=np.float32)
+        self._pixels = self.image.reshape(-1, 4)
+
+    def project(self, positions, euler_angles):
+        # Coordenadas de ventana (x hacia la derecha, y hacia abajo, en píxeles), profundidad en [0, 1]
+        # y w de clip, que hace falta para interpolar con corrección de perspectiva
+        matrix = model_view_projection(euler_angles, self.fov, self.width / self.height)
+        clip = positions @ matrix[:, :3].T + matrix[:, 3]
+        w = clip[:, 3]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = (clip[:, 0] / w + 1) * (self.width / 2)
+            y = (1 - clip[:, 1] / w) * (self.height / 2)
+            z = (clip[:, 2] / w + 1) / 2
+        return x, y, z, w
+
+    def render(self, figure, euler_angles):
+        mesh = figure.mesh()
+        x, y, z, w = self.project(mesh.positions.astype(np.float64), euler_angles)
+        # No se recorta contra el plano cercano: se descartan las primitivas con algún vértice detrás de él.
+        # Las figuras del visor caben de sobra entre la cámara y el origen, así que no pasa nunca.
+        visible = w > NEAR
+
+        self.image[:] = self.background
+        self.depth.fill(np.inf)
+        self._draw_triangles(mesh, x, y, z, w, visible)
+        self._draw_edges(mesh, x, y, visible)
+        return self.image
+
+    def _draw_triangles(self, mesh, x, y, z, w, visible):
+        triangles = mesh.triangles[visible[mesh.triangles].all(axis=1)]
+        tx, ty = x[triangles], y[triangles]
+
+        # Área con signo en coordenadas de ventana con y hacia abajo: las caras delanteras (antihorario
+        # en OpenGL, con y hacia arriba) salen negativas. Igual que glCullFace(GL_BACK) con glFrontFace(GL_CCW).
+        area = (tx[:, 1] - tx[:, 0]) * (ty[:, 2] - ty[:, 0]) - (tx[:, 2] - tx[:, 0]) * (ty[:, 1] - ty[:, 0])
+        front = area < 0
+        triangles, tx, ty, area = triangles[front], tx[front], ty[front], area[front]
+
+        # Píxeles cuyo centro (i + 0.5) cae dentro del rectángulo envolvente, recortado a la imagen
+        x_low = np.maximum(np.ceil(tx.min(axis=1) - 0.5), 0).astype(np.int64)
+        x_high = np.minimum(np.floor(tx.max(axis=1) - 0.5), self.width - 1).astype(np.int64)
+        y_low = np.maximum(np.ceil(ty.min(axis=1) - 0.5), 0).astype(np.int64)
+        y_high = np.minimum(np.floor(ty.max(axis=1) - 0.5), self.height - 1).astype(np.int64)
+        columns = np.maximum(x_high - x_low + 1, 0)
+        counts = columns * np.maximum(y_high - y_low + 1, 0)
+        on_screen = counts > 0
+        triangles, tx, ty, area = triangles[on_screen], tx[on_screen], ty[on_screen], area[on_screen]
+        x_low, y_low, columns, counts = x_low[on_screen], y_low[on_screen], columns[on_screen], counts[on_screen]
+
+        # Cada coordenada baricéntrica es una función lineal del centro del píxel: a*x + b*y + c.
+        # La del vértice k es la función de arista del lado opuesto dividida por el área.
+        opposite_x = np.roll(tx, -1, axis=1), np.roll(tx, -2, axis=1)
+        opposite_y = np.roll(ty, -1, axis=1), np.roll(ty, -2, axis=1)
+        # Se guardan juntos (T,3,3) para reunirlos por fragmento con un solo indexado
+        plane = np.stack([opposite_y[0] - opposite_y[1],
+                          opposite_x[1] - opposite_x[0],
+                          opposite_x[0] * opposite_y[1] - opposite_x[1] * opposite_y[0]], axis=1)
+        plane = (plane / area[:, None, None]).astype(np.float32)
+
+        colors = mesh.colors
+        if colors is None:
+            colors = np.broadcast_to(np.asarray(DEFAULT_COLOR, dtype=np.float32), (len(mesh.positions), 4))
+        inverse_w = 1 / w
+
+        for start, stop in _chunks(counts):
+            owner, index = _expand(counts[start:stop])
+            owner += start
+            row, column = np.divmod(index, columns[owner])
+            px = x_low[owner] + column
+            py = y_low[owner] + row
+            coefficients = plane[owner]
+            barycentric = coefficients[:, 0] * (px + 0.5).astype(np.float32)[:, None]
+            barycentric += coefficients[:, 1] * (py + 0.5).astype(np.float32)[:, None]
+            barycentric += coefficients[:, 2]
+            inside = (barycentric >= 0).all(axis=1)
+            owner, barycentric = owner[inside], barycentric[inside]
+            pixel = py[inside] * self.width + px[inside]
+            corners = triangles[owner]
+
+            # Test de profundidad: la profundidad se interpola linealmente en pantalla, como en OpenGL.
+            # Si dos fragmentos empatan en un píxel se queda el último, sin consecuencias visibles.
+            depth = (barycentric * z[corners]).sum(axis=1).astype(np.float32)
+            np.minimum.at(self.depth, pixel, depth)
+            nearest = depth <= self.depth[pixel]
+            barycentric, corners, pixel = barycentric[nearest], corners[nearest], pixel[nearest]
+
+            # Los colores se interpolan con corrección de perspectiva
+            weights = barycentric * inverse_w[corners]
+            weights /= weights.sum(axis=1, keepdims=True)
+            color = np.einsum("fk,fkc->fc", weights, colors[corners])
+            self._pixels[pixel] = np.clip(np.round(color * 255), 0, 255).astype(np.uint8)
+
+    def _draw_edges(self, mesh, x, y, visible):
+        # El visor dibuja el wireframe sin test de profundidad, así que las aristas traseras también
+        # se ven a través de las caras. Cada arista se muestrea con un punto por píxel recorrido.
+        edges = mesh.edges[visible[mesh.edges].all(axis=1)]
+        ex, ey = x[edges], y[edges]
+        dx, dy = ex[:, 1] - ex[:, 0], ey[:, 1] - ey[:, 0]
+        counts = np.ceil(np.maximum(np.abs(dx), np.abs(dy))).astype(np.int64) + 1
+        edge_color = np.round(np.asarray(EDGE_COLOR) * 255).astype(np.uint8)
+
+        for start, stop in _chunks(counts):
+            owner, index = _expand(counts[start:stop])
+            owner += start
+            t = index / np.maximum(counts[owner] - 1, 1)
+            px = np.floor(ex[owner, 0] + t * dx[owner]).astype(np.int64)
+            py = np.floor(ey[owner, 0] + t * dy[owner]).astype(np.int64)
+            inside = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+            self._pixels[py[inside] * self.width + px[inside]] = edge_color
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv=None):
+    render_cli.main(SoftwareRenderer, "Renderiza una figura en muchas orientaciones con NumPy, sin OpenGL", argv)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import numpy as np
+
+from viewer3d import batch
+from viewer3d.orientation_log import HEADER_SIZE, LOG_DTYPE, OrientationLog
+
+# Conversión en flujo de secuencias de orientaciones que no caben en memoria. Las conversiones de
+# viewer3d.batch se encadenan en etapas (por ejemplo quaternion_to_rotation_matrix y luego
+# rotation_matrix_to_rotation_vector) y se aplican a un iterador de bloques (N, ...):
+#   for vectors in stream(log_chunks("sesion.qlog"), "quaternion_to_rotation_matrix",
+#                         "rotation_matrix_to_rotation_vector"):
+#       ...
+#
+# Cada etapa reserva una vez su buffer de salida de chunk_rows filas y lo reescribe con cada bloque
+# (batch.convert_into), así que la memoria no depende de la longitud de la secuencia. Los bloques
+# de entrada mayores que chunk_rows se parten. Lo que se obtiene del generador es una vista del
+# buffer de la última etapa: vale hasta pedir el siguiente bloque (hay que copiarlo para guardarlo).
+
+CHUNK_ROWS = 1 << 16
+
+# Forma de cada fila de las representaciones que aparecen en los nombres de las conversiones
+ROW_SHAPES = {
+    "euler": (3,),
+    "euler_principal": (3,),
+    "cube_rotationxy": (3,),
+    "quaternion": (4,),
+    "axis_angle": (4,),
+    "rotation_vector": (3,),
+    "rotation_matrix": (3, 3),
+}
+# Los ángulos principales son ángulos de Euler: una etapa que da euler_principal puede ir antes de una que pide euler
+COMPATIBLE = {("euler_principal", "euler")}
+
+class Stage:
+    # Una conversión de batch con su buffer de salida de chunk_rows filas
+    def __init__(self, conversion, chunk_rows=CHUNK_ROWS):
+        source, _, target = conversion.partition("_to_")
+        if conversion not in batch.CONVERSIONS and conversion not in batch.ALIASES:
+            raise ValueError(f"{conversion} no es una conversión de batch")
+        self.conversion = conversion
+        self.source, self.target = source, target
+        self.buffer = np.empty((chunk_rows,) + ROW_SHAPES[target])
+
+    def accepts(self, representation):
+        return representation == self.source or (representation, self.source) in COMPATIBLE
+
+    def __call__(self, values):
+        return batch.convert_into(self.conversion, values, self.buffer[:len(values)])
+
+def pipeline(*conversions, chunk_rows=CHUNK_ROWS):
+    # Las etapas de las conversiones, comprobando que cada una recibe lo que da la anterior
+    if not conversions:
+        raise ValueError("se necesita al menos una conversión")
+    stages = [Stage(conversion, chunk_rows) for conversion in conversions]
+    for previous, stage in zip(stages, stages[1:]):
+        if not stage.accepts(previous.target):
+            raise ValueError(f"{stage.conversion} no puede ir después de {previous.conversion}")
+    return stages
+
+def stream(chunks, *conversions, chunk_rows=CHUNK_ROWS):
+    # Genera cada bloque de chunks convertido por las etapas, en bloques de como mucho chunk_rows filas
+    stages = pipeline(*conversions, chunk_rows=chunk_rows)
+    row_in = ROW_SHAPES[stages[0].source]
+    for chunk in chunks:
+        if chunk.shape[1:] != row_in:
+            raise ValueError(f"{stages[0].conversion} recibe filas {row_in}, no {chunk.shape[1:]}")
+        for start in range(0, len(chunk), chunk_rows):
+            values = chunk[start:start + chunk_rows]
+            for stage in stages:
+                values = stage(values)
+            yield values
+
+def array_chunks(array, chunk_rows=CHUNK_ROWS):
+    # Vistas de chunk_rows filas de un array (o de un np.load con mmap_mode), sin copiarlo
+    for start in range(0, len(array), chunk_rows):
+        yield array[start:start + chunk_rows]
+
+def log_chunks(path, chunk_rows=CHUNK_ROWS):
+    # Los cuaterniones (x, y, z, w) float64 normalizados de un log de viewer3d.orientation_log, por bloques.
+    # Se leen con readinto en buffers reutilizados: al recorrer un memmap, las páginas ya leídas
+    # siguen contando en la memoria del proceso.
+    rows = len(OrientationLog(path))  # Comprueba la cabecera
+    records = np.empty(chunk_rows, dtype=LOG_DTYPE)
+    quaternions = np.empty((chunk_rows, 4))
+    norms = np.empty((chunk_rows, 1))
+    with open(path, "rb") as file:
+        file.seek(HEADER_SIZE)
+        for start in range(0, rows, chunk_rows):
+            count = min(chunk_rows, rows - start)
+            file.readinto(records[:count])
+            stored = records["quaternion"][:count]  # (w, x, y, z)
+            out = quaternions[:count]
+            out[:, :3] = stored[:, 1:]
+            out[:, 3] = stored[:, 0]
+            np.sqrt(np.einsum("ij,ij->i", out, out, out=norms[:count, 0]), out=norms[:count, 0])
+            out /= norms[:count]
+            yield out
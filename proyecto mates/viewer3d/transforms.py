@@ -0,0 +1,80 @@
+import ctypes
+import math
+
+import numpy as np
+
+# Matrices 4x4 de modelo para OpenGL, escritas directamente en un buffer de 16 float32 en orden de
+# columnas (el de glLoadMatrixf/glMultMatrixf y de glUniformMatrix4fv sin transponer). El buffer se
+# reserva una vez con new_gl_matrix y cada frame solo se reescriben sus elementos: no se crea
+# ningún array ni lista por frame, y la orientación entera llega a OpenGL con una sola llamada
+# en vez de dos o tres glRotatef. Las cuentas son escalares con math, como en Rotation.
+#
+# glMultMatrixf de OpenGL.GL convierte el array de NumPy en cada llamada (más lento que los tres
+# glRotatef, y reserva memoria); el de OpenGL.raw.GL recibe directamente el array de ctypes de
+# gl_matrix_pointer, que comparte memoria con el buffer y se crea una sola vez.
+# Los cuaterniones van en orden (x, y, z, w). Este módulo no importa OpenGL.
+
+def new_gl_matrix():
+    # Buffer de 16 float32 para las funciones de este módulo, empezando por la identidad
+    return np.eye(4, dtype=np.float32).ravel()
+
+def gl_matrix_pointer(matrix):
+    # Array de ctypes (16 GLfloat) sobre el buffer de new_gl_matrix, para el glMultMatrixf de OpenGL.raw
+    return (ctypes.c_float * 16).from_buffer(matrix)
+
+def gl_rotation_matrix(quaternion, out):
+    # Escribe en out la matriz de rotación del cuaternión; la traslación y la última fila no se tocan
+    x, y, z, w = quaternion
+    xx, yy, zz = x*x, y*y, z*z
+    xy, xz, yz = x*y, x*z, y*z
+    wx, wy, wz = w*x, w*y, w*z
+    out[0] = 1 - 2*(yy + zz)
+    out[1] = 2*(xy + wz)
+    out[2] = 2*(xz - wy)
+    out[4] = 2*(xy - wz)
+    out[5] = 1 - 2*(xx + zz)
+    out[6] = 2*(yz + wx)
+    out[8] = 2*(xz + wy)
+    out[9] = 2*(yz - wx)
+    out[10] = 1 - 2*(xx + yy)
+    return out
+
+def gl_model_matrix(quaternion, out, position=(0, 0, 0), scale=1.0):
+    # Traslación · rotación · escala uniforme, toda la matriz (con vistas de out se crearían arrays)
+    x, y, z, w = quaternion
+    xx, yy, zz = x*x, y*y, z*z
+    xy, xz, yz = x*y, x*z, y*z
+    wx, wy, wz = w*x, w*y, w*z
+    double = 2*scale
+    out[0] = scale - double*(yy + zz)
+    out[1] = double*(xy + wz)
+    out[2] = double*(xz - wy)
+    out[4] = double*(xy - wz)
+    out[5] = scale - double*(xx + zz)
+    out[6] = double*(yz + wx)
+    out[8] = double*(xz + wy)
+    out[9] = double*(yz - wx)
+    out[10] = scale - double*(xx + yy)
+    out[3] = out[7] = out[11] = 0
+    out[12], out[13], out[14] = position
+    out[15] = 1
+    return out
+
+def gl_cube_rotation_matrix(degrees, out):
+    # La matriz de glRotatef en x, luego en y (y en z si se da), con los ángulos en grados, como los
+    # de render(figure, euler_angles) y los diálogos del visor: R = R_x · R_y · R_z
+    rx, ry = math.radians(degrees[0]), math.radians(degrees[1])
+    rz = math.radians(degrees[2]) if len(degrees) > 2 else 0.0
+    cx, sx = math.cos(rx), math.sin(rx)
+    cy, sy = math.cos(ry), math.sin(ry)
+    cz, sz = math.cos(rz), math.sin(rz)
+    out[0] = cy*cz
+    out[1] = sx*sy*cz + cx*sz
+    out[2] = sx*sz - cx*sy*cz
+    out[4] = -cy*sz
+    out[5] = cx*cz - sx*sy*sz
+    out[6] = cx*sy*sz + sx*cz
+    out[8] = sy
+    out[9] = -sx*cy
+    out[10] = cx*cy
+    return out
@@ -0,0 +1,153 @@
+import argparse
+import multiprocessing
+import tkinter as tk
+from tkinter import messagebox, simpledialog
+
+from viewer3d.info_window import DEFAULT_REFRESH_MS, build_info_panel
+from viewer3d.orientation_feed import OrientationFeedReader
+
+# Interfaz de Tk fuera del proceso del visor. Tk no es thread-safe y sus diálogos bloquean,
+# así que el panel de información, la ventana de controles y los diálogos de entrada corren en
+# procesos aparte: leen la rotación del OrientationFeed (memoria compartida) y devuelven lo que
+# escribe el usuario como comandos por un Pipe, que el visor recoge sin bloquearse en cada frame.
+#
+# Los diálogos los define cada visor: {tecla: (comando, título, preguntas)}. El panel pregunta
+# cada valor en orden y envía (comando, valores) con los números en el orden de las preguntas.
+#
+# Se pueden conectar más paneles de solo lectura desde otra terminal con el nombre del feed:
+#   python -m viewer3d.ui_process psm_1234abcd
+
+POLL_MS = 50  # Cada cuánto mira el panel si el visor le pidió algo
+
+def ask_values(parent, title, prompts):
+    # Devuelve los valores como floats, o None si el usuario cancela o escribe algo que no es un número
+    values = []
+    for prompt in prompts:
+        text = simpledialog.askstring(title, prompt, parent=parent)
+        if text is None:
+            return None
+        try:
+            values.append(float(text))
+        except ValueError:
+            messagebox.showerror(title, f"'{text}' no es un número", parent=parent)
+            return None
+    return tuple(values)
+
+def show_controls(parent, controls):
+    controls_window = tk.Toplevel(parent)
+    controls_window.title("Controls")
+    for text in controls:
+        tk.Label(controls_window, text=text).pack()
+
+def run_ui(feed_name, connection=None, dialogs=None, controls=(), refresh_ms=DEFAULT_REFRESH_MS):
+    # Proceso del panel. Sin connection es un monitor de solo lectura, sin botones.
+    dialogs = dialogs or {}
+    reader = OrientationFeedReader(feed_name)
+    root = tk.Tk()
+    root.title("Information")
+    build_info_panel(root, reader, refresh_ms)
+
+    def close():
+        root.destroy()
+
+    def open_dialog(key):
+        command, title, prompts = dialogs[key]
+        values = ask_values(root, title, prompts)
+        if values is not None:
+            try:
+                connection.send((command, values))
+            except OSError:  # El visor ya se cerró
+                close()
+
+    if connection is not None:
+        buttons = tk.Frame(root)
+        buttons.pack()
+        for key, (command, title, prompts) in dialogs.items():
+            tk.Button(buttons, text=f"{title} ({key.upper()})", command=lambda key=key: open_dialog(key)).pack(side=tk.LEFT)
+        if controls:
+            tk.Button(buttons, text="Controls (Q)", command=lambda: show_controls(root, controls)).pack(side=tk.LEFT)
+
+    def poll():
+        if reader.closed:  # El visor se cerró
+            close()
+            return
+        try:
+            while connection is not None and connection.poll():
+                message = connection.recv()
+                if message[0] == "dialog":
+                    open_dialog(message[1])
+                elif message[0] == "controls":
+                    show_controls(root, controls)
+        except (EOFError, OSError):
+            close()
+            return
+        root.after(POLL_MS, poll)
+
+    root.after(POLL_MS, poll)
+    root.mainloop()
+    reader.close()
+
+class UIProcesses:
+    # Lado del visor: arranca los paneles, les pasa peticiones y recoge sus comandos sin bloquear
+    def __init__(self, feed_name, dialogs, controls, monitors=1, refresh_ms=DEFAULT_REFRESH_MS):
+        self._arguments = (feed_name, dialogs, controls, refresh_ms)
+        # spawn y no fork: el proceso hijo no debe heredar el estado de SDL y OpenGL del visor
+        self._context = multiprocessing.get_context("spawn")
+        self._panels = []  # (proceso, extremo del Pipe del visor)
+        for _ in range(monitors):
+            self._start_panel()
+
+    def _start_panel(self):
+        feed_name, dialogs, controls, refresh_ms = self._arguments
+        viewer_end, ui_end = self._context.Pipe()
+        process = self._context.Process(target=run_ui, args=(feed_name, ui_end, dialogs, controls, refresh_ms),
+                                        daemon=True)
+        process.start()
+        ui_end.close()
+        self._panels.append((process, viewer_end))
+
+    def request(self, *message):
+        # Pide algo al primer panel abierto ("dialog", tecla) o ("controls",); si no queda ninguno, abre otro
+        while True:
+            if not self._panels:
+                self._start_panel()
+            process, connection = self._panels[0]
+            try:
+                connection.send(message)
+                return
+            except OSError:
+                self._drop(0)
+
+    def commands(self):
+        # Comandos que llegaron de todos los paneles desde la última llamada, sin esperar
+        received = []
+        for index in reversed(range(len(self._panels))):
+            connection = self._panels[index][1]
+            try:
+                while connection.poll():
+                    received.append(connection.recv())
+            except (EOFError, OSError):  # El usuario cerró ese panel
+                self._drop(index)
+        return received
+
+    def _drop(self, index):
+        process, connection = self._panels.pop(index)
+        connection.close()
+
+    def close(self):
+        while self._panels:
+            process, connection = self._panels[-1]
+            self._drop(-1)
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+def main():
+    parser = argparse.ArgumentParser(description="Panel de información de solo lectura conectado a un visor")
+    parser.add_argument("feed", help="nombre del feed que muestra el visor al arrancar")
+    parser.add_argument("--refresh-ms", type=int, default=DEFAULT_REFRESH_MS)
+    args = parser.parse_args()
+    run_ui(args.feed, refresh_ms=args.refresh_ms)
+
+if __name__ == "__main__":
+    main()